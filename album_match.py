@@ -0,0 +1,260 @@
+"""
+Artist/album candidate matching shared by the Melon and Bugs clients.
+
+Search results are scored against the (artist, album) that was searched
+for. The score is the one the clients have always used:
+
+- album:  exact compact match +12, query inside candidate +8, candidate
+          inside query +4
+- artist: exact compact match +8, query inside candidate +4
+- +1 per shared whitespace token of the normalized album titles
+
+`compact()` (lowercase, only [0-9a-z가-힣]) and the token set used to be
+recomputed for both sides of every pair. Here they are computed once per
+distinct string in a `MatchKey` (memoized, since the same candidates come
+back across attempts and pages); the album's character trigrams are added
+the first time a similarity is asked for. Scoring a pair is then a few
+string comparisons and a set intersection.
+
+`rank()` orders one page for one query (ties keep page order, as the old
+sort did); `match_page()` scores a page against many pending queries at
+once. Each `Match` carries a `confidence` (score over the best score the
+query could reach) and a trigram `similarity` of the album titles, for
+callers that want a threshold rather than "best on the page".
+
+A search for one album often lists the artist's other albums too.
+`PendingQueries` holds the albums a run has yet to search for, indexed by
+compact artist, and `observe()` runs `match_page()` for every page the
+clients fetch against the pending albums of the artists on it. An album
+whose only full-confidence candidate shows up that way is settled, and
+`claim()` returns it in place of its own search request.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Generic, Iterable, List, NamedTuple, Optional, Protocol, Sequence, Tuple, TypeVar
+
+
+WHITESPACE_RE = re.compile(r"\s+")
+NON_WORD_RE = re.compile(r"[^0-9a-z가-힣]")
+NGRAM_SIZE = 3
+
+ALBUM_EXACT = 12
+ALBUM_QUERY_IN_CANDIDATE = 8
+ALBUM_CANDIDATE_IN_QUERY = 4
+ARTIST_EXACT = 8
+ARTIST_QUERY_IN_CANDIDATE = 4
+
+# exact album and artist, every album token shared
+SETTLED_CONFIDENCE = 1.0
+
+
+def normalize(text: str) -> str:
+    return WHITESPACE_RE.sub(" ", (text or "").strip().lower())
+
+
+def compact(text: str) -> str:
+    return NON_WORD_RE.sub("", normalize(text))
+
+
+def char_ngrams(text: str, size: int = NGRAM_SIZE) -> FrozenSet[str]:
+    if len(text) <= size:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i : i + size] for i in range(len(text) - size + 1))
+
+
+class MatchKey(NamedTuple):
+    artist: str
+    album: str
+    tokens: FrozenSet[str]
+
+    @property
+    def max_score(self) -> int:
+        return (ALBUM_EXACT if self.album else 0) + (ARTIST_EXACT if self.artist else 0) + len(self.tokens)
+
+    @property
+    def ngrams(self) -> FrozenSet[str]:
+        return album_ngrams(self.album)
+
+
+@lru_cache(maxsize=65536)
+def match_key(artist: str, album: str) -> MatchKey:
+    return MatchKey(compact(artist), compact(album), frozenset(normalize(album).split()))
+
+
+@lru_cache(maxsize=65536)
+def album_ngrams(album_compact: str) -> FrozenSet[str]:
+    return char_ngrams(album_compact)
+
+
+def score_keys(query: MatchKey, cand: MatchKey) -> int:
+    score = 0
+    qal, cal = query.album, cand.album
+    if qal:
+        if cal == qal:
+            score += ALBUM_EXACT
+        elif qal in cal:
+            score += ALBUM_QUERY_IN_CANDIDATE
+        elif cal in qal:
+            score += ALBUM_CANDIDATE_IN_QUERY
+
+    qa, ca = query.artist, cand.artist
+    if qa:
+        if ca == qa:
+            score += ARTIST_EXACT
+        elif qa in ca:
+            score += ARTIST_QUERY_IN_CANDIDATE
+
+    # Shared token overlap can salvage minor spacing/punctuation differences.
+    if query.tokens and cand.tokens:
+        score += len(query.tokens & cand.tokens)
+    return score
+
+
+def score_candidate(query_artist: str, query_album: str, cand_artist: str, cand_album: str) -> int:
+    return score_keys(match_key(query_artist, query_album), match_key(cand_artist, cand_album))
+
+
+def ngram_similarity(a: MatchKey, b: MatchKey) -> float:
+    """Dice coefficient of the album trigram sets."""
+    a_grams, b_grams = a.ngrams, b.ngrams
+    if not a_grams or not b_grams:
+        return 0.0
+    return 2.0 * len(a_grams & b_grams) / (len(a_grams) + len(b_grams))
+
+
+class Candidate(Protocol):
+    artist: str
+    album: str
+
+
+C = TypeVar("C", bound=Candidate)
+
+
+class Match(Generic[C]):
+    """One scored candidate; `confidence` and `similarity` are computed on access."""
+
+    __slots__ = ("candidate", "score", "query_key", "candidate_key")
+
+    def __init__(self, candidate: C, score: int, query_key: MatchKey, candidate_key: MatchKey):
+        self.candidate = candidate
+        self.score = score
+        self.query_key = query_key
+        self.candidate_key = candidate_key
+
+    @property
+    def confidence(self) -> float:
+        best = self.query_key.max_score
+        return min(1.0, self.score / best) if best else 0.0
+
+    @property
+    def similarity(self) -> float:
+        return ngram_similarity(self.query_key, self.candidate_key)
+
+    def __repr__(self) -> str:
+        return f"Match(score={self.score}, confidence={self.confidence:.2f}, candidate={self.candidate!r})"
+
+
+def _match(query: MatchKey, cand_key: MatchKey, candidate: C) -> Match[C]:
+    return Match(candidate, score_keys(query, cand_key), query, cand_key)
+
+
+def rank(artist: str, album: str, candidates: Sequence[C]) -> List[Match[C]]:
+    """Candidates for one query, best first; equal scores keep page order."""
+    query = match_key(artist, album)
+    matches = [_match(query, match_key(c.artist, c.album), c) for c in candidates]
+    matches.sort(key=lambda m: m.score, reverse=True)
+    return matches
+
+
+def best_match(artist: str, album: str, candidates: Sequence[C]) -> Optional[Match[C]]:
+    ranked = rank(artist, album, candidates)
+    return ranked[0] if ranked else None
+
+
+def match_page(
+    queries: Sequence[Tuple[str, str]],
+    candidates: Sequence[C],
+    min_confidence: float = 0.0,
+) -> Dict[Tuple[str, str], List[Match[C]]]:
+    """
+    Rank one result page for every (artist, album) in `queries`. Candidate
+    keys are built once for the page; matches below `min_confidence` are
+    dropped, so a query can come back with an empty list.
+    """
+    cand_keys = [match_key(c.artist, c.album) for c in candidates]
+    ranked: Dict[Tuple[str, str], List[Match[C]]] = {}
+    for artist, album in queries:
+        query = match_key(artist, album)
+        matches = [_match(query, key, c) for key, c in zip(cand_keys, candidates)]
+        if min_confidence > 0:
+            matches = [m for m in matches if m.confidence >= min_confidence]
+        matches.sort(key=lambda m: m.score, reverse=True)
+        ranked[(artist, album)] = matches
+    return ranked
+
+
+class PendingQueries:
+    """
+    Albums still waiting for a search, settled from other albums' pages.
+
+    A pending album is settled when exactly one candidate on an observed
+    page reaches `min_confidence`; with the default that is an exact album
+    and artist match sharing every album token, the best score its own
+    search could give.
+    Thread-safe: the clients share one per catalog across lookup threads.
+    """
+
+    def __init__(self, queries: Iterable[Tuple[str, str]] = (), min_confidence: float = SETTLED_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._waiting: Dict[str, Dict[MatchKey, Tuple[str, str]]] = {}
+        self._settled: Dict[MatchKey, Match] = {}
+        for artist, album in queries:
+            self.add(artist, album)
+
+    def add(self, artist: str, album: str) -> None:
+        query = match_key(artist, album)
+        if query.artist and query.album:
+            with self._lock:
+                self._waiting.setdefault(query.artist, {})[query] = (artist, album)
+
+    def claim(self, artist: str, album: str) -> Optional[Match]:
+        """Stop waiting for (artist, album); returns its match if another page settled it."""
+        query = match_key(artist, album)
+        with self._lock:
+            self._waiting.get(query.artist, {}).pop(query, None)
+            match = self._settled.pop(query, None)
+            if match is not None:
+                self.stats["claimed"] += 1
+        return match
+
+    def observe(self, candidates: Sequence[C]) -> int:
+        """Match a fetched page against the pending albums of its artists; returns how many it settled."""
+        artists = {match_key(c.artist, c.album).artist for c in candidates}
+        with self._lock:
+            queries = [q for artist in artists for q in self._waiting.get(artist, {}).values()]
+        if not queries:
+            return 0
+        found = {
+            match_key(*query): matches[0]
+            for query, matches in match_page(queries, candidates, self.min_confidence).items()
+            if len(matches) == 1
+        }
+        settled = 0
+        with self._lock:
+            for query, match in found.items():
+                # claimed (being searched) since the page was matched: leave it
+                if self._waiting.get(query.artist, {}).pop(query, None) is not None:
+                    self._settled[query] = match
+                    settled += 1
+            self.stats["settled"] += settled
+        return settled
+
+    def report(self) -> str:
+        return f"Search pages: {self.stats['settled']} pending albums settled by other albums' pages, {self.stats['claimed']} searches skipped"
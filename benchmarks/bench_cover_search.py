@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+iTunes cover search for albums without a cover: the old serial cascade vs
+CoverSearch.
+
+A synthetic catalog of `--albums` albums over `--artists` artists is
+searched against the local provider stand-in, where `--miss-share` of the
+search terms find nothing (so cascades go past the first term and the
+bare-artist fallback repeats across albums). Strategies:
+
+  serial      the old run_cover_search: a new Session per album, terms one
+              after another, memoized per album only (copied verbatim)
+  dedupe x1   CoverSearch with one worker and no lookahead
+  pool xN     CoverSearch with `--workers` workers, lookahead `--lookahead`
+
+Every strategy must pick the same cover for every album.
+
+Usage:
+  python benchmarks/bench_cover_search.py --albums 300 --artists 40 --workers 8 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import quote_plus
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import enrich_media  # noqa: E402
+import fixtures as fx  # noqa: E402
+from cover_search import CoverSearch  # noqa: E402
+from http_cache import fetch  # noqa: E402
+from provider_server import ProviderServer, pointed_at  # noqa: E402
+
+
+def legacy_run_cover_search(artist: str, album: str, title: str) -> str:
+    title_term = (title or "").split(",")[0].strip()
+    if enrich_media.is_youtube_url(title_term):
+        title_term = ""
+    terms = [f"{artist} {album}", f"{artist} {title_term}", f"{artist} {album} {title_term}", f"{artist}"]
+    session = requests.Session()
+    headers = {"User-Agent": "Mozilla/5.0"}
+
+    for term in terms:
+        term = " ".join(term.split())
+        if not term:
+            continue
+        try:
+            url = enrich_media.ITUNES_SEARCH_URL.format(term=quote_plus(term))
+            resp = fetch(session, url, endpoint="itunes_search", cache=None, headers=headers, timeout=15)
+            if resp.status_code != 200:
+                continue
+            data = resp.json()
+            results = data.get("results") or []
+            for item in results:
+                artwork = item.get("artworkUrl100") or item.get("artworkUrl60")
+                if artwork:
+                    return artwork.replace("100x100bb", "600x600bb").replace("60x60bb", "600x600bb")
+        except Exception:
+            continue
+    return ""
+
+
+def catalog_albums(path: Path) -> List[Tuple[str, str, str]]:
+    """(artist, album, first title) per album, as build_matches would search them."""
+    seen: Dict[Tuple[str, str], str] = {}
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            seen.setdefault((row["Artist"], row["Album"]), row["Title"])
+    return [(artist, album, title) for (artist, album), title in seen.items()]
+
+
+def run_serial(albums: List[Tuple[str, str, str]]) -> List[str]:
+    return [legacy_run_cover_search(*album) for album in albums]
+
+
+def run_service(albums: List[Tuple[str, str, str]], workers: int, lookahead: int) -> Tuple[List[str], CoverSearch]:
+    with CoverSearch(enrich_media.itunes_artwork, workers=workers, lookahead=lookahead, is_youtube_url=enrich_media.is_youtube_url) as service:
+        futures = [service.submit(*album) for album in albums]
+        return [future.result() for future in futures], service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--albums", type=int, default=300)
+    parser.add_argument("--artists", type=int, default=40)
+    parser.add_argument("--miss-share", type=float, default=0.5, help="Share of terms with no iTunes result")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--lookahead", type=int, default=2)
+    args = parser.parse_args()
+
+    fx.ITUNES_MISS_SHARE = args.miss_share
+    enrich_media.HTTP_CACHE = None
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = Path(tmp) / "catalog.csv"
+        fx.write_catalog(catalog, args.albums, rows_per_album=2, youtube_share=0.0, artists=args.artists)
+        albums = catalog_albums(catalog)
+
+    rows = []
+    with ProviderServer(latency=args.latency) as server, pointed_at(server):
+        t0 = time.perf_counter()
+        baseline = run_serial(albums)
+        rows.append(("serial", time.perf_counter() - t0, server.requests["itunes_search"], ""))
+
+        for label, workers, lookahead in (("dedupe x1", 1, 1), (f"pool x{args.workers}", args.workers, args.lookahead)):
+            server.reset_stats()
+            t0 = time.perf_counter()
+            covers, service = run_service(albums, workers, lookahead)
+            elapsed = time.perf_counter() - t0
+            if covers != baseline:
+                sys.exit(f"{label}: covers differ from the serial cascade")
+            rows.append((label, elapsed, server.requests["itunes_search"], f"{service.stats['deduped']} deduped, {service.stats['cancelled']} cancelled"))
+
+    found = sum(1 for cover in baseline if cover)
+    print(f"albums={len(albums)} artists={args.artists} miss_share={args.miss_share:g} latency={args.latency * 1000:.0f}ms covers found={found}")
+    print(f"{'strategy':<12}{'seconds':>9}{'albums/s':>10}{'requests':>10}{'speedup':>9}  notes")
+    for label, seconds, requests_made, notes in rows:
+        print(f"{label:<12}{seconds:>9.2f}{len(albums) / seconds:>10.1f}{requests_made:>10}{rows[0][1] / seconds:>8.1f}x  {notes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark tonestudio credit extraction: legacy two-pass scan vs single pass.
+
+For every fixture page this times
+  - legacy:      BeautifulSoup(html.parser) + the old text-node / li-p-div scans
+  - single/bs4:  BeautifulSoup(html.parser) + iter_credit_lines
+  - single/lxml: crawler.parse_credit_page on lxml directly
+and checks the two single-pass backends return identical credits. Credits
+that only the legacy scan reports come from it parsing whole container
+divs as if they were one line; they are listed so the difference is visible.
+
+Usage:
+  python benchmarks/bench_credit_extract.py --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import crawler  # noqa: E402
+from fixtures import tonestudio_pages  # noqa: E402
+
+
+def legacy_find_songs(soup, year):
+    """find_yanghajung_songs as it was before the single-pass extractor."""
+    songs = []
+    for text in soup.find_all(string=True):
+        if "양하정" in text:
+            parent = text.parent
+            if parent:
+                song_info = crawler.parse_song_info(parent.get_text(strip=True), year)
+                if song_info and not any(s["title"] == song_info["title"] and s["artist"] == song_info["artist"] for s in songs):
+                    songs.append(song_info)
+    for li in soup.find_all(["li", "p", "div"]):
+        text = li.get_text()
+        if "양하정" in text:
+            song_info = crawler.parse_song_info(text, year)
+            if song_info and not any(s["title"] == song_info["title"] and s["artist"] == song_info["artist"] for s in songs):
+                songs.append(song_info)
+    return songs
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--credits", type=int, default=600, help="Credits per synthetic year page")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = tonestudio_pages(args.credits)
+    totals = {"legacy": 0.0, "bs4": 0.0, "lxml": 0.0}
+    identical = True
+    for name, content in pages.items():
+        url = f"https://tonestudio.co.kr/tone-discography/{name}/"
+
+        def run_legacy():
+            soup = BeautifulSoup(content, "html.parser", from_encoding="utf-8")
+            return legacy_find_songs(soup, crawler.extract_year_from_page(soup))
+
+        def run_bs4():
+            soup = BeautifulSoup(content, "html.parser", from_encoding="utf-8")
+            return crawler.find_yanghajung_songs(soup, crawler.extract_year_from_page(soup))
+
+        legacy_s, legacy = best_of(args.repeat, run_legacy)
+        bs4_s, single_bs4 = best_of(args.repeat, run_bs4)
+        lxml_s, single_lxml = best_of(args.repeat, lambda: crawler.parse_credit_page(content, url))
+        totals["legacy"] += legacy_s
+        totals["bs4"] += bs4_s
+        totals["lxml"] += lxml_s
+
+        same = single_bs4 == single_lxml
+        identical &= same
+        new_keys = {(s["artist"], s["title"]) for s in single_lxml}
+        legacy_keys = {(s["artist"], s["title"]) for s in legacy}
+        print(
+            f"{name}: {len(content) / 1024:.0f} KB, credits={len(single_lxml)} "
+            f"legacy={legacy_s * 1000:.0f}ms single/bs4={bs4_s * 1000:.0f}ms single/lxml={lxml_s * 1000:.0f}ms "
+            f"bs4==lxml={'yes' if same else 'NO'} "
+            f"legacy-matched={len(new_keys & legacy_keys)}/{len(new_keys)} legacy-only={len(legacy_keys - new_keys)}"
+        )
+        for artist, title in sorted(legacy_keys - new_keys)[:3]:
+            print(f"    legacy-only: {artist[:40]!r} – {title!r}")
+
+    print(
+        f"total: legacy={totals['legacy']:.2f}s single/bs4={totals['bs4']:.2f}s single/lxml={totals['lxml']:.2f}s "
+        f"speedup(lxml)={totals['legacy'] / totals['lxml']:.1f}x identical={'yes' if identical else 'NO'}"
+    )
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the html_extract backends on Melon/Bugs search and album pages.
+
+Every page kind is run through each backend (plus BeautifulSoup with
+html.parser, which is what the scrapers used before the backends existed).
+All backends must return exactly what the bs4 backend returns; the run exits
+non-zero otherwise. Pages saved under benchmarks/fixtures/<kind>/ are used
+when present, synthetic pages of a similar shape otherwise.
+
+Usage:
+  python benchmarks/bench_extract.py --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import provider_pages  # noqa: E402
+from html_extract import BACKENDS, SoupExtractor, get_extractor  # noqa: E402
+
+METHODS = {
+    "melon_search": "melon_search",
+    "melon_album": "melon_album",
+    "melon_song": "melon_song_meta",
+    "bugs_search": "bugs_search",
+    "bugs_album": "bugs_album",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractors = {"html.parser": SoupExtractor("html.parser")}
+    extractors.update({name: get_extractor(name) for name in BACKENDS})
+    pages = provider_pages()
+
+    identical = True
+    totals = dict.fromkeys(extractors, 0.0)
+    print(f"{'kind':<14}{'pages':>6}" + "".join(f"{name:>14}" for name in extractors) + "  (ms/page)")
+    for kind, method in METHODS.items():
+        htmls = [content.decode("utf-8", errors="replace") for content in pages[kind].values()]
+        expected = [getattr(extractors["bs4"], method)(html) for html in htmls]
+        row = []
+        for name, extractor in extractors.items():
+            fn = getattr(extractor, method)
+            if [fn(html) for html in htmls] != expected:
+                identical = False
+                print(f"  {kind}: {name} differs from bs4")
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                for html in htmls:
+                    fn(html)
+                best = min(best, time.perf_counter() - t0)
+            totals[name] += best
+            row.append(best / len(htmls) * 1000)
+        print(f"{kind:<14}{len(htmls):>6}" + "".join(f"{ms:>14.2f}" for ms in row))
+
+    baseline = totals["html.parser"]
+    print(f"{'speedup':<20}" + "".join(f"{baseline / t:>13.1f}x" for t in totals.values()))
+    print(f"identical={'yes' if identical else 'NO'}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark build_images.py against the local provider stand-in.
+
+A synthetic media map is generated with `--covers` distinct cover URLs
+(a share of them duplicated under a second URL with identical bytes) and
+`--videos` YouTube ids whose maxres thumbnail is missing, so every video
+walks to the next size as it would on YouTube. Then:
+
+  cold      empty images/ and index, `--workers` render processes
+  cold x1   the same with a single render process (skipped with --workers 1)
+  warm      everything known: one conditional request per source, all 304
+  offline   everything known, --no-revalidate: no requests at all
+
+For each run it reports wall time, requests and 304s seen by the server and
+images rendered. It also compares bytes per card: the original JPEG vs the
+320w WebP/AVIF renditions and the inline placeholder.
+
+Usage:
+  python benchmarks/bench_images.py --covers 60 --videos 40 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import build_images  # noqa: E402
+import enrich_media  # noqa: E402
+from provider_server import ProviderServer, image_url  # noqa: E402
+
+
+def synthetic_items(base_url: str, covers: int, videos: int, duplicate_share: float) -> List[Dict[str, str]]:
+    items = []
+    for i in range(covers):
+        items.append({"key": f"artist {i}|album {i}|track", "cover_url": image_url(base_url, f"cover-{i}")})
+    for i in range(int(covers * duplicate_share)):
+        # same bytes as cover-i, different URL
+        items.append({"key": f"artist {i}|album {i}|dup", "cover_url": image_url(base_url, f"cover-{i}") + "&cdn=2"})
+    for i in range(videos):
+        video_id = f"vid{i:08d}"
+        items.append({"key": f"artist v{i}|clip|{video_id}", "youtube_id": video_id})
+    return items
+
+
+def run(label: str, server: ProviderServer, items, **kwargs) -> Dict[str, object]:
+    server.reset_stats()
+    t0 = time.perf_counter()
+    stats: Counter = build_images.build_images(items, {}, **kwargs)
+    elapsed = time.perf_counter() - t0
+    return {
+        "run": label,
+        "seconds": elapsed,
+        "requests": sum(server.requests.values()),
+        "not_modified": sum(server.not_modified.values()),
+        "rendered": stats["rendered"],
+        "sources": stats["sources"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--covers", type=int, default=60)
+    parser.add_argument("--videos", type=int, default=40)
+    parser.add_argument("--duplicate-share", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--latency", type=float, default=0.02, help="Server-side delay per response (seconds)")
+    args = parser.parse_args()
+
+    if build_images.Image is None:
+        sys.exit("needs Pillow: pip install Pillow")
+
+    with ProviderServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        build_images.YOUTUBE_THUMBNAIL_URL = server.base_url + "/images/yt-{video_id}-{name}.jpg?w=480&h=360"
+        build_images.YOUTUBE_THUMBNAIL_NAMES = ("maxresdefault-missing", "hqdefault", "default")
+        items = synthetic_items(server.base_url, args.covers, args.videos, args.duplicate_share)
+
+        results = []
+        worker_counts = [args.workers] if args.workers == 1 else [args.workers, 1]
+        for workers in worker_counts:
+            build_images.IMAGE_DIR = Path(tmp) / f"w{workers}" / "images"
+            build_images.IMAGE_DIR.parent.mkdir()
+            enrich_media.IMAGE_INDEX_PATH = build_images.IMAGE_DIR.parent / "index.json"
+            label = "cold" if workers == args.workers else "cold x1"
+            results.append(run(label, server, items, workers=workers))
+
+        # warm runs reuse the first cold run's state
+        build_images.IMAGE_DIR = Path(tmp) / f"w{args.workers}" / "images"
+        enrich_media.IMAGE_INDEX_PATH = build_images.IMAGE_DIR.parent / "index.json"
+        results.append(run("warm", server, items, workers=args.workers))
+        results.append(run("offline", server, items, workers=args.workers, revalidate=False))
+
+        assets = enrich_media.load_image_assets()
+        originals = [len(server_bytes) for server_bytes in _original_sizes(server, items)]
+        webp = [(build_images.IMAGE_DIR.parent / a["src"]).stat().st_size for a in assets.values()]
+        avif = [(build_images.IMAGE_DIR.parent / a["avif"].split(" ")[0]).stat().st_size for a in assets.values() if a.get("avif")]
+        placeholders = [len(a["placeholder"]) for a in assets.values()]
+
+    print(f"sources={results[0]['sources']} workers={args.workers} cpus={os.cpu_count()} latency={args.latency * 1000:.0f}ms")
+    print(f"{'run':<10}{'seconds':>9}{'requests':>10}{'304s':>7}{'rendered':>10}")
+    for r in results:
+        print(f"{r['run']:<10}{r['seconds']:>9.2f}{r['requests']:>10}{r['not_modified']:>7}{r['rendered']:>10}")
+    print()
+    print("bytes per card (median):")
+    print(f"  original jpeg  {statistics.median(originals) / 1024:>7.1f} KB")
+    print(f"  320w webp      {statistics.median(webp) / 1024:>7.1f} KB")
+    if avif:
+        print(f"  320w avif      {statistics.median(avif) / 1024:>7.1f} KB")
+    print(f"  placeholder    {statistics.median(placeholders):>7.0f} B (inline)")
+
+
+def _original_sizes(server: ProviderServer, items) -> List[bytes]:
+    import requests
+
+    urls = {item["cover_url"] for item in items if item.get("cover_url")}
+    urls |= {build_images.YOUTUBE_THUMBNAIL_URL.format(video_id=item["youtube_id"], name="hqdefault") for item in items if item.get("youtube_id")}
+    return [requests.get(url, timeout=10).content for url in sorted(urls)]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Throughput of search-result scoring: the old per-pair score_candidate vs
+album_match.
+
+`--queries` distinct (artist, album) queries each get a synthetic Melon
+search page (`--results` candidates, parsed once up front). Three workloads:
+
+  rank       every query against its own page (what find_album_id does)
+  page x Q   every page against `--pending` other pending queries as well,
+             as a client matching one page to many albums at once would
+  rescan     `rank` again with the key cache warm (the same albums come
+             back across attempts and across Melon/Bugs)
+
+The legacy scorer is the function both clients carried before album_match,
+copied here verbatim. Scores and rankings must be identical; the run exits
+non-zero otherwise.
+
+Then a catalog run as the clients do it: every query searched in turn,
+with each page also listing `--siblings` other albums of the same artist,
+once without and once with album_match.PendingQueries settling albums from
+earlier pages. Reported: searches made and the time spent matching. Every
+album must resolve to the id its own page ranks first.
+
+Usage:
+  python benchmarks/bench_matching.py --queries 2000 --results 12 --pending 8 --siblings 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import album_match  # noqa: E402
+from fixtures import melon_search_page  # noqa: E402
+from html_extract import SearchCandidate, get_extractor  # noqa: E402
+
+
+def legacy_normalize(text: str) -> str:
+    text = (text or "").strip().lower()
+    text = re.sub(r"\s+", " ", text)
+    return text
+
+
+def legacy_compact(text: str) -> str:
+    return re.sub(r"[^0-9a-z가-힣]", "", legacy_normalize(text))
+
+
+def legacy_score_candidate(query_artist: str, query_album: str, cand_artist: str, cand_album: str) -> int:
+    qa = legacy_compact(query_artist)
+    qal = legacy_compact(query_album)
+    ca = legacy_compact(cand_artist)
+    cal = legacy_compact(cand_album)
+
+    score = 0
+    if qal and cal == qal:
+        score += 12
+    elif qal and qal in cal:
+        score += 8
+    elif qal and cal in qal:
+        score += 4
+
+    if qa and ca == qa:
+        score += 8
+    elif qa and qa in ca:
+        score += 4
+
+    q_tokens = set(legacy_normalize(query_album).split())
+    c_tokens = set(legacy_normalize(cand_album).split())
+    if q_tokens and c_tokens:
+        overlap = len(q_tokens & c_tokens)
+        score += overlap
+
+    return score
+
+
+def legacy_rank(artist: str, album: str, candidates: List[SearchCandidate]) -> List[Tuple[int, str]]:
+    scored = [(legacy_score_candidate(artist, album, c.artist, c.album), c.album_id) for c in candidates]
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored
+
+
+def make_queries(count: int, seed: int = 0) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    suffixes = ["", " OST", " Part.2", " (Deluxe)", " Vol. 3", " - Single", " Remastered"]
+    queries = []
+    for i in range(count):
+        artist = rng.choice([f"Artist{i % 400}", f"아티스트 {i % 300}", f"The Band {i % 250}"])
+        album = f"{rng.choice(['Love', '봄날', 'Night Drive', '여름밤', 'Blue Hour'])} {i}{rng.choice(suffixes)}"
+        queries.append((artist, album))
+    return queries
+
+
+def catalog_pages(
+    queries: List[Tuple[str, str]], pages: Dict[Tuple[str, str], List[SearchCandidate]], siblings: int
+) -> Dict[Tuple[str, str], List[SearchCandidate]]:
+    """Each query's page led by the album itself and `siblings` other albums of its artist."""
+    by_artist: Dict[str, List[Tuple[str, str]]] = {}
+    for q in queries:
+        by_artist.setdefault(q[0], []).append(q)
+    run_pages = {}
+    for q in queries:
+        albums = by_artist[q[0]]
+        start = albums.index(q)
+        listed = [albums[(start + k) % len(albums)] for k in range(min(len(albums), siblings + 1))]
+        run_pages[q] = [SearchCandidate(f"id:{a}|{b}", b, a) for a, b in listed] + pages[q]
+    return run_pages
+
+
+def catalog_run(queries: List[Tuple[str, str]], run_pages: Dict[Tuple[str, str], List[SearchCandidate]], use_pending: bool) -> Tuple[Dict, int]:
+    """(album id per query, searches made), looking the queries up in order like find_album_id."""
+    pending = album_match.PendingQueries(queries if use_pending else ())
+    ids, searches = {}, 0
+    for artist, album in queries:
+        settled = pending.claim(artist, album)
+        if settled is not None:
+            ids[(artist, album)] = settled.candidate.album_id
+            continue
+        searches += 1
+        candidates = run_pages[(artist, album)]
+        pending.observe(candidates)
+        ids[(artist, album)] = album_match.rank(artist, album, candidates)[0].candidate.album_id
+    return ids, searches
+
+
+def timed(fn) -> Tuple[float, object]:
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--results", type=int, default=12)
+    parser.add_argument("--pending", type=int, default=8, help="Other pending queries matched against each page")
+    parser.add_argument("--siblings", type=int, default=3, help="Other albums of the artist listed on each page in the catalog run")
+    args = parser.parse_args()
+
+    extractor = get_extractor("regex")
+    queries = make_queries(args.queries)
+    pages: Dict[Tuple[str, str], List[SearchCandidate]] = {
+        q: extractor.melon_search(melon_search_page(f"{q[0]} {q[1]}", results=args.results).decode("utf-8")) for q in queries
+    }
+    pending = {q: [queries[(i + k) % len(queries)] for k in range(args.pending + 1)] for i, q in enumerate(queries)}
+    pairs_rank = sum(len(c) for c in pages.values())
+    pairs_page = pairs_rank * (args.pending + 1)
+
+    def legacy_rank_all():
+        return {q: legacy_rank(q[0], q[1], pages[q]) for q in queries}
+
+    def new_rank_all():
+        return {q: [(m.score, m.candidate.album_id) for m in album_match.rank(q[0], q[1], pages[q])] for q in queries}
+
+    def legacy_page_all():
+        return {q: {p: legacy_rank(p[0], p[1], pages[q]) for p in pending[q]} for q in queries}
+
+    def new_page_all():
+        return {
+            q: {p: [(m.score, m.candidate.album_id) for m in ms] for p, ms in album_match.match_page(pending[q], pages[q]).items()}
+            for q in queries
+        }
+
+    album_match.match_key.cache_clear()
+    rows = []
+    t_legacy, legacy = timed(legacy_rank_all)
+    t_new, new = timed(new_rank_all)
+    if legacy != new:
+        sys.exit("rank: album_match disagrees with the legacy scorer")
+    rows.append(("rank", pairs_rank, t_legacy, t_new))
+
+    t_legacy, legacy = timed(legacy_page_all)
+    t_new, new = timed(new_page_all)
+    if legacy != new:
+        sys.exit("page x Q: album_match disagrees with the legacy scorer")
+    rows.append((f"page x {args.pending + 1}", pairs_page, t_legacy, t_new))
+
+    t_legacy, _ = timed(legacy_rank_all)
+    t_new, _ = timed(new_rank_all)
+    rows.append(("rescan", pairs_rank, t_legacy, t_new))
+
+    print(f"queries={len(queries)} candidates/page={args.results} key cache={album_match.match_key.cache_info().currsize}")
+    print(f"{'workload':<12}{'pairs':>9}{'legacy ms':>11}{'new ms':>9}{'pairs/s new':>14}{'speedup':>9}")
+    for label, pairs, legacy_s, new_s in rows:
+        print(f"{label:<12}{pairs:>9}{legacy_s * 1000:>11.1f}{new_s * 1000:>9.1f}{pairs / new_s:>14,.0f}{legacy_s / new_s:>8.1f}x")
+
+    run_pages = catalog_pages(queries, pages, args.siblings)
+    print(f"catalog run, {args.siblings} sibling albums per page:")
+    print(f"{'':<12}{'searches':>9}{'match ms':>10}")
+    expected = None
+    for label, use_pending in (("per album", False), ("pending", True)):
+        t, (ids, searches) = timed(lambda: catalog_run(queries, run_pages, use_pending))
+        if expected is None:
+            expected = ids
+        elif ids != expected:
+            sys.exit("catalog run: a settled album differs from its own search")
+        print(f"{label:<12}{searches:>9}{t * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Measure what the frontend downloads for the media map as the catalog grows.
+
+For each catalog size a synthetic media map is written both ways:
+  - legacy:  portfolio_media_map.json (indent=2), fetched whole before render
+  - sharded: manifest + per-artist shards from enrich_media.write_media_shards
+and the script reports bytes (raw / gzip) and JSON parse time for what the
+first screen needs (legacy: everything; sharded: the manifest) plus the
+largest single shard an artist page pulls in.
+
+Usage:
+  python benchmarks/bench_media_shards.py --sizes 100,1000,5000 --songs-per-artist 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import enrich_media  # noqa: E402
+
+
+def synthetic_items(count: int, songs_per_artist: int):
+    items = []
+    for i in range(count):
+        artist, album, title = f"Artist {i // songs_per_artist}", f"Album {i // 4}", f"Track {i}"
+        video_id = f"{i:011d}"
+        items.append(
+            {
+                "artist": artist,
+                "album": album,
+                "title": title,
+                "work": "믹스",
+                "note": "",
+                "key": enrich_media.make_key(artist, album, title),
+                "youtube_id": video_id,
+                "youtube_title": f"{artist} - {title} (Official MV)",
+                "youtube_url": f"https://www.youtube.com/watch?v={video_id}",
+                "youtube_thumbnail": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
+                "cover_url": f"https://is1-ssl.mzstatic.com/image/thumb/Music/{i}/600x600bb.jpg",
+            }
+        )
+    return items
+
+
+def parse_ms(data: bytes, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        json.loads(data)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,5000")
+    parser.add_argument("--songs-per-artist", type=int, default=12)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} {'legacy KB':>10} {'gz':>7} {'parse ms':>9} | {'manifest KB':>11} {'gz':>6} {'parse ms':>9} | {'max shard KB':>12} {'shards':>7}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        items = synthetic_items(size, args.songs_per_artist)
+        legacy = json.dumps({"generated_at": "", "count": size, "items": items}, ensure_ascii=False, indent=2).encode("utf-8")
+        with tempfile.TemporaryDirectory() as tmp:
+            enrich_media.SHARD_DIR = Path(tmp) / "media"
+            enrich_media.MANIFEST_PATH = Path(tmp) / "portfolio_media_manifest.json"
+            shards = enrich_media.write_media_shards(items, "")
+            manifest = enrich_media.MANIFEST_PATH.read_bytes()
+            largest = max(len((Path(tmp) / path).read_bytes()) for path in shards.values())
+        print(
+            f"{size:>8} {len(legacy) / 1024:>10.1f} {len(gzip.compress(legacy)) / 1024:>7.1f} {parse_ms(legacy):>9.2f} | "
+            f"{len(manifest) / 1024:>11.1f} {len(gzip.compress(manifest)) / 1024:>6.1f} {parse_ms(manifest):>9.3f} | "
+            f"{largest / 1024:>12.1f} {len(shards):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+YouTube oEmbed lookups for the media matcher: the old inline loop vs
+OEmbedResolver.
+
+A synthetic catalog of `--albums` albums where `--youtube-share` of the rows
+link one of `--videos` videos is matched against the local provider
+stand-in, which reports `--missing-share` of the videos as deleted (404).
+Each strategy runs twice, as two consecutive enrich_media runs would:
+
+  inline     the old fetch_youtube_oembed per row (copied verbatim), memoized
+             for the run only
+  batch xN   OEmbedResolver with `--workers` workers and a state file
+
+Both must give every row the same YouTube fields.
+
+Usage:
+  python benchmarks/bench_oembed.py --albums 400 --videos 300 --workers 8 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import quote_plus
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import enrich_media  # noqa: E402
+import fixtures as fx  # noqa: E402
+from http_cache import fetch  # noqa: E402
+from oembed_resolver import OEmbedResolver  # noqa: E402
+from provider_server import ProviderServer, pointed_at  # noqa: E402
+from rate_limit import HostPacers  # noqa: E402
+
+
+def legacy_fetch_youtube_oembed(youtube_url: str) -> Dict[str, str]:
+    canonical = enrich_media.to_canonical_youtube_url(youtube_url)
+    if not canonical:
+        return {}
+    try:
+        url = enrich_media.OEMBED_URL.format(url=quote_plus(canonical))
+        resp = fetch(None, url, endpoint="youtube_oembed", cache=None, timeout=15, pacer=enrich_media.PACERS.for_url(url), retry=enrich_media.RETRY)
+        if resp.status_code != 200:
+            return {}
+        data = resp.json()
+        video_id = enrich_media.extract_youtube_id(canonical)
+        return {
+            "youtube_id": video_id,
+            "youtube_title": data.get("title") or "",
+            "youtube_url": canonical,
+            "youtube_thumbnail": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg" if video_id else "",
+        }
+    except Exception:
+        return {}
+
+
+def catalog_urls(path: Path) -> List[str]:
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        return [row["YoutubeURL"] for row in csv.DictReader(f) if row["YoutubeURL"]]
+
+
+def run_inline(urls: List[str]) -> List[Dict[str, str]]:
+    cache: Dict[str, Dict[str, str]] = {}
+    results = []
+    for url in urls:
+        canonical = enrich_media.to_canonical_youtube_url(url)
+        if canonical not in cache:
+            cache[canonical] = legacy_fetch_youtube_oembed(url)
+        results.append(cache[canonical])
+    return results
+
+
+def run_batch(urls: List[str], state_path: Path, workers: int) -> List[Dict[str, str]]:
+    video_ids = [enrich_media.extract_youtube_id(url) for url in urls]
+    with OEmbedResolver(enrich_media.youtube_oembed_title, state_path=state_path, workers=workers) as resolver:
+        titles = resolver.resolve(video_ids)
+    return [enrich_media.oembed_youtube_fields(video_id, titles) for video_id in video_ids]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--albums", type=int, default=400)
+    parser.add_argument("--videos", type=int, default=300, help="Distinct videos the rows link")
+    parser.add_argument("--youtube-share", type=float, default=0.6)
+    parser.add_argument("--missing-share", type=float, default=0.15, help="Share of videos oEmbed reports as deleted")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    fx.YOUTUBE_MISSING_SHARE = args.missing_share
+    enrich_media.HTTP_CACHE = None
+    enrich_media.PACERS = HostPacers(0.0, max_in_flight=args.workers)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = Path(tmp) / "catalog.csv"
+        fx.write_catalog(catalog, args.albums, rows_per_album=2, youtube_share=args.youtube_share, videos=args.videos)
+        urls = catalog_urls(catalog)
+        state_path = Path(tmp) / "oembed_state.json"
+
+        with ProviderServer(latency=args.latency) as server, pointed_at(server):
+            baseline = None
+            for label, run in (("inline", lambda: run_inline(urls)), (f"batch x{args.workers}", lambda: run_batch(urls, state_path, args.workers))):
+                for attempt in ("cold", "re-run"):
+                    server.reset_stats()
+                    t0 = time.perf_counter()
+                    fields = run()
+                    elapsed = time.perf_counter() - t0
+                    if baseline is None:
+                        baseline = fields
+                    elif fields != baseline:
+                        sys.exit(f"{label} {attempt}: YouTube fields differ from the inline loop")
+                    rows.append((f"{label} {attempt}", elapsed, sum(server.requests.values())))
+
+    distinct = len({enrich_media.extract_youtube_id(url) for url in urls})
+    found = sum(1 for yt in baseline if yt)
+    print(f"rows with video={len(urls)} distinct videos={distinct} found={found} missing_share={args.missing_share:g} latency={args.latency * 1000:.0f}ms")
+    print(f"{'strategy':<18}{'seconds':>9}{'requests':>10}{'speedup':>9}")
+    for label, seconds, requests_made in rows:
+        print(f"{label:<18}{seconds:>9.2f}{requests_made:>10}{rows[0][1] / max(seconds, 1e-6):>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Nightly tonestudio crawl: every page fetched and parsed vs PageState.
+
+`--years` year pages are crawled from the local provider stand-in with
+crawler.crawl_years (`--workers` workers). Scenarios, in order:
+
+  no state        the old behaviour: every page downloaded and parsed
+  cold            PageState, empty state file
+  nightly         nothing changed (the server answers 304 from the ETag)
+  1 page edited   the newest year's page changed
+  no ETag         a server that never answers 304, after one crawl to fill
+                  its state and an edit of the newest page: unchanged pages
+                  are downloaded but matched by body hash
+
+The default is one worker: with more, crawl_years also races the other
+candidate URLs of each year, which point at the real site.
+
+Reported per scenario: wall time, the crawling thread's CPU time (the
+parsing; only meaningful with one worker), requests, body bytes sent, and
+how many pages were parsed / reused. Every scenario must return exactly what a crawl
+without state returns for the same pages.
+
+Usage:
+  python benchmarks/bench_page_state.py --years 16 --latency 0.05 --workers 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import crawler  # noqa: E402
+import fixtures as fx  # noqa: E402
+from provider_server import ProviderServer, tonestudio_url  # noqa: E402
+
+
+def crawl(server: ProviderServer, years: List[int], workers: int, state=None) -> tuple:
+    server.reset_stats()
+    t0, cpu0 = time.perf_counter(), time.thread_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        songs = crawler.crawl_years(tonestudio_url(server.base_url, 2024), years, workers, state=state)
+    return songs, time.perf_counter() - t0, time.thread_time() - cpu0, sum(server.requests.values()), server.bytes_sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=16, help="Year pages, ending with 2025")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    years = list(range(2026 - args.years, 2026))
+    newest = years[-1]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp, ProviderServer(latency=args.latency) as server, ProviderServer(latency=args.latency, etags=False) as plain:
+        state_path = str(Path(tmp) / "tonestudio_page_state.json")
+        scenarios = [
+            ("no state", server, None, False),
+            ("cold", server, None, False),
+            ("nightly", server, None, False),
+            ("1 page edited", server, 1, False),
+            ("no ETag", plain, 2, True),
+        ]
+        for label, target, revision, prime in scenarios:
+            if prime:
+                crawl(target, years, args.workers, crawler.PageState(state_path))
+            if revision is not None:
+                fx.TONESTUDIO_REVISIONS[newest] = revision
+            expected, *_ = crawl(target, years, args.workers)
+            state = crawler.PageState(state_path) if label != "no state" else None
+            songs, seconds, cpu, requests_made, sent = crawl(target, years, args.workers, state)
+            if songs != expected:
+                sys.exit(f"{label}: credits differ from a crawl without state")
+            stats = state.stats if state is not None else {"parsed": len(years)}
+            reused = stats.get("not_modified", 0) + stats.get("unchanged", 0)
+            rows.append((label, seconds, cpu, requests_made, sent, stats.get("parsed", 0), reused))
+
+    print(f"years={len(years)} latency={args.latency * 1000:.0f}ms workers={args.workers}")
+    print(f"{'scenario':<15}{'seconds':>9}{'CPU ms':>8}{'requests':>10}{'KB sent':>10}{'parsed':>8}{'reused':>8}")
+    for label, seconds, cpu, requests_made, sent, parsed, reused in rows:
+        print(f"{label:<15}{seconds:>9.2f}{cpu * 1000:>8.0f}{requests_made:>10}{sent / 1024:>10.0f}{parsed:>8}{reused:>8}")
+
+
+if __name__ == "__main__":
+    main()
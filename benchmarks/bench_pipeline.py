@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark against the local provider stand-in.
+
+Starts benchmarks/provider_server.py, then runs each stage in its own
+subprocess (so peak RSS is per stage) against a synthetic catalog:
+
+  enrich    enrich_melon_metadata.enrich_csv      (Melon search/album, Bugs fallback)
+  priority  update_priority_from_melon.update_priorities
+  media     enrich_media.build_matches             (oEmbed + iTunes; yt-dlp search off)
+  crawl     crawler.crawl_tonestudio_page          (one page per year)
+
+For every stage it reports units/sec (albums, or pages for crawl), HTTP
+requests per unit, client-observed p50/p99 request latency, non-200
+responses and peak RSS. No response cache is used, so every run measures
+the network path.
+
+Usage:
+  python benchmarks/bench_pipeline.py --albums 100 --latency 0.02
+  python benchmarks/bench_pipeline.py --stages enrich --concurrency 4 --error-rate 0.02 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fixtures as fx  # noqa: E402
+from provider_server import ProviderServer, pointed_at, tonestudio_url  # noqa: E402
+
+STAGES = ["enrich", "priority", "media", "crawl"]
+
+
+class RequestRecorder:
+    """Times every HTTP round trip made through requests' HTTPAdapter."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def installed(self):
+        from requests.adapters import HTTPAdapter
+
+        original = HTTPAdapter.send
+        recorder = self
+
+        def send(adapter, request, **kwargs):
+            t0 = time.perf_counter()
+            resp = original(adapter, request, **kwargs)
+            elapsed = time.perf_counter() - t0
+            with recorder._lock:
+                recorder.latencies.append(elapsed)
+                recorder.statuses[resp.status_code] = recorder.statuses.get(resp.status_code, 0) + 1
+            return resp
+
+        HTTPAdapter.send = send
+        try:
+            yield self
+        finally:
+            HTTPAdapter.send = original
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_stage(stage: str, args: argparse.Namespace) -> Dict[str, object]:
+    workdir = Path(args.workdir)
+    catalog = workdir / "catalog.csv"
+    if not catalog.exists():
+        fx.write_catalog(catalog, args.albums, args.rows_per_album)
+
+    recorder = RequestRecorder()
+    sink = io.StringIO()
+    with recorder.installed(), pointed_at(args.server), contextlib.redirect_stdout(sink):
+        t0 = time.perf_counter()
+        if stage == "enrich":
+            from enrich_melon_metadata import enrich_csv
+
+            enrich_csv(
+                catalog,
+                workdir / "enriched.csv",
+                fill_empty_genre=False,
+                sleep_seconds=args.sleep,
+                limit_albums=0,
+                concurrency=args.concurrency,
+                cache=None,
+                parser_backend=args.parser_backend,
+            )
+            units = args.albums
+        elif stage == "priority":
+            from update_priority_from_melon import update_priorities
+
+            update_priorities(catalog, workdir / "priority.csv", sleep_seconds=args.sleep, cache=None, parser_backend=args.parser_backend)
+            units = args.albums
+        elif stage == "media":
+            import enrich_media
+
+            enrich_media.CSV_PATH = catalog
+            enrich_media.MELON_CSV_PATH = workdir / "no_melon_fallbacks.csv"
+            enrich_media.OUTPUT_PATH = workdir / "no_existing_media.json"
+            enrich_media.ENABLE_YT_SEARCH = False
+            enrich_media.HTTP_CACHE = None
+            enrich_media.build_matches()
+            units = args.albums
+        elif stage == "crawl":
+            import crawler
+
+            session = crawler.make_session(4)
+            years = [2000 + i for i in range(args.pages)]
+            for year in years:
+                crawler.crawl_tonestudio_page(tonestudio_url(args.server, year), session=session)
+            units = len(years)
+        else:
+            raise ValueError(f"unknown stage: {stage}")
+        elapsed = time.perf_counter() - t0
+
+    requests_made = len(recorder.latencies)
+    return {
+        "stage": stage,
+        "units": units,
+        "unit": "pages" if stage == "crawl" else "albums",
+        "seconds": round(elapsed, 3),
+        "units_per_sec": round(units / elapsed, 2) if elapsed else 0.0,
+        "requests": requests_made,
+        "requests_per_unit": round(requests_made / units, 2) if units else 0.0,
+        "p50_ms": round(percentile(recorder.latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(recorder.latencies, 99) * 1000, 1),
+        "non_200": sum(n for status, n in recorder.statuses.items() if status != 200),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--albums", type=int, default=50)
+    parser.add_argument("--rows-per-album", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=5, help="Year pages fetched by the crawl stage")
+    parser.add_argument("--latency", type=float, default=0.01, help="Server-side delay per response (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--sleep", type=float, default=0.0, help="Client politeness sleep passed to the stages")
+    parser.add_argument("--concurrency", type=int, default=1, help="enrich_csv album concurrency")
+    parser.add_argument("--parser-backend", default="")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    # internal: run a single stage in this process
+    parser.add_argument("--run-stage", help=argparse.SUPPRESS)
+    parser.add_argument("--server", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        print(json.dumps(run_stage(args.run_stage, args)))
+        return
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir, ProviderServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status
+    ) as server:
+        fx.write_catalog(Path(workdir) / "catalog.csv", args.albums, args.rows_per_album)
+        passthrough = [
+            f"--albums={args.albums}",
+            f"--rows-per-album={args.rows_per_album}",
+            f"--pages={args.pages}",
+            f"--sleep={args.sleep}",
+            f"--concurrency={args.concurrency}",
+            f"--parser-backend={args.parser_backend}",
+        ]
+        for stage in stages:
+            server.reset_stats()
+            proc = subprocess.run(
+                [sys.executable, __file__, f"--run-stage={stage}", f"--server={server.base_url}", f"--workdir={workdir}", *passthrough],
+                capture_output=True,
+                text=True,
+                env={**os.environ, "HTTP_CACHE": "0"},
+            )
+            if proc.returncode != 0:
+                sys.stderr.write(proc.stderr)
+                sys.exit(f"stage {stage} failed")
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            result["server_requests"] = dict(server.requests)
+            result["server_errors"] = sum(server.errors.values())
+            results.append(result)
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False))
+        return
+
+    print(f"latency={args.latency * 1000:.0f}ms jitter={args.jitter * 1000:.0f}ms error_rate={args.error_rate:.1%} albums={args.albums}")
+    print(f"{'stage':<10}{'units':>8}{'units/s':>10}{'req/unit':>10}{'p50 ms':>9}{'p99 ms':>9}{'non-200':>9}{'rss MB':>9}")
+    for r in results:
+        print(
+            f"{r['stage']:<10}{r['units']:>8}{r['units_per_sec']:>10.2f}{r['requests_per_unit']:>10.2f}"
+            f"{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['non_200']:>9}{r['peak_rss_mb']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+pipeline.py against the local provider stand-in: what each kind of edit costs.
+
+A synthetic catalog of `--albums` albums goes through melon -> priority +
+media -> views in a temp directory, with a response cache there absorbing
+repeats as in a real run. Scenarios, in order:
+
+  cold xJ      first run with --jobs J (1 and `--jobs`, each from scratch)
+  no-op        nothing changed
+  note edit    one row's `note` changed
+  album edit   one row's album renamed
+
+Reported per scenario: wall time, requests to the server and each stage's
+action and time. The note edit must cost no requests, and a forced full run
+without the cache must then reproduce the refreshed outputs byte for byte
+(the media map up to its timestamp).
+
+Usage:
+  python benchmarks/bench_pipeline_dag.py --albums 40 --latency 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import build_views  # noqa: E402
+import enrich_media  # noqa: E402
+import fixtures as fx  # noqa: E402
+import pipeline  # noqa: E402
+from http_cache import ResponseCache  # noqa: E402
+from provider_server import ProviderServer, pointed_at  # noqa: E402
+
+
+def use_workdir(workdir: Path) -> None:
+    """Point every stage's files into `workdir`."""
+    enrich_media.CSV_PATH = workdir / "Portfolio_list.csv"
+    enrich_media.MELON_CSV_PATH = workdir / "Portfolio_list_with_melon.csv"
+    enrich_media.OUTPUT_PATH = workdir / "portfolio_media_map.json"
+    enrich_media.MANIFEST_PATH = workdir / "portfolio_media_manifest.json"
+    enrich_media.SHARD_DIR = workdir / "media"
+    enrich_media.IMAGE_INDEX_PATH = workdir / "portfolio_image_index.json"
+    enrich_media.OEMBED_STATE_PATH = workdir / "portfolio_oembed_state.json"
+    enrich_media.ENABLE_YT_SEARCH = False
+    build_views.VIEWS_PATH = workdir / "portfolio_views.json"
+    pipeline.PRIORITY_CSV_PATH = workdir / "Portfolio_list_with_priority.csv"
+
+
+def edit_catalog(path: Path, column: str, value: str, row_index: int = 0) -> None:
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames, rows = list(reader.fieldnames or []), list(reader)
+    rows[row_index][column] = value
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def outputs(workdir: Path) -> Dict[str, bytes]:
+    files = {name: (workdir / name).read_bytes() for name in ("Portfolio_list_with_melon.csv", "Portfolio_list_with_priority.csv")}
+    media = json.loads((workdir / "portfolio_media_map.json").read_text(encoding="utf-8"))
+    files["portfolio_media_map.json"] = json.dumps(media["items"], ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return files
+
+
+def run(server: ProviderServer, workdir: Path, jobs: int, force=(), cached: bool = True) -> tuple:
+    server.reset_stats()
+    cache = ResponseCache(workdir / "http_cache.sqlite") if cached else None
+    stages = pipeline.build_stages(cache, melon_sleep=0.02, priority_sleep=0.02)
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        outcomes = pipeline.run_pipeline(stages, workdir / "pipeline_state.json", jobs=jobs, force=force)
+    elapsed = time.perf_counter() - t0
+    actions = " ".join(f"{name}={outcome.action}({outcome.seconds:.1f}s)" for name, outcome in outcomes.items())
+    return elapsed, sum(server.requests.values()), actions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--albums", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jobs", type=int, default=2)
+    args = parser.parse_args()
+
+    rows: List[tuple] = []
+    with ProviderServer(latency=args.latency) as server, pointed_at(server), tempfile.TemporaryDirectory() as tmp:
+        for jobs in (1, args.jobs):
+            workdir = Path(tmp) / f"jobs{jobs}"
+            workdir.mkdir()
+            use_workdir(workdir)
+            fx.write_catalog(enrich_media.CSV_PATH, args.albums, rows_per_album=3, youtube_share=0.3)
+            rows.append((f"cold x{jobs}", *run(server, workdir, jobs)))
+
+        rows.append(("no-op", *run(server, workdir, args.jobs)))
+        edit_catalog(enrich_media.CSV_PATH, "note", "remastered")
+        rows.append(("note edit", *run(server, workdir, args.jobs)))
+        if rows[-1][2]:
+            sys.exit(f"note edit sent {rows[-1][2]} requests")
+        refreshed = outputs(workdir)
+        run(server, workdir, args.jobs, force=["all"], cached=False)
+        if outputs(workdir) != refreshed:
+            sys.exit("a forced full run disagrees with the refreshed outputs")
+        edit_catalog(enrich_media.CSV_PATH, "Album", "Renamed Album")
+        rows.append(("album edit", *run(server, workdir, args.jobs)))
+
+    print(f"albums={args.albums} rows={args.albums * 3} latency={args.latency * 1000:.0f}ms")
+    print(f"{'scenario':<12}{'seconds':>9}{'requests':>10}  stages")
+    for label, seconds, requests_made, actions in rows:
+        print(f"{label:<12}{seconds:>9.2f}{requests_made:>10}  {actions}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pre-network phase of update_priorities on a synthetic catalog.
+
+Compares the legacy per-album `next(...)` row scan (O(albums x rows)) with
+`index_album_rows`, both starting from the same CSV on disk. The legacy scan
+is too slow to run to completion on 200k rows, so it is timed on evenly
+spaced album samples and extrapolated.
+
+Usage:
+  python benchmarks/bench_priority_index.py --rows 200000 --rows-per-album 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from update_priority_from_melon import index_album_rows, normalize  # noqa: E402
+
+
+def write_catalog(path: Path, rows: int, rows_per_album: int, seed: int) -> None:
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["Artist", "Album", "Title", "Work", "note", "MelonAlbumId"])
+        writer.writeheader()
+        for i in range(rows):
+            album_no = i // rows_per_album
+            writer.writerow(
+                {
+                    "Artist": f"Artist {album_no % 997}",
+                    "Album": f"  Album  Title {album_no} ",
+                    "Title": f"Track {i % rows_per_album + 1}",
+                    "Work": rng.choice(["녹음", "믹스", "녹음, 믹스"]),
+                    "note": "",
+                    "MelonAlbumId": str(10_000_000 + album_no),
+                }
+            )
+
+
+def load_rows(path: Path):
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def legacy_keys(rows):
+    album_keys = []
+    seen = set()
+    for r in rows:
+        artist = (r.get("Artist") or "").strip()
+        album = (r.get("Album") or "").strip()
+        if not artist or not album:
+            continue
+        key = (normalize(artist), normalize(album))
+        if key in seen:
+            continue
+        seen.add(key)
+        album_keys.append(key)
+    return album_keys
+
+
+def legacy_sample(rows, key):
+    artist_n, album_n = key
+    return next(r for r in rows if normalize(r.get("Artist", "")) == artist_n and normalize(r.get("Album", "")) == album_n)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--rows-per-album", type=int, default=10)
+    parser.add_argument("--legacy-samples", type=int, default=200, help="Albums timed for the legacy extrapolation")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "catalog.csv"
+        write_catalog(csv_path, args.rows, args.rows_per_album, args.seed)
+
+        t0 = time.perf_counter()
+        rows = load_rows(csv_path)
+        load_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    groups, _ = index_album_rows(rows)
+    samples = [rows[positions[0]] for positions in groups.values()]
+    indexed_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    album_keys = legacy_keys(rows)
+    legacy_key_s = time.perf_counter() - t0
+
+    step = max(1, len(album_keys) // args.legacy_samples)
+    probe = album_keys[::step]
+    t0 = time.perf_counter()
+    for key in probe:
+        legacy_sample(rows, key)
+    per_album = (time.perf_counter() - t0) / len(probe)
+    legacy_s = legacy_key_s + per_album * len(album_keys)
+
+    assert list(groups) == album_keys
+    assert all(legacy_sample(rows, key) is sample for key, sample in zip(probe, samples[::step]))
+
+    print(f"rows={len(rows)} albums={len(album_keys)} csv_load={load_s:.2f}s (shared by both)")
+    print(f"legacy next() scan : {legacy_s:9.2f}s (extrapolated from {len(probe)} albums)")
+    print(f"index_album_rows   : {indexed_s:9.3f}s")
+    print(f"speedup            : {legacy_s / indexed_s:9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Album lookups against a throttling provider: fixed sleeps vs adaptive pacing.
+
+The local provider stand-in accepts `--capacity` requests/s (a token bucket
+of `--burst`) and answers anything beyond it with 429 + Retry-After; on top
+of that `--error-rate` of requests get a 503. `--albums` distinct albums are
+looked up through MelonClient (search + album page) by `--concurrency`
+threads, once per strategy:
+
+  fixed        the old HostThrottle at --sleep, no retries
+  fixed-fast   the old HostThrottle at --fast-sleep, no retries
+  adaptive     AdaptivePacer starting at --sleep (floor --min-sleep) with
+               RetryPolicy(--retries)
+
+Reported per strategy: wall time, albums/s, lookups lost (search raised or
+album page came back as "error"), requests sent and 429s received.
+
+Usage:
+  python benchmarks/bench_rate_limit.py --albums 60 --capacity 6 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from enrich_melon_metadata import MelonClient  # noqa: E402
+from provider_server import ProviderServer, pointed_at  # noqa: E402
+from rate_limit import AdaptivePacer, RetryPolicy  # noqa: E402
+
+
+class LegacyThrottle:
+    """HostThrottle as it was before rate_limit: fixed spacing, no feedback."""
+
+    def __init__(self, interval: float, max_in_flight: int = 2):
+        self.interval = interval
+        self._slots = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self._slots.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            self._slots.release()
+
+    def record(self, status: Optional[int], retry_after: Optional[float] = None, sent_at: Optional[float] = None) -> None:
+        pass
+
+
+def albums(count: int) -> List[Tuple[str, str]]:
+    return [(f"Artist{i % 37}", f"Album {i}") for i in range(count)]
+
+
+def lookup(client: MelonClient, artist: str, album: str) -> bool:
+    """True when the album resolved without a lost request."""
+    try:
+        album_id, _, _ = client.find_album_id(artist, album)
+    except Exception:
+        return False
+    return client.fetch_album_meta(album_id).status != "error"
+
+
+def run(server: ProviderServer, client: MelonClient, queries: List[Tuple[str, str]], concurrency: int) -> dict:
+    server.reset_stats()
+    # let the server's bucket refill between strategies
+    time.sleep(server.burst / server.capacity if server.capacity else 0)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        ok = list(pool.map(lambda q: lookup(client, *q), queries))
+    elapsed = time.perf_counter() - t0
+    return {
+        "seconds": elapsed,
+        "lost": ok.count(False),
+        "requests": sum(server.requests.values()),
+        "throttled": sum(server.throttled.values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--albums", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--capacity", type=float, default=6.0, help="Requests/s the server accepts")
+    parser.add_argument("--burst", type=float, default=3.0)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Share of random 503s")
+    parser.add_argument("--sleep", type=float, default=0.45, help="Fixed spacing / adaptive starting spacing")
+    parser.add_argument("--fast-sleep", type=float, default=0.1)
+    parser.add_argument("--min-sleep", type=float, default=0.05)
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args()
+
+    queries = albums(args.albums)
+    strategies = [
+        ("fixed", lambda: (LegacyThrottle(args.sleep, args.concurrency), RetryPolicy(max_retries=0))),
+        ("fixed-fast", lambda: (LegacyThrottle(args.fast_sleep, args.concurrency), RetryPolicy(max_retries=0))),
+        (
+            "adaptive",
+            lambda: (
+                AdaptivePacer(args.sleep, min_interval=args.min_sleep, max_in_flight=args.concurrency),
+                RetryPolicy(max_retries=args.retries, seed=0),
+            ),
+        ),
+    ]
+    results = []
+    with ProviderServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=503,
+        capacity=args.capacity,
+        burst=args.burst,
+    ) as server, pointed_at(server):
+        for name, build in strategies:
+            pacer, retry = build()
+            client = MelonClient(sleep_seconds=args.sleep, pacer=pacer, retry=retry)
+            result = run(server, client, queries, args.concurrency)
+            results.append((name, result, f"{pacer.interval:.3f}"))
+
+    print(f"albums={len(queries)} capacity={args.capacity:g} req/s burst={args.burst:g} concurrency={args.concurrency} error_rate={args.error_rate:g}")
+    print(f"{'strategy':<12}{'seconds':>9}{'albums/s':>10}{'lost':>6}{'requests':>10}{'429s':>6}{'final interval':>16}")
+    for name, r, final in results:
+        print(f"{name:<12}{r['seconds']:>9.1f}{len(queries) / r['seconds']:>10.2f}{r['lost']:>6}{r['requests']:>10}{r['throttled']:>6}{final:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Peak memory of enrich_csv / update_priorities, default vs --stream mode.
+
+Each (stage, mode, catalog) combination runs in its own subprocess against
+the local provider stand-in, so peaks do not leak between runs. Reported:
+
+  heap MB   tracemalloc peak (Python allocations only, the clearest signal)
+  rss MB    ru_maxrss of the child (includes the interpreter and libraries)
+
+Catalogs are given as ALBUMSxROWS_PER_ALBUM. Growing rows at a fixed album
+count should leave the stream mode flat; growing albums moves both modes.
+The stream output must be byte-identical to the default output.
+
+Usage:
+  python benchmarks/bench_stream_memory.py --catalogs 50x20,50x1000,200x250
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import filecmp
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fixtures as fx  # noqa: E402
+from provider_server import ProviderServer, pointed_at  # noqa: E402
+
+STAGES = ["enrich", "priority"]
+MODES = ["default", "stream"]
+
+
+def run_child(stage: str, mode: str, catalog: Path, output: Path, server: str) -> dict:
+    stream = mode == "stream"
+    sink = io.StringIO()
+    tracemalloc.start()
+    with pointed_at(server), contextlib.redirect_stdout(sink):
+        if stage == "enrich":
+            from enrich_melon_metadata import enrich_csv
+
+            enrich_csv(catalog, output, fill_empty_genre=False, sleep_seconds=0.0, limit_albums=0, cache=None, stream=stream)
+        else:
+            from update_priority_from_melon import update_priorities
+
+            update_priorities(catalog, output, sleep_seconds=0.0, cache=None, stream=stream)
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    return {"heap_mb": heap_peak / 1024 / 1024, "rss_mb": rss_mb}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--catalogs", default="50x20,50x1000,200x250", help="Comma-separated ALBUMSxROWS_PER_ALBUM")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    # internal: one measurement in this process
+    parser.add_argument("--child", nargs=5, metavar=("STAGE", "MODE", "CATALOG", "OUTPUT", "SERVER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        stage, mode, catalog, output, server = args.child
+        print(json.dumps(run_child(stage, mode, Path(catalog), Path(output), server)))
+        return
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, ProviderServer() as server:
+        for spec in args.catalogs.split(","):
+            albums, per_album = (int(part) for part in spec.lower().split("x"))
+            catalog = Path(tmp) / f"catalog-{spec}.csv"
+            fx.write_catalog(catalog, albums, per_album)
+            for stage in stages:
+                outputs = {}
+                for mode in MODES:
+                    outputs[mode] = Path(tmp) / f"{stage}-{mode}-{spec}.csv"
+                    proc = subprocess.run(
+                        [sys.executable, __file__, "--child", stage, mode, str(catalog), str(outputs[mode]), server.base_url],
+                        capture_output=True,
+                        text=True,
+                        env={**os.environ, "HTTP_CACHE": "0"},
+                    )
+                    if proc.returncode != 0:
+                        sys.stderr.write(proc.stderr)
+                        sys.exit(f"{stage} {mode} {spec} failed")
+                    result = json.loads(proc.stdout.strip().splitlines()[-1])
+                    results.append({"stage": stage, "mode": mode, "albums": albums, "rows": albums * per_album, **result})
+                if not filecmp.cmp(outputs["default"], outputs["stream"], shallow=False):
+                    sys.exit(f"{stage} {spec}: stream output differs from the default output")
+
+    print(f"{'stage':<10}{'albums':>8}{'rows':>9}{'mode':>9}{'heap MB':>10}{'rss MB':>9}")
+    for r in results:
+        print(f"{r['stage']:<10}{r['albums']:>8}{r['rows']:>9}{r['mode']:>9}{r['heap_mb']:>10.1f}{r['rss_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Measure what precomputed views (build_views.py) save the frontend.
+
+For each catalog size a synthetic Portfolio_list.csv is written and
+portfolio_views.json built from it. script.js is then loaded under node
+(DOM stubbed out) twice:
+
+  csv    no portfolio_views.json: download the CSV, parse it, group it
+  views  portfolio_views.json present: parse the JSON, build songs from its
+         cells, expand the precomputed buckets
+
+and the script reports, per path, the bytes fetched (raw / gzip) next to
+the time to first render data, plus what a filter switch costs: regrouping
+every song (what script.js did on each switch before) vs looking up the
+precomputed buckets. Both paths must produce the same artists and views;
+the run exits non-zero otherwise.
+
+Needs `node` on PATH for the client-side timings.
+
+Usage:
+  python benchmarks/bench_views.py --sizes 100,1000,5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import build_views  # noqa: E402
+from enrich_media import minified_json  # noqa: E402
+
+FIELDS = ["Artist", "Album", "Title", "Work", "note", "Genre", "YoutubeURL", "priority", "MelonReleaseDate"]
+GENRES = ["발라드", "댄스", "인디음악", "록/메탈", "랩/힙합", "R&B/Soul", "POP", "국내드라마"]
+WORKS = ["녹음", "믹싱", "녹음, 튠", "방송 믹싱", "녹음, 믹싱, 튠"]
+
+NODE_SCRIPT = r"""
+const fs = require('fs'); const vm = require('vm'); const path = require('path');
+const [scriptPath, dir, rounds] = process.argv.slice(2);
+function load(noViews) {
+  const ctx = {
+    console, setTimeout, clearTimeout, Promise, Object, Array, Set, Map, JSON, Math, Number, String,
+    document: { addEventListener() {}, getElementById() { return null; }, querySelectorAll() { return []; } },
+    window: { history: { state: null }, addEventListener() {} },
+    fetch: async url => {
+      const p = path.join(dir, url.split('?')[0]);
+      if ((noViews && p.endsWith('portfolio_views.json')) || !fs.existsSync(p)) return { ok: false };
+      const body = fs.readFileSync(p, 'utf8');
+      return { ok: true, json: async () => JSON.parse(body), text: async () => body };
+    },
+  };
+  vm.createContext(ctx);
+  vm.runInContext(fs.readFileSync(scriptPath, 'utf8') + '\n;this.__eval = code => eval(code);', ctx);
+  return ctx.__eval;
+}
+const canon = v => Array.isArray(v) ? v.map(canon)
+  : (v && typeof v === 'object' ? Object.fromEntries(Object.keys(v).sort().map(k => [k, canon(v[k])])) : v);
+const snapshot = e => JSON.stringify(canon(e(`({
+  artists: Object.values(artistsData).map(a => ({ ...a, songs: a.songs.map(({ _mediaSource, ...s }) => s) })),
+  buckets: portfolioViews.buckets, cards: portfolioViews.categoryCards, priority: portfolioViews.priorityAlbums })`)));
+const best = fn => { let t = Infinity; for (let i = 0; i < Number(rounds); i++) { const t0 = process.hrtime.bigint(); fn(); t = Math.min(t, Number(process.hrtime.bigint() - t0) / 1e6); } return t; };
+(async () => {
+  const out = {};
+  for (const [name, noViews] of [['csv', true], ['views', false]]) {
+    let loadMs = Infinity, e;
+    for (let i = 0; i < Number(rounds); i++) {
+      e = load(noViews);
+      const t0 = process.hrtime.bigint();
+      await e('loadPortfolioData()');
+      loadMs = Math.min(loadMs, Number(process.hrtime.bigint() - t0) / 1e6);
+    }
+    out[name] = { load_ms: loadMs, snapshot: snapshot(e) };
+    if (noViews) {
+      out.regroup_ms = best(() => e('computePortfolioViews()'));
+    } else {
+      out.lookup_ms = best(() => e(`['genre', 'year', 'category'].forEach(mode => getViewBuckets(mode).forEach(b => getSongsByIds(b.songIds.slice(0, 4))))`));
+    }
+  }
+  out.identical = out.csv.snapshot === out.views.snapshot;
+  delete out.csv.snapshot; delete out.views.snapshot;
+  console.log(JSON.stringify(out));
+})();
+"""
+
+
+def write_catalog(path: Path, rows: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for i in range(rows):
+            album_no = i // 3
+            writer.writerow(
+                {
+                    "Artist": f"Artist {album_no % max(1, rows // 30)}",
+                    "Album": f"Album {album_no}",
+                    "Title": rng.choice(["전곡", f"Track {i}", f"Track {i}", "1, 2, 3"]),
+                    "Work": rng.choice(WORKS),
+                    "note": "",
+                    "Genre": ", ".join(rng.sample(GENRES, rng.randint(1, 2))),
+                    "YoutubeURL": f"https://youtu.be/{i:011d}" if rng.random() < 0.3 else "",
+                    "priority": rng.choice(["", "", "2", "5"]),
+                    "MelonReleaseDate": f"{rng.randint(2008, 2026)}.0{rng.randint(1, 9)}.1{rng.randint(0, 9)}" if rng.random() < 0.9 else "",
+                }
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,5000", help="Comma-separated catalog row counts")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    node = shutil.which("node")
+    if node is None:
+        print("node not found; only sizes are reported")
+
+    identical = True
+    print(f"{'':>6}{'---------- csv ----------':>27}{'--------- views ---------':>27}")
+    print(f"{'rows':>6}{'KB':>9}{'gz KB':>8}{'load ms':>10}{'KB':>9}{'gz KB':>8}{'load ms':>10}"
+          f"{'build ms':>10}{'regroup ms':>12}{'lookup ms':>11}")
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            csv_path = tmp_path / "Portfolio_list.csv"
+            write_catalog(csv_path, size)
+            t0 = time.perf_counter()
+            data = minified_json(build_views.build_views(csv_path))
+            build_ms = (time.perf_counter() - t0) * 1000
+            (tmp_path / build_views.VIEWS_PATH.name).write_bytes(data)
+            csv_bytes = csv_path.read_bytes()
+
+            csv_load = views_load = regroup = lookup = "-"
+            if node is not None:
+                script = tmp_path / "bench.js"
+                script.write_text(NODE_SCRIPT, encoding="utf-8")
+                proc = subprocess.run(
+                    [node, str(script), str(ROOT / "script.js"), tmp, str(args.rounds)],
+                    capture_output=True, text=True, check=True,
+                )
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                identical = identical and r["identical"]
+                csv_load, views_load = f"{r['csv']['load_ms']:.1f}", f"{r['views']['load_ms']:.1f}"
+                regroup, lookup = f"{r['regroup_ms']:.2f}", f"{r['lookup_ms']:.3f}"
+
+            print(f"{size:>6}{len(csv_bytes) / 1024:>9.1f}{len(gzip.compress(csv_bytes)) / 1024:>8.1f}{csv_load:>10}"
+                  f"{len(data) / 1024:>9.1f}{len(gzip.compress(data)) / 1024:>8.1f}{views_load:>10}"
+                  f"{build_ms:>10.1f}{regroup:>12}{lookup:>11}")
+
+    if node is not None:
+        print(f"identical={'yes' if identical else 'NO'}")
+        if not identical:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
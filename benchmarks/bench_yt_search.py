@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare YouTube search strategies for the rows enrich_media cannot match.
+
+The queries are the ones build_matches would send for the real
+Portfolio_list.csv (rows without a YouTube URL), repeated `--repeat` times
+to model a larger catalog. Each strategy answers them with the same stub
+results:
+
+  subprocess   one fake yt-dlp process per row, serial (the old run_yt_search)
+  pool x1      SearchPool, one warm extractor
+  pool xN      SearchPool, `--workers` warm extractors
+
+`--startup` is the per-extractor init cost (a real yt-dlp spends it importing
+and registering extractors) and `--latency` the per-search round trip.
+Every strategy must return identical matches.
+
+Usage:
+  python benchmarks/bench_yt_search.py --workers 8 --latency 0.15 --startup 0.4
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import enrich_media  # noqa: E402
+from youtube_search import SearchPool, StubExtractor, YtDlpCliExtractor, info_to_match, query_key  # noqa: E402
+
+FAKE_YTDLP = Path(__file__).resolve().parent / "fake_ytdlp.py"
+
+
+def catalog_queries(csv_path: Path) -> List[str]:
+    queries = []
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+        for raw in csv.DictReader(f):
+            artist = (raw.get("Artist") or "").strip()
+            title = (raw.get("Title") or "").strip()
+            youtube_url = (raw.get("YoutubeURL") or raw.get("YouTubeURL") or raw.get("youtube_url") or "").strip()
+            if not artist or youtube_url or enrich_media.is_youtube_url(title):
+                continue
+            queries.append(enrich_media.youtube_search_query(artist, (raw.get("Album") or "").strip(), title))
+    return queries
+
+
+def run_subprocess(queries: List[str]) -> List[Dict[str, str]]:
+    extractor = YtDlpCliExtractor(command=[sys.executable, str(FAKE_YTDLP)])
+    return [info_to_match(extractor.search(query)) for query in queries]
+
+
+def run_pool(queries: List[str], workers: int, latency: float, startup: float) -> List[Dict[str, str]]:
+    with SearchPool(lambda: StubExtractor(latency=latency, startup=startup), workers=workers) as pool:
+        futures = [pool.submit(query) for query in queries]
+        return [future.result() for future in futures]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", type=Path, default=enrich_media.CSV_PATH)
+    parser.add_argument("--repeat", type=int, default=1, help="Distinct copies of the query set (suffix-numbered)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--startup", type=float, default=0.4)
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N queries for the subprocess run (it is slow)")
+    args = parser.parse_args()
+
+    base = catalog_queries(args.csv)
+    queries = [q if copy == 0 else f"{q} {copy}" for copy in range(args.repeat) for q in base]
+    unique = len({query_key(q) for q in queries})
+    os.environ["FAKE_YTDLP_LATENCY"] = str(args.latency)
+    os.environ["FAKE_YTDLP_STARTUP"] = str(args.startup)
+
+    sub_queries = queries[: args.limit] if args.limit else queries
+    results = []
+    t0 = time.perf_counter()
+    baseline = run_subprocess(sub_queries)
+    results.append(("subprocess", len(sub_queries), time.perf_counter() - t0))
+
+    for workers in (1, args.workers):
+        t0 = time.perf_counter()
+        matches = run_pool(queries, workers, args.latency, args.startup)
+        results.append((f"pool x{workers}", len(queries), time.perf_counter() - t0))
+        if matches[: len(baseline)] != baseline:
+            sys.exit(f"pool x{workers} returned different matches than the subprocess run")
+
+    print(f"queries={len(queries)} unique={unique} latency={args.latency * 1000:.0f}ms startup={args.startup * 1000:.0f}ms")
+    print(f"{'strategy':<12}{'queries':>9}{'seconds':>10}{'ms/query':>10}")
+    for label, count, seconds in results:
+        print(f"{label:<12}{count:>9}{seconds:>10.2f}{seconds / count * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Minimal `yt-dlp --dump-json ytsearch1:<query>` stand-in for bench_yt_search.py.
+
+Answers with youtube_search.StubExtractor, after sleeping FAKE_YTDLP_STARTUP
+seconds (extractor registration) and FAKE_YTDLP_LATENCY seconds (the search
+round trip), so each call costs what a real per-row subprocess would.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from youtube_search import StubExtractor  # noqa: E402
+
+
+def main() -> int:
+    target = sys.argv[-1]
+    if not target.startswith("ytsearch1:"):
+        return 2
+    extractor = StubExtractor(
+        latency=float(os.getenv("FAKE_YTDLP_LATENCY", "0")),
+        startup=float(os.getenv("FAKE_YTDLP_STARTUP", "0")),
+    )
+    info = extractor.search(target[len("ytsearch1:"):])
+    if info is None:
+        return 1
+    print(json.dumps(info, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+Fixture pages for the offline benchmarks.
+
+Real pages saved under benchmarks/fixtures/<kind>/*.html are used when
+present (e.g. `curl -o benchmarks/fixtures/tonestudio/d-2019.html ...`).
+Otherwise deterministic synthetic pages with the same markup structure the
+parsers rely on are generated, so every benchmark runs without network
+access.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import random
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Optional
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+
+ENGINEERS = ["양하정", "김민수", "박지훈", "이서연", "최도윤", "정하늘"]
+ROLE_SETS = ["[REC]", "[MIX]", "[REC, MIX]", "[REC, MIX, MA]", "[MIX, MA]", "[MA]"]
+# year -> revision of its synthetic tonestudio page; bump one to "edit" that page
+TONESTUDIO_REVISIONS: Dict[int, int] = {}
+
+
+def saved_pages(kind: str) -> Dict[str, bytes]:
+    folder = FIXTURE_DIR / kind
+    if not folder.is_dir():
+        return {}
+    return {path.stem: path.read_bytes() for path in sorted(folder.glob("*.html"))}
+
+
+def tonestudio_year_page(year: int, credits: int = 600, seed: int = 0) -> bytes:
+    """A WordPress-style year page: month groups of one-credit-per-<p> lines."""
+    rng = random.Random(f"{seed}-{year}")
+    months: List[str] = []
+    per_month = max(1, credits // 12)
+    for month in range(1, 13):
+        lines = []
+        for i in range(per_month):
+            artist = f"Artist{rng.randrange(400)}"
+            title = f"Song {year}-{month:02d}-{i}"
+            roles = rng.choice(ROLE_SETS)
+            engineer = ENGINEERS[0] if rng.random() < 0.3 else rng.choice(ENGINEERS[1:])
+            if rng.random() < 0.5:
+                line = f"{artist} – '{title}' {roles} Mixed by {engineer}"
+            else:
+                line = f"{artist} – '{title}' <strong>{roles}</strong> <span>{engineer}</span>"
+            lines.append(f"<p>{line}</p>")
+            if rng.random() < 0.03:
+                # the site occasionally repeats a credit under two releases
+                lines.append(f"<p>{line}</p>")
+        months.append(
+            '<div class="wp-block-group"><div class="wp-block-group__inner-container">'
+            f"<h3>{year}.{month:02d}</h3>{''.join(lines)}</div></div>"
+        )
+    nav = "".join(f'<li class="menu-item"><a href="/tone-discography/d-{y}/">{y}</a></li>' for y in range(2010, 2026))
+    return (
+        '<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8">'
+        f"<title>D-{year} – TONE STUDIO</title><style>p{{margin:0}}</style></head>"
+        '<body><div id="page" class="site"><header class="site-header"><nav><ul class="menu">'
+        f"{nav}</ul></nav></header>"
+        '<div id="content"><div class="container"><div class="row"><div class="col-md-12">'
+        f'<article><h1 class="entry-title">Discography {year}</h1><div class="entry-content">'
+        f"{''.join(months)}</div></article></div></div></div></div>"
+        '<footer class="site-footer"><p>© TONE STUDIO</p></footer></div></body></html>'
+    ).encode("utf-8")
+
+
+def tonestudio_pages(credits: int = 600) -> Dict[str, bytes]:
+    pages = saved_pages("tonestudio")
+    if pages:
+        return pages
+    return {f"d-{year}": tonestudio_year_page(year, credits) for year in (2016, 2019, 2023)}
+
+
+GENRES = ["발라드", "인디음악", "록/메탈", "R&B/Soul", "포크/블루스", "랩/힙합", "댄스", "OST"]
+
+
+def _rng(*parts) -> random.Random:
+    return random.Random("|".join(str(p) for p in parts))
+
+
+def stable_id(*parts, base: int = 10_000_000, span: int = 9_000_000) -> str:
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return str(base + int(digest[:12], 16) % span)
+
+
+def _chrome(title: str, body: str, og_image: str = "", filler_links: int = 150) -> str:
+    """Site header/footer/script weight similar to the real provider pages."""
+    nav = "".join(f'<li class="nav_item"><a href="/menu/{i}.htm" class="link_gnb"><span>메뉴 {i}</span></a></li>' for i in range(filler_links))
+    scripts = "".join(
+        f'<script type="text/javascript">var cfg{i} = {{"id": {i}, "path": "/static/{i}.js"}};</script>' for i in range(40)
+    )
+    og = f'<meta property="og:image" content="{escape(og_image)}">' if og_image else ""
+    return (
+        '<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8">'
+        f"<title>{escape(title)}</title>{og}<link rel=\"stylesheet\" href=\"/static/app.css\">{scripts}"
+        "<style>.d_album_list li{float:left}</style></head><body>"
+        f'<div id="wrap"><div id="gnb"><ul class="gnb_menu">{nav}</ul></div>'
+        f'<div id="cont_wrap"><div id="conts">{body}</div></div>'
+        '<div id="footer"><!-- footer --><p class="copy">Copyright &copy; provider</p></div></div></body></html>'
+    )
+
+
+def melon_search_page(query: str, results: int = 8) -> bytes:
+    rng = _rng("melon-search", query)
+    words = query.split() or ["album"]
+    items = []
+    songs = []
+    for i in range(results):
+        album_id = stable_id("melon-album", query, i)
+        album = query if i == 0 else f"{words[-1]} {rng.choice(['Vol.', 'OST', 'Part', 'Live'])} {i}"
+        artist = words[0] if i % 3 == 0 else f"Artist{rng.randrange(500)}"
+        if i % 7 == 3:
+            album = f"{album} &amp; Friends"
+        items.append(
+            '<li><div class="wrap_album04">'
+            f'<a href="javascript:melon.link.goAlbumDetail(\'{album_id}\');" class="thumb"><img src="/a/{album_id}.jpg" alt=""></a>'
+            f'<div class="atist_info"><a href="javascript:melon.link.goAlbumDetail(\'{album_id}\');" class="ellipsis">{album}</a>'
+            f'<span class="atistname"><a href="javascript:melon.link.goArtistDetail(\'{stable_id("artist", artist)}\');" class="fc_mgray">{escape(artist)}</a></span>'
+            f'<span class="cnt_view">{2010 + i}.0{1 + i % 9}.1{i % 10}</span></div></div></li>'
+        )
+        songs.append(
+            f'<tr><td><div class="ellipsis"><a href="javascript:melon.play.playSong(\'1\',{stable_id("song", query, i)});">재생</a>'
+            f'<a href="javascript:melon.link.goAlbumDetail(\'{album_id}\');" class="fc_mgray">{album}</a></div></td></tr>'
+        )
+    body = (
+        f'<div class="section_song"><table><tbody>{"".join(songs)}</tbody></table></div>'
+        f'<div class="section_album"><div class="d_album_list"><ul>{"".join(items)}</ul></div></div>'
+    )
+    return _chrome(f"{query} - 멜론 검색", body).encode("utf-8")
+
+
+def melon_album_song_ids(album_id: str, songs: int = 10) -> List[str]:
+    return [stable_id("melon-song", album_id, i) for i in range(songs)]
+
+
+def melon_album_page(album_id: str, songs: int = 10) -> bytes:
+    rng = _rng("melon-album", album_id)
+    genre = ", ".join(rng.sample(GENRES, 2))
+    release = f"{rng.randrange(2010, 2026)}.{rng.randrange(1, 13):02d}.{rng.randrange(1, 29):02d}"
+    tracks = "".join(
+        f'<tr><td><div class="wrap"><a href="javascript:melon.play.playSong(\'19030101\',{sid});" class="btn_play">재생</a>'
+        f'<a href="javascript:melon.link.goSongDetail(\'{sid}\');" class="btn_info">곡정보</a>'
+        f'<div class="ellipsis"><span><a href="#" title="Track {n}">Track {n}</a></span></div></div></td></tr>'
+        for n, sid in enumerate(melon_album_song_ids(album_id, songs), start=1)
+    )
+    body = (
+        '<div class="section_info"><div class="wrap_info"><div class="entry">'
+        f'<div class="info"><div class="song_name"><strong class="none">앨범명</strong>Album {album_id}</div></div>'
+        '<div class="meta"><dl class="list">'
+        f"<dt>발매일</dt><dd>{release}</dd><dt>장르</dt><dd>{escape(genre)}</dd>"
+        "<dt>발매사</dt><dd>Label Co.</dd><dt>기획사</dt><dd>Agency &amp; Co.</dd>"
+        "</dl></div></div></div></div>"
+        f'<div class="section_contin"><table><tbody>{tracks}</tbody></table></div>'
+    )
+    cover = f"https://cdnimg.melon.co.kr/cm/album/images/{album_id[:3]}/{album_id[3:5]}/{album_id[5:]}/{album_id}_500.jpg"
+    return _chrome(f"Album {album_id} - 멜론", body, og_image=cover).encode("utf-8")
+
+
+def melon_song_page(song_id: str) -> bytes:
+    rng = _rng("melon-song", song_id)
+    extra = ""
+    if rng.random() < 0.5:
+        extra = f"<dt>누적 스트리밍</dt><dd>{rng.randrange(1000, 9_000_000):,}</dd><dt>누적 다운로드</dt><dd>{rng.randrange(100, 90_000):,}</dd>"
+    body = (
+        '<div class="section_info"><div class="wrap_info"><div class="entry">'
+        f'<div class="song_name">Song {song_id}</div><div class="meta"><dl class="list">'
+        f'<dt>앨범</dt><dd><a href="#">Album</a></dd><dt>발매일</dt><dd>2019.05.01</dd><dt>장르</dt><dd>발라드</dd>{extra}'
+        "</dl></div></div></div></div>"
+    )
+    return _chrome(f"Song {song_id} - 멜론", body).encode("utf-8")
+
+
+def melon_like_json(ids: List[str]) -> bytes:
+    conts = [{"CONTSID": int(i), "LIKEYN": "N", "SUMMCNT": _rng("like", i).randrange(0, 50_000)} for i in ids]
+    return json.dumps({"contsLike": conts}).encode("utf-8")
+
+
+def bugs_search_page(query: str, results: int = 8) -> bytes:
+    rng = _rng("bugs-search", query)
+    words = query.split() or ["album"]
+    rows = []
+    for i in range(results):
+        album_id = stable_id("bugs-album", query, i, base=20_000_000)
+        album = query if i == 0 else f"{words[-1]} {rng.choice(['Vol.', 'OST', 'Part'])} {i}"
+        artist = words[0] if i % 3 == 0 else f"Artist{rng.randrange(500)}"
+        rows.append(
+            f'<tr albumid="{album_id}"><td><a href="https://music.bugs.co.kr/album/{album_id}?wl_ref=list_ab_01" class="thumbnail"><img src="/a.jpg" alt=""></a></td>'
+            f'<th scope="row"><p class="title"><a href="https://music.bugs.co.kr/album/{album_id}?wl_ref=list_ab_02" title="{escape(album)}">{escape(album)}</a></p></th>'
+            f'<td class="left"><p class="artist"><a href="https://music.bugs.co.kr/artist/{stable_id("bugs-artist", artist)}">{escape(artist)}</a></p></td>'
+            f"<td><time>20{10 + i}.01.01</time></td></tr>"
+        )
+    body = f'<table class="list trackList byAlbum"><thead><tr><th>앨범</th></tr></thead><tbody>{"".join(rows)}</tbody></table>'
+    return _chrome(f"{query} - 벅스 검색", body).encode("utf-8")
+
+
+def bugs_album_page(album_id: str) -> bytes:
+    rng = _rng("bugs-album", album_id)
+    genres = " / ".join(f'<a href="/genre/{g}">{escape(g)}</a>' for g in rng.sample(GENRES, 2))
+    body = (
+        '<div class="basicInfo"><table class="info"><tbody>'
+        '<tr><th scope="row">아티스트</th><td><a href="/artist/1">Artist</a></td></tr>'
+        f'<tr><th scope="row">장르</th><td>{genres}</td></tr>'
+        f'<tr><th scope="row">발매일</th><td><time>{rng.randrange(2010, 2026)}.0{rng.randrange(1, 10)}.1{rng.randrange(0, 10)}</time></td></tr>'
+        "</tbody></table></div>"
+    )
+    cover = f"https://image.bugsm.co.kr/album/images/500/{album_id[:5]}/{album_id}.jpg"
+    return _chrome(f"Album {album_id} - 벅스", body, og_image=cover).encode("utf-8")
+
+
+def provider_pages() -> Dict[str, Dict[str, bytes]]:
+    """Fixture pages for the extraction benchmark, keyed by page kind."""
+    kinds = {
+        "melon_search": lambda i: melon_search_page(f"Artist{i} Album Title {i}"),
+        "melon_album": lambda i: melon_album_page(stable_id("melon-album", i)),
+        "melon_song": lambda i: melon_song_page(stable_id("melon-song", i)),
+        "bugs_search": lambda i: bugs_search_page(f"Artist{i} Album Title {i}"),
+        "bugs_album": lambda i: bugs_album_page(stable_id("bugs-album", i, base=20_000_000)),
+    }
+    pages = {}
+    for kind, build in kinds.items():
+        pages[kind] = saved_pages(kind) or {f"{kind}-{i}": build(i) for i in range(20)}
+    return pages
+
+
+# Share of search terms iTunes finds nothing for (picked by a hash of the term).
+ITUNES_MISS_SHARE = 0.0
+
+
+def itunes_search_json(term: str, results: int = 5) -> bytes:
+    rng = _rng("itunes", term)
+    if ITUNES_MISS_SHARE and rng.random() < ITUNES_MISS_SHARE:
+        results = 0
+    items = [
+        {
+            "wrapperType": "collection",
+            "collectionId": int(stable_id("itunes", term, i)),
+            "artistName": term.split(" ")[0],
+            "collectionName": f"{term} {i}",
+            "artworkUrl60": f"https://is1-ssl.mzstatic.com/image/thumb/Music/{rng.randrange(10**6)}/60x60bb.jpg",
+            "artworkUrl100": f"https://is1-ssl.mzstatic.com/image/thumb/Music/{rng.randrange(10**6)}/100x100bb.jpg",
+        }
+        for i in range(results)
+    ]
+    return json.dumps({"resultCount": len(items), "results": items}).encode("utf-8")
+
+
+# Share of videos oEmbed reports as unavailable (404), picked by a hash of the URL.
+YOUTUBE_MISSING_SHARE = 0.0
+
+
+def youtube_oembed_json(video_url: str) -> Optional[bytes]:
+    """oEmbed answer for `video_url`, or None when the video is "deleted"."""
+    video_id = video_url.rsplit("v=", 1)[-1]
+    if YOUTUBE_MISSING_SHARE and _rng("yt-missing", video_id).random() < YOUTUBE_MISSING_SHARE:
+        return None
+    return json.dumps(
+        {
+            "title": f"Official MV {stable_id('yt', video_url)}",
+            "author_name": "Channel",
+            "type": "video",
+            "provider_name": "YouTube",
+            "thumbnail_url": "https://i.ytimg.com/vi/x/hqdefault.jpg",
+        }
+    ).encode("utf-8")
+
+
+def cover_jpeg(name: str, width: int = 600, height: int = 600) -> bytes:
+    """A photo-like JPEG (smooth gradient plus grain) at the size providers serve covers.
+
+    Needs Pillow; only the image benchmarks call it.
+    """
+    import io
+
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = _rng("cover", name)
+    image = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r = rng.randrange(width // 8, width // 2)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    image = image.filter(ImageFilter.GaussianBlur(width / 40))
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    image = Image.blend(image, noise, 0.12)
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=90)
+    return out.getvalue()
+
+
+CATALOG_FIELDS = ["Artist", "Album", "Title", "YoutubeURL", "Genre", "Work", "priority", "note", "MelonAlbumId", "MelonAlbumURL"]
+
+
+def write_catalog(
+    path: Path,
+    albums: int,
+    rows_per_album: int = 3,
+    youtube_share: float = 0.3,
+    seed: int = 0,
+    artists: int = 997,
+    videos: int = 0,
+) -> None:
+    """A Portfolio_list.csv-shaped catalog with `albums` distinct artist/album pairs over `artists` artists.
+
+    Rows with a YouTube URL get a video of their own, or with `videos` one of
+    that many shared videos.
+    """
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_FIELDS)
+        writer.writeheader()
+        for album_no in range(albums):
+            artist = f"Artist{album_no % artists}"
+            album = f"Album Title {album_no}"
+            for track in range(rows_per_album):
+                youtube = ""
+                if rng.random() < youtube_share:
+                    video = stable_id("shared-video", rng.randrange(videos)) if videos else stable_id("video", album_no, track)
+                    youtube = f"https://www.youtube.com/watch?v={video}AbC"
+                writer.writerow(
+                    {
+                        "Artist": artist,
+                        "Album": album,
+                        "Title": f"Track {track + 1}",
+                        "Work": rng.choice(["녹음", "믹스", "녹음, 믹스"]),
+                        "note": "",
+                        "Genre": "",
+                        "YoutubeURL": youtube,
+                        "priority": "",
+                        "MelonAlbumId": "",
+                        "MelonAlbumURL": "",
+                    }
+                )
@@ -0,0 +1,344 @@
+"""
+Local stand-in for the providers the pipeline talks to.
+
+`ProviderServer` answers the same endpoints as melon.com, music.bugs.co.kr,
+the iTunes search API, YouTube oEmbed and tonestudio.co.kr (plus cover-style
+JPEGs under /images/) under one localhost origin, with optional per-request
+latency and error injection.
+Pages saved under benchmarks/fixtures/<kind>/ are replayed when present
+(picked by a hash of the query so a given URL always gets the same page);
+otherwise the synthetic pages from fixtures.py are served.
+
+`pointed_at(server)` rewrites the URL templates of the scraper modules so
+`enrich_csv`, `update_priorities`, `build_matches` and the crawler hit the
+server instead of the real sites:
+
+    with ProviderServer(latency=0.05, error_rate=0.01) as server, pointed_at(server):
+        enrich_melon_metadata.enrich_csv(...)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import fixtures as fx
+
+TONESTUDIO_YEAR_RE = re.compile(r"^/tonestudio/tone-discography/(?:d-)?(\d{4})/?$")
+BUGS_ALBUM_RE = re.compile(r"^/bugs/album/(\d+)$")
+IMAGE_RE = re.compile(r"^/images/([\w.-]+)\.jpg$")
+
+
+_saved_lock = threading.Lock()
+_saved_by_kind: Dict[str, Dict[str, bytes]] = {}
+
+
+def _saved(kind: str) -> Dict[str, bytes]:
+    with _saved_lock:
+        if kind not in _saved_by_kind:
+            _saved_by_kind[kind] = fx.saved_pages(kind)
+        return _saved_by_kind[kind]
+
+
+def _replayed(kind: str, key: str, build: Callable[[], bytes]) -> bytes:
+    pages = _saved(kind)
+    if not pages:
+        return build()
+    names = sorted(pages)
+    digest = int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16)
+    return pages[names[digest % len(names)]]
+
+
+def route(path: str, query: Dict[str, str]) -> Optional[Tuple[str, str, bytes]]:
+    """Map a request to (endpoint, content type, body), or None for 404."""
+    html = "text/html; charset=utf-8"
+    json_type = "application/json; charset=utf-8"
+    if path == "/melon/search/total/index.htm":
+        q = query.get("q", "")
+        return "melon_search", html, _replayed("melon_search", q, lambda: fx.melon_search_page(q))
+    if path == "/melon/album/detail.htm":
+        album_id = query.get("albumId", "")
+        return "melon_album", html, _replayed("melon_album", album_id, lambda: fx.melon_album_page(album_id))
+    if path == "/melon/song/detail.htm":
+        song_id = query.get("songId", "")
+        return "melon_song", html, _replayed("melon_song", song_id, lambda: fx.melon_song_page(song_id))
+    if path in ("/melon/commonlike/getAlbumLike.json", "/melon/commonlike/getSongLike.json"):
+        ids = [i for i in query.get("contsIds", "").split(",") if i.isdigit()]
+        return "melon_like", json_type, fx.melon_like_json(ids)
+    if path == "/bugs/search/album":
+        q = query.get("q", "")
+        return "bugs_search", html, _replayed("bugs_search", q, lambda: fx.bugs_search_page(q))
+    m = BUGS_ALBUM_RE.match(path)
+    if m:
+        album_id = m.group(1)
+        return "bugs_album", html, _replayed("bugs_album", album_id, lambda: fx.bugs_album_page(album_id))
+    if path == "/itunes/search":
+        return "itunes_search", json_type, fx.itunes_search_json(query.get("term", ""))
+    if path == "/youtube/oembed":
+        body = fx.youtube_oembed_json(query.get("url", ""))
+        return ("youtube_oembed", json_type, body) if body is not None else None
+    m = TONESTUDIO_YEAR_RE.match(path)
+    if m:
+        year = int(m.group(1))
+        return "tonestudio", html, _replayed("tonestudio", f"d-{year}", lambda: fx.tonestudio_year_page(year, seed=fx.TONESTUDIO_REVISIONS.get(year, 0)))
+    m = IMAGE_RE.match(path)
+    if m and "missing" not in m.group(1):
+        return "image", "image/jpeg", _cover(m.group(1), int(query.get("w", 600)), int(query.get("h", 600)))
+    return None
+
+
+_covers_lock = threading.Lock()
+_covers: Dict[Tuple[str, int, int], bytes] = {}
+
+
+def _cover(name: str, width: int, height: int) -> bytes:
+    # JPEG encoding dominates otherwise; a given URL always returns the same bytes
+    with _covers_lock:
+        if (name, width, height) not in _covers:
+            _covers[(name, width, height)] = fx.cover_jpeg(name, width, height)
+        return _covers[(name, width, height)]
+
+
+class ProviderServer:
+    """Threaded localhost server replaying provider responses.
+
+    latency:      seconds added before every response
+    jitter:       extra uniform random delay in [0, jitter)
+    error_rate:   fraction of requests answered with `error_status`
+    error_status: status used for injected errors (429/503 also send Retry-After)
+    capacity:     requests/s the server accepts (token bucket holding `burst`);
+                  requests beyond it get a 429 with Retry-After, counted in
+                  `throttled`. 0 means unlimited.
+
+    Every 200 carries an ETag (hash of the body); a matching If-None-Match
+    gets an empty 304, counted in `not_modified`. With `etags=False` neither
+    happens, like a server that never answers 304.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: int = 1,
+        seed: int = 0,
+        port: int = 0,
+        capacity: float = 0.0,
+        burst: float = 0.0,
+        etags: bool = True,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.capacity = capacity
+        self.burst = burst or max(1.0, capacity)
+        self.etags = etags
+        self._tokens = self.burst
+        self._refilled = time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.not_modified: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self.bytes_sent = 0
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.errors.clear()
+            self.not_modified.clear()
+            self.throttled.clear()
+            self.bytes_sent = 0
+
+    def start(self) -> "ProviderServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="provider-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ProviderServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _decide(self) -> Tuple[float, bool]:
+        with self._lock:
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay, fail
+
+    def _admit(self) -> bool:
+        """Take a token from the capacity bucket; False means throttle this request."""
+        if not self.capacity:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.capacity)
+            self._refilled = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body go out in separate writes; without this,
+            # Nagle + delayed ACK adds ~40ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                routed = route(parts.path, query)
+                delay, fail = server._decide()
+                if delay:
+                    time.sleep(delay)
+                if routed is None:
+                    self._send(404, "text/plain", b"not found", "unknown")
+                    return
+                endpoint, content_type, body = routed
+                if not server._admit():
+                    with server._lock:
+                        server.throttled[endpoint] += 1
+                    self._send(429, "text/plain", b"slow down", endpoint, {"Retry-After": str(server.retry_after)})
+                    return
+                if fail:
+                    headers = {"Retry-After": str(server.retry_after)} if server.error_status in (429, 503) else {}
+                    self._send(server.error_status, "text/plain", b"injected error", endpoint, headers)
+                    return
+                if not server.etags:
+                    self._send(200, content_type, body, endpoint)
+                    return
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, content_type, b"", endpoint, {"ETag": etag})
+                    return
+                self._send(200, content_type, body, endpoint, {"ETag": etag})
+
+            def _send(self, status: int, content_type: str, body: bytes, endpoint: str, headers: Optional[Dict[str, str]] = None) -> None:
+                with server._lock:
+                    server.requests[endpoint] += 1
+                    if status == 304:
+                        server.not_modified[endpoint] += 1
+                    elif status != 200:
+                        server.errors[endpoint] += 1
+                    server.bytes_sent += len(body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:  # noqa: A002 - http.server API
+                pass
+
+        return Handler
+
+
+def provider_urls(base_url: str) -> Dict[str, Dict[str, str]]:
+    """URL template overrides per module, mirroring the real endpoints."""
+    melon = f"{base_url}/melon"
+    bugs = f"{base_url}/bugs"
+    return {
+        "enrich_melon_metadata": {
+            "SEARCH_URL": f"{melon}/search/total/index.htm?q={{query}}",
+            "ALBUM_DETAIL_URL": f"{melon}/album/detail.htm?albumId={{album_id}}",
+            "BUGS_SEARCH_URL": f"{bugs}/search/album?q={{query}}",
+            "BUGS_ALBUM_DETAIL_URL": f"{bugs}/album/{{album_id}}",
+        },
+        "update_priority_from_melon": {
+            "SEARCH_URL": f"{melon}/search/total/index.htm?q={{query}}",
+            "ALBUM_DETAIL_URL": f"{melon}/album/detail.htm?albumId={{album_id}}",
+            "SONG_DETAIL_URL": f"{melon}/song/detail.htm?songId={{song_id}}",
+            "ALBUM_LIKE_URL": f"{melon}/commonlike/getAlbumLike.json?contsIds={{ids}}",
+            "SONG_LIKE_URL": f"{melon}/commonlike/getSongLike.json?contsIds={{ids}}",
+        },
+        "enrich_media": {
+            "OEMBED_URL": f"{base_url}/youtube/oembed?format=json&url={{url}}",
+            "ITUNES_SEARCH_URL": f"{base_url}/itunes/search?term={{term}}&entity=album,song&country=KR&limit=5",
+        },
+    }
+
+
+def image_url(base_url: str, name: str, width: int = 600, height: int = 600) -> str:
+    """A cover-style JPEG; names containing "missing" answer 404."""
+    return f"{base_url}/images/{name}.jpg?w={width}&h={height}"
+
+
+def tonestudio_url(base_url: str, year: int) -> str:
+    return f"{base_url}/tonestudio/tone-discography/d-{year}/"
+
+
+@contextmanager
+def pointed_at(server_or_url) -> Iterator[None]:
+    """Temporarily point the scraper modules' URL templates at the server."""
+    base_url = getattr(server_or_url, "base_url", server_or_url)
+    saved = []
+    try:
+        for module_name, overrides in provider_urls(base_url).items():
+            module = importlib.import_module(module_name)
+            for name, value in overrides.items():
+                saved.append((module, name, getattr(module, name)))
+                setattr(module, name, value)
+        yield
+    finally:
+        for module, name, value in reversed(saved):
+            setattr(module, name, value)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve provider fixtures on localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--capacity", type=float, default=0.0, help="Requests/s accepted before answering 429 (0 = unlimited)")
+    args = parser.parse_args()
+
+    server = ProviderServer(args.latency, args.jitter, args.error_rate, args.error_status, port=args.port, capacity=args.capacity)
+    print(f"serving on {server.base_url} (Ctrl-C to stop)")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
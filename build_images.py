@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Download, resize and content-hash the cover and thumbnail images cards show.
+
+Cards used to hotlink the full-size Melon `_500.jpg` / iTunes `600x600bb`
+covers, and loadThumbnailWithFallback() in script.js walked up to five
+YouTube thumbnail URLs per card at runtime. This stage does that work once:
+
+- sources: every CoverImageURL in Portfolio_list.csv and cover_url in
+  portfolio_media_map.json (keyed by URL), and one thumbnail per YouTube
+  video (keyed "youtube:<id>"; maxres first, then the smaller sizes)
+- each source is downloaded once; known ones are revalidated with
+  If-None-Match / If-Modified-Since and skipped on 304 or unchanged bytes
+- identical bytes (same SHA-256) are rendered once, whatever the URL
+- rendering runs in a process pool: WebP at RENDITION_WIDTHS (and AVIF when
+  Pillow supports it) written as images/<hash>.<width>.<format>, plus a
+  tiny WebP placeholder inlined as a data: URL; 4:3 YouTube thumbnails are
+  cropped to 16:9 to drop the letterbox bars
+- portfolio_image_index.json records source -> asset; enrich_media.py copies
+  the assets each artist needs into the media map and the shards, which
+  this script rewrites at the end
+
+Needs Pillow. The rest of the pipeline does not: without this stage the
+frontend keeps loading the original URLs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import enrich_media
+from net_stats import write_run_stats
+from rate_limit import HostPacers, RetryPolicy, send_paced
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # optional: only this stage needs it
+    Image = None
+
+
+ROOT = Path(__file__).resolve().parent
+IMAGE_DIR = ROOT / "images"
+INDEX_VERSION = 1
+RENDITION_WIDTHS = (320, 640)
+PLACEHOLDER_WIDTH = 16
+WEBP_QUALITY = 78
+AVIF_QUALITY = 50
+# Part of every asset name: changing the renditions must not reuse old URLs,
+# which the frontend caches as immutable.
+RENDER_SETTINGS = f"w={','.join(map(str, RENDITION_WIDTHS))};webp={WEBP_QUALITY};avif={AVIF_QUALITY};p={PLACEHOLDER_WIDTH}"
+YOUTUBE_THUMBNAIL_URL = "https://img.youtube.com/vi/{video_id}/{name}.jpg"
+YOUTUBE_THUMBNAIL_NAMES = ("maxresdefault", "sddefault", "hqdefault", "mqdefault", "default")
+ASSET_NAME_RE = re.compile(r"^[0-9a-f]{16}\.\d+\.(?:webp|avif)$")
+USER_AGENT = "Mozilla/5.0"
+
+
+@dataclass
+class ImageSource:
+    key: str
+    candidates: List[str] = field(default_factory=list)
+    crop_letterbox: bool = False
+
+
+@dataclass
+class Download:
+    key: str
+    status: str  # kept | not_modified | new | changed | failed
+    state: Optional[Dict[str, str]] = None
+    data: Optional[bytes] = None
+
+
+def youtube_candidates(video_id: str, thumbnail_url: str = "") -> List[str]:
+    urls = [YOUTUBE_THUMBNAIL_URL.format(video_id=video_id, name=YOUTUBE_THUMBNAIL_NAMES[0]), thumbnail_url]
+    urls += [YOUTUBE_THUMBNAIL_URL.format(video_id=video_id, name=name) for name in YOUTUBE_THUMBNAIL_NAMES[1:]]
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+def collect_sources(items: Iterable[Dict[str, str]], csv_sources: Dict[str, Dict[str, str]]) -> Dict[str, ImageSource]:
+    sources: Dict[str, ImageSource] = {}
+    for item in items:
+        for key in enrich_media.image_source_keys(item, csv_sources):
+            if key in sources:
+                continue
+            if key.startswith("youtube:"):
+                video_id = key.split(":", 1)[1]
+                thumbnail = item.get("youtube_thumbnail", "") if item.get("youtube_id") == video_id else ""
+                sources[key] = ImageSource(key, youtube_candidates(video_id, thumbnail), crop_letterbox=True)
+            else:
+                sources[key] = ImageSource(key, [key])
+    return sources
+
+
+def asset_id(sha256: str, source: ImageSource) -> str:
+    return f"{sha256}:16x9" if source.crop_letterbox else sha256
+
+
+def asset_files(asset: Dict[str, object]) -> List[str]:
+    paths = [str(asset["src"])]
+    for srcset in (asset.get("srcset"), asset.get("avif")):
+        paths += [entry.split(" ")[0] for entry in str(srcset or "").split(", ") if entry]
+    return paths
+
+
+def asset_on_disk(asset: Optional[Dict[str, object]]) -> bool:
+    return bool(asset) and all((IMAGE_DIR.parent / path).exists() for path in asset_files(asset))
+
+
+def render_image(data: bytes, name: str, out_dir: str, crop_letterbox: bool, avif: bool) -> Dict[str, object]:
+    """Write the renditions of one source image; runs in a worker process."""
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    image = image.convert("RGB")
+    width, height = image.size
+    if crop_letterbox and abs(width * 3 - height * 4) <= 4:
+        band = (height - width * 9 // 16) // 2
+        image = image.crop((0, band, width, height - band))
+        width, height = image.size
+
+    prefix = Path(out_dir).name
+    srcset: List[str] = []
+    avif_srcset: List[str] = []
+    for target in sorted({min(w, width) for w in RENDITION_WIDTHS}):
+        size = (target, max(1, round(height * target / width)))
+        resized = image if size == image.size else image.resize(size, Image.LANCZOS)
+        path = Path(out_dir) / f"{name}.{target}.webp"
+        if not path.exists():
+            resized.save(path, "WEBP", quality=WEBP_QUALITY, method=6)
+        srcset.append(f"{prefix}/{path.name} {target}w")
+        if avif:
+            path = Path(out_dir) / f"{name}.{target}.avif"
+            if not path.exists():
+                resized.save(path, "AVIF", quality=AVIF_QUALITY)
+            avif_srcset.append(f"{prefix}/{path.name} {target}w")
+
+    tiny = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.BILINEAR)
+    out = io.BytesIO()
+    tiny.save(out, "WEBP", quality=40)
+    asset: Dict[str, object] = {
+        "width": width,
+        "height": height,
+        "src": srcset[0].split(" ")[0],
+        "srcset": ", ".join(srcset),
+        "placeholder": "data:image/webp;base64," + base64.b64encode(out.getvalue()).decode("ascii"),
+    }
+    if avif_srcset:
+        asset["avif"] = ", ".join(avif_srcset)
+    return asset
+
+
+class ImageDownloader:
+    """Fetches sources with adaptive per-host pacing, retries and conditional revalidation."""
+
+    def __init__(self, host_concurrency: int = 4, sleep_seconds: float = 0.0, timeout: float = 20):
+        self.host_concurrency = host_concurrency
+        self.sleep_seconds = sleep_seconds
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_maxsize=32)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pacers = HostPacers(sleep_seconds, host_concurrency)
+        self.retry = RetryPolicy(max_retries=2)
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        return send_paced(
+            url,
+            "image",
+            lambda: self.session.get(url, headers=headers, timeout=self.timeout),
+            pacer=self.pacers.for_url(url),
+            retry=self.retry,
+        )
+
+    @staticmethod
+    def _is_image(resp: requests.Response) -> bool:
+        return resp.status_code == 200 and resp.headers.get("Content-Type", "").startswith("image/") and bool(resp.content)
+
+    @staticmethod
+    def _state(url: str, resp: requests.Response) -> Dict[str, str]:
+        state = {"url": url, "sha256": hashlib.sha256(resp.content).hexdigest()}
+        for header, name in (("ETag", "etag"), ("Last-Modified", "last_modified")):
+            if resp.headers.get(header):
+                state[name] = resp.headers[header]
+        return state
+
+    def download(self, source: ImageSource, known: Optional[Dict[str, str]], known_on_disk: bool, revalidate: bool) -> Download:
+        if known and known_on_disk:
+            if not revalidate:
+                return Download(source.key, "kept", known)
+            headers = {}
+            if known.get("etag"):
+                headers["If-None-Match"] = known["etag"]
+            if known.get("last_modified"):
+                headers["If-Modified-Since"] = known["last_modified"]
+            try:
+                resp = self._get(known["url"], headers)
+            except requests.RequestException:
+                return Download(source.key, "kept", known)
+            if resp.status_code == 304:
+                return Download(source.key, "not_modified", known)
+            if self._is_image(resp):
+                state = self._state(known["url"], resp)
+                if state["sha256"] == known.get("sha256"):
+                    return Download(source.key, "not_modified", {**known, **state})
+                return Download(source.key, "changed", state, resp.content)
+            # gone or replaced by an error page: look for it again below
+
+        for url in source.candidates:
+            try:
+                resp = self._get(url)
+            except requests.RequestException:
+                continue
+            if self._is_image(resp):
+                state = self._state(url, resp)
+                if known and state["sha256"] == known.get("sha256") and known_on_disk:
+                    return Download(source.key, "not_modified", {**known, **state})
+                return Download(source.key, "changed" if known else "new", state, resp.content)
+        # keep serving the last good asset if there is one
+        return Download(source.key, "failed", known if known_on_disk else None)
+
+
+def load_index() -> Dict[str, object]:
+    path = enrich_media.IMAGE_INDEX_PATH
+    if path.exists():
+        try:
+            index = json.loads(path.read_text(encoding="utf-8"))
+            if index.get("version") == INDEX_VERSION and index.get("render") == RENDER_SETTINGS:
+                return index
+        except ValueError:
+            pass
+    return {"version": INDEX_VERSION, "render": RENDER_SETTINGS, "sources": {}, "assets": {}}
+
+
+def build_images(
+    items: List[Dict[str, str]],
+    csv_sources: Dict[str, Dict[str, str]],
+    workers: int = 0,
+    downloads: int = 8,
+    host_concurrency: int = 4,
+    sleep_seconds: float = 0.0,
+    revalidate: bool = True,
+) -> Counter:
+    """Bring images/ and the index up to date for `items`; returns event counts."""
+    index = load_index()
+    known_sources: Dict[str, Dict[str, str]] = index["sources"]
+    known_assets: Dict[str, Dict[str, object]] = index["assets"]
+    sources = collect_sources(items, csv_sources)
+    avif = features.check("avif")
+    IMAGE_DIR.mkdir(exist_ok=True)
+
+    downloader = ImageDownloader(host_concurrency=host_concurrency, sleep_seconds=sleep_seconds)
+    with ThreadPoolExecutor(max_workers=max(1, downloads)) as pool:
+        results = list(
+            pool.map(
+                lambda source: downloader.download(
+                    source,
+                    known_sources.get(source.key),
+                    asset_on_disk(known_assets.get(known_sources.get(source.key, {}).get("asset", ""))),
+                    revalidate,
+                ),
+                sources.values(),
+            )
+        )
+
+    stats: Counter = Counter(result.status for result in results)
+    stats["sources"] = len(sources)
+    new_sources: Dict[str, Dict[str, str]] = {}
+    to_render: Dict[str, Tuple[bytes, ImageSource]] = {}
+    for result in results:
+        if result.state is None:
+            continue
+        source = sources[result.key]
+        state = dict(result.state)
+        state["asset"] = asset_id(state["sha256"], source)
+        new_sources[result.key] = state
+        if result.data is not None and not asset_on_disk(known_assets.get(state["asset"])):
+            to_render.setdefault(state["asset"], (result.data, source))
+
+    assets = {key: asset for key, asset in known_assets.items() if asset_on_disk(asset)}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = {
+            key: pool.submit(
+                render_image,
+                data,
+                hashlib.sha256(f"{key}|{RENDER_SETTINGS}".encode("utf-8")).hexdigest()[:16],
+                str(IMAGE_DIR),
+                source.crop_letterbox,
+                avif,
+            )
+            for key, (data, source) in to_render.items()
+        }
+        for key, future in futures.items():
+            try:
+                assets[key] = future.result()
+                stats["rendered"] += 1
+            except Exception as exc:  # undecodable or truncated image
+                stats["render_failed"] += 1
+                print(f"Render failed: {key[:16]}: {exc}")
+
+    new_sources = {key: state for key, state in new_sources.items() if state["asset"] in assets}
+    live_assets = {state["asset"] for state in new_sources.values()}
+    assets = {key: asset for key, asset in assets.items() if key in live_assets}
+    live_files = {Path(path).name for asset in assets.values() for path in asset_files(asset)}
+    for path in IMAGE_DIR.iterdir():
+        if ASSET_NAME_RE.match(path.name) and path.name not in live_files:
+            path.unlink()
+            stats["removed"] += 1
+
+    index = {
+        "version": INDEX_VERSION,
+        "render": RENDER_SETTINGS,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "sources": dict(sorted(new_sources.items())),
+        "assets": dict(sorted(assets.items())),
+    }
+    enrich_media.IMAGE_INDEX_PATH.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    return stats
+
+
+def format_stats(stats: Counter) -> str:
+    fetched = ", ".join(f"{stats[name]} {name.replace('_', ' ')}" for name in ("new", "changed", "not_modified", "kept", "failed") if stats[name])
+    return (
+        f"Images: {stats['sources']} sources ({fetched or 'none'}); "
+        f"{stats['rendered']} rendered, {stats['render_failed']} failed, {stats['removed']} stale files removed"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build resized, content-hashed cover/thumbnail assets")
+    parser.add_argument("--workers", type=int, default=0, help="Render processes (default: CPU count)")
+    parser.add_argument("--downloads", type=int, default=8, help="Parallel downloads")
+    parser.add_argument("--host-concurrency", type=int, default=4, help="Max in-flight requests per host")
+    parser.add_argument("--sleep", type=float, default=0.0, help="Starting spacing between request starts per host (seconds)")
+    parser.add_argument("--no-revalidate", action="store_true", help="Trust known sources without a conditional request")
+    parser.add_argument("--stats-path", default="", help="Network stats JSON (.prom written alongside; default: next to the image index)")
+    args = parser.parse_args()
+
+    if Image is None:
+        sys.exit("build_images.py needs Pillow: pip install Pillow")
+
+    payload = json.loads(enrich_media.OUTPUT_PATH.read_text(encoding="utf-8"))
+    try:
+        stats = build_images(
+            payload.get("items") or [],
+            enrich_media.load_csv_media_sources(),
+            workers=args.workers,
+            downloads=args.downloads,
+            host_concurrency=args.host_concurrency,
+            sleep_seconds=args.sleep,
+            revalidate=not args.no_revalidate,
+        )
+    finally:
+        write_run_stats("build_images", enrich_media.IMAGE_INDEX_PATH, args.stats_path)
+    print(format_stats(stats))
+    enrich_media.save_media_map(payload)
+
+
+if __name__ == "__main__":
+    main()
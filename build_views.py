@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Precompute the frontend's views of the served catalog CSV.
+
+script.js used to download the CSV, parse it line by line and regroup every
+song on each filter switch. This build step does the parsing and grouping
+once and writes portfolio_views.json (minified, plus .gz/.br):
+
+  artists         artist names in CSV order
+  songs           one array per song in `songFields` order: the artist's
+                  index, then the CSV cells script.js builds a song from
+                  (the year already resolved); trailing empty cells dropped
+  views.genre     [label, positions] pairs in display order
+  views.year      same, newest first, unknown years last
+  views.category  same, in the fixed category order
+
+A song's id is its position in `songs` plus one (CSV order). Bucket
+positions index the songs in display order instead (by artist, then id),
+in which every bucket is ascending, so they are written as differences
+from the previous position, mostly single digits.
+
+Everything the client can derive is left to it: script.js runs the same
+addSongFromCells() on these arrays as on CSV rows (titles, media keys,
+description text, genre and category lists, artist summaries), and builds
+the bucket artists, the category cards and the priority albums from the
+buckets. Media fields come from the per-artist shards (see enrich_media.py).
+
+The grouping mirrors computePortfolioViews in script.js, which remains the
+fallback when portfolio_views.json is missing.
+
+The site serves one CSV as Portfolio_list.csv: pipeline.py's output,
+Portfolio_list_with_priority.csv, when it exists, otherwise the
+hand-edited Portfolio_list.csv (`served_csv_path()`). The views are built
+from the same file by default, so they agree with the CSV next to them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from enrich_media import minified_json, write_precompressed
+
+
+ROOT = Path(__file__).resolve().parent
+CSV_PATH = ROOT / "Portfolio_list.csv"
+PRIORITY_CSV_PATH = ROOT / "Portfolio_list_with_priority.csv"
+VIEWS_PATH = ROOT / "portfolio_views.json"
+VIEWS_VERSION = 3
+CATEGORY_ORDER = ["Digital Editing", "Mixing", "Broadcasting", "Recording"]
+UNKNOWN_GENRE = "미분류"
+UNKNOWN_YEAR = "미상"
+YEAR_RE = re.compile(r"(19|20)\d{2}")
+
+# script.js column lookup: first alias present wins, case-insensitive
+COLUMN_ALIASES = {
+    "artist": ("Artist",),
+    "album": ("Album",),
+    "title": ("Title",),
+    "youtube_url": ("YoutubeURL", "YouTubeURL", "youtube_url"),
+    "genre": ("Genre",),
+    "year": ("Year", "year"),
+    "genre_melon": ("GenreMelon", "genreMelon"),
+    "cover_image_url": ("CoverImageURL", "coverImageUrl"),
+    "melon_release_date": ("MelonReleaseDate", "melonReleaseDate"),
+    "work": ("Work",),
+    "priority": ("priority",),
+    "note": ("note",),
+}
+
+# Song arrays hold these cells in this order; "artist" is an index into the
+# payload's artist names.
+SONG_FIELDS = [
+    "artist",
+    "title",
+    "album",
+    "work",
+    "note",
+    "genre",
+    "genreMelon",
+    "year",
+    "priority",
+    "youtubeUrl",
+    "coverImageUrl",
+]
+
+Year = Union[int, str]
+
+
+@dataclass
+class Song:
+    id: int
+    artist: str
+    title_raw: str
+    album: str
+    work: str
+    note: str
+    genre_raw: str
+    genre_melon: str
+    year: Year
+    priority: Union[int, float]
+    youtube_url_raw: str
+    cover_image_url: str
+    genres: List[str]
+    categories: List[str]
+
+    def to_row(self, artist_index: int) -> List[object]:
+        """Cells in SONG_FIELDS order, trailing empty ones dropped."""
+        row: List[object] = [
+            artist_index,
+            self.title_raw,
+            self.album,
+            self.work,
+            self.note,
+            self.genre_raw,
+            self.genre_melon,
+            "" if self.year == UNKNOWN_YEAR else self.year,
+            "" if self.priority == 1 else self.priority,
+            self.youtube_url_raw,
+            self.cover_image_url,
+        ]
+        while row and row[-1] == "":
+            row.pop()
+        return row
+
+
+@dataclass
+class Artist:
+    name: str
+    songs: List[Song] = field(default_factory=list)
+
+
+def map_work_part_to_category(part: str) -> Optional[str]:
+    part = part.strip().lower()
+    if not part:
+        return None
+    if "믹싱" in part or "mix" in part:
+        return "Mixing"
+    if "녹음" in part or "record" in part:
+        return "Recording"
+    if "방송" in part or "broadcast" in part:
+        return "Broadcasting"
+    if "튠" in part or "edit" in part:
+        return "Digital Editing"
+    return "Other"
+
+
+def parse_work_categories(work: str) -> List[str]:
+    categories: List[str] = []
+    for part in (work or "").split(","):
+        mapped = map_work_part_to_category(part)
+        if mapped and mapped not in categories:
+            categories.append(mapped)
+    return categories or ["Other"]
+
+
+def parse_priority(value: str) -> Union[int, float]:
+    try:
+        parsed = float(value) if value else 0.0
+    except ValueError:
+        return 1
+    if not math.isfinite(parsed) or parsed <= 0:
+        return 1
+    return int(parsed) if parsed.is_integer() else parsed
+
+
+def parse_year(*texts: str) -> Year:
+    """First (19|20)xx found in the Year column, release date, album, title, note."""
+    for text in texts:
+        match = YEAR_RE.search(text or "")
+        if match:
+            return int(match.group(0))
+    return UNKNOWN_YEAR
+
+
+def split_genre_labels(value: str) -> List[str]:
+    labels: List[str] = []
+    for part in (value or "").split(","):
+        label = part.strip()
+        if label and label not in labels:
+            labels.append(label)
+    return labels or [UNKNOWN_GENRE]
+
+
+def column_indexes(header: Sequence[str]) -> Dict[str, int]:
+    normalized = [cell.strip().lower() for cell in header]
+    indexes = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        indexes[name] = next((normalized.index(a.lower()) for a in aliases if a.lower() in normalized), -1)
+    return indexes
+
+
+def load_artists(csv_path: Path) -> Dict[str, Artist]:
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+        rows = [[cell.strip() for cell in row] for row in csv.reader(f) if any(cell.strip() for cell in row)]
+    if len(rows) < 2:
+        return {}
+    columns = column_indexes(rows[0])
+    if columns["artist"] == -1:
+        return {}
+
+    artists: Dict[str, Artist] = {}
+    song_id = 1
+    for row in rows[1:]:
+        cells = {name: row[index] if 0 <= index < len(row) else "" for name, index in columns.items()}
+        artist_name = cells["artist"]
+        if not artist_name:
+            continue
+        album = cells["album"]
+        title_raw = cells["title"]
+        work = cells["work"]
+        note = cells["note"]
+        genre_melon = cells["genre_melon"]
+
+        genre_label = cells["genre"] or genre_melon or UNKNOWN_GENRE
+        artist = artists.setdefault(artist_name, Artist(artist_name))
+        artist.songs.append(
+            Song(
+                id=song_id,
+                artist=artist_name,
+                title_raw=title_raw,
+                album=album,
+                work=work,
+                note=note,
+                genre_raw=cells["genre"],
+                genre_melon=genre_melon,
+                year=parse_year(cells["year"], cells["melon_release_date"], album, title_raw, note),
+                priority=parse_priority(cells["priority"]),
+                youtube_url_raw=cells["youtube_url"],
+                cover_image_url=cells["cover_image_url"],
+                genres=split_genre_labels(genre_label),
+                categories=parse_work_categories(work),
+            )
+        )
+        song_id += 1
+    return artists
+
+
+def bucket(label: str, songs: List[Song], positions: Dict[int, int]) -> List[object]:
+    """[label, position differences] of `songs`, which are in display order."""
+    deltas, previous = [], 0
+    for song in songs:
+        deltas.append(positions[song.id] - previous)
+        previous = positions[song.id]
+    return [label, deltas]
+
+
+def group_views(songs: List[Song]) -> Dict[str, List[List[object]]]:
+    """Buckets per view mode; `songs` in display order."""
+    genres: Dict[str, List[Song]] = {}
+    years: Dict[str, List[Song]] = {}
+    categories: Dict[str, List[Song]] = {}
+    for song in songs:
+        for genre in song.genres:
+            genres.setdefault(genre, []).append(song)
+        years.setdefault(str(song.year), []).append(song)
+        for category in song.categories:
+            categories.setdefault(category, []).append(song)
+
+    # JS Array.prototype.sort() compares UTF-16 code units
+    genre_order = sorted(genres, key=lambda label: label.encode("utf-16-be"))
+    year_order = sorted(years, key=lambda label: (0, -int(label), "") if label.isdigit() else (1, 0, label))
+    category_order = sorted(
+        categories,
+        key=lambda label: (0, CATEGORY_ORDER.index(label), "") if label in CATEGORY_ORDER else (1, 0, label),
+    )
+    positions = {song.id: position for position, song in enumerate(songs)}
+    return {
+        "genre": [bucket(label, genres[label], positions) for label in genre_order],
+        "year": [bucket(label, years[label], positions) for label in year_order],
+        "category": [bucket(label, categories[label], positions) for label in category_order],
+    }
+
+
+def served_csv_path() -> Path:
+    """The CSV deployed as Portfolio_list.csv (see the module docstring)."""
+    return PRIORITY_CSV_PATH if PRIORITY_CSV_PATH.exists() else CSV_PATH
+
+
+def build_views(csv_path: Path = CSV_PATH) -> Dict[str, object]:
+    artists = load_artists(csv_path)
+    songs = [song for artist in artists.values() for song in artist.songs]
+    views = group_views(songs)
+    by_id = {song.id: song for song in songs}
+    artist_index = {name: index for index, name in enumerate(artists)}
+    return {
+        "version": VIEWS_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "source": {"csv": csv_path.name, "sha1": hashlib.sha1(csv_path.read_bytes()).hexdigest()},
+        "songFields": SONG_FIELDS,
+        "artists": list(artists),
+        "songs": [by_id[song_id].to_row(artist_index[by_id[song_id].artist]) for song_id in sorted(by_id)],
+        "views": views,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute portfolio_views.json for script.js")
+    parser.add_argument("--input", default="", help="Catalog CSV (default: the served one, Portfolio_list_with_priority.csv if present, else Portfolio_list.csv)")
+    parser.add_argument("--output", default=str(VIEWS_PATH))
+    args = parser.parse_args()
+
+    csv_path = Path(args.input) if args.input else served_csv_path()
+    payload = build_views(csv_path)
+    write_precompressed(Path(args.output), minified_json(payload))
+    print(f"Saved: {args.output} from {csv_path.name} ({len(payload['artists'])} artists, {len(payload['songs'])} songs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Canonical SQLite catalog shared by the pipeline scripts.
+
+The CSV files stay the interchange format, but with `--store` the scripts
+read and write this database instead of re-parsing and rewriting whole CSVs:
+
+- every CSV row is one `rows` record (its cells as a JSON object) carrying
+  the normalized artist/album key, indexed, so one album's rows are an
+  index lookup
+- `update_album()` patches just that album's rows in one statement and
+  commits, so a run that dies halfway keeps everything it resolved
+- `import_csv()` / `export_csv()` are straight projections; column order
+  is kept in the `columns` table
+
+The store is only re-imported with `--reimport`, so `open_store()` records
+the size, mtime and SHA-1 of the CSV it imported (`meta` table) and warns
+when the `--input` CSV no longer matches: the run would otherwise ignore
+edits made to it. Exporting back to that same CSV re-records it.
+
+enrich_media.py and build_views.py have no `--store`: they read the CSVs
+that every `--store` run exports at the end, and the views must be built
+from the CSV that is served anyway.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from album_match import normalize
+from checkpoint import atomic_write
+
+
+DEFAULT_STORE_PATH = Path(__file__).resolve().parent / "catalog.sqlite"
+
+AlbumKey = Tuple[str, str]
+
+
+def album_key(row: Dict[str, str]) -> AlbumKey:
+    return normalize(row.get("Artist", "")), normalize(row.get("Album", ""))
+
+
+class CatalogStore:
+    def __init__(self, path: Path = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS columns (
+                position INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS rows (
+                position INTEGER PRIMARY KEY,
+                artist_key TEXT NOT NULL,
+                album_key TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_rows_album ON rows(artist_key, album_key);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    # -- columns -----------------------------------------------------------
+
+    @property
+    def fieldnames(self) -> List[str]:
+        return [name for (name,) in self._conn.execute("SELECT name FROM columns ORDER BY position")]
+
+    def ensure_columns(self, names: Iterable[str]) -> None:
+        existing = set(self.fieldnames)
+        with self._conn:
+            for name in names:
+                if name not in existing:
+                    self._conn.execute("INSERT INTO columns (position, name) VALUES ((SELECT COALESCE(MAX(position), -1) + 1 FROM columns), ?)", (name,))
+                    existing.add(name)
+
+    # -- CSV projection ----------------------------------------------------
+
+    def import_csv(self, csv_path: Path) -> int:
+        """Replace the catalog with the rows of `csv_path`; returns the row count."""
+        with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            fieldnames = list(reader.fieldnames or [])
+            with self._conn:
+                self._conn.execute("DELETE FROM rows")
+                self._conn.execute("DELETE FROM columns")
+                self._conn.executemany("INSERT INTO columns (position, name) VALUES (?, ?)", enumerate(fieldnames))
+                self._conn.executemany(
+                    "INSERT INTO rows (position, artist_key, album_key, data) VALUES (?, ?, ?, ?)",
+                    ((pos, *album_key(row), json.dumps(row, ensure_ascii=False)) for pos, row in enumerate(reader)),
+                )
+        self.record_source(csv_path)
+        return self.count()
+
+    def export_csv(self, csv_path: Path) -> int:
+        fieldnames = self.fieldnames
+        count = 0
+        with atomic_write(csv_path, encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            for row in self.iter_rows():
+                writer.writerow(row)
+                count += 1
+        source = self.source()
+        if source and Path(source["path"]) == csv_path.resolve():
+            self.record_source(csv_path)
+        return count
+
+    # -- source CSV --------------------------------------------------------
+
+    def source(self) -> Dict[str, str]:
+        """What `record_source` stored: path, size, mtime_ns, sha1 (empty if never recorded)."""
+        return {key: value for key, value in self._conn.execute("SELECT key, value FROM meta WHERE key IN ('path', 'size', 'mtime_ns', 'sha1')")}
+
+    def record_source(self, csv_path: Path) -> None:
+        st = csv_path.stat()
+        values = {"path": str(csv_path.resolve()), "size": str(st.st_size), "mtime_ns": str(st.st_mtime_ns), "sha1": file_sha1(csv_path)}
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", values.items())
+
+    def source_changed(self, csv_path: Path) -> str:
+        """Why `csv_path` differs from the imported CSV, or "" when it does not."""
+        source = self.source()
+        if not source:
+            return "the catalog has no record of the CSV it was imported from"
+        if Path(source["path"]) != csv_path.resolve():
+            return f"it was imported from {source['path']}"
+        st = csv_path.stat()
+        if str(st.st_size) == source["size"] and str(st.st_mtime_ns) == source["mtime_ns"]:
+            return ""
+        if file_sha1(csv_path) == source["sha1"]:
+            # touched but not edited: remember the new mtime and skip hashing next time
+            self.record_source(csv_path)
+            return ""
+        return f"{csv_path.name} has changed since it was imported"
+
+    # -- reads -------------------------------------------------------------
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def iter_rows(self) -> Iterator[Dict[str, str]]:
+        for (data,) in self._conn.execute("SELECT data FROM rows ORDER BY position"):
+            yield json.loads(data)
+
+    def album_keys(self) -> List[AlbumKey]:
+        """Distinct non-empty album keys in first-seen order."""
+        return [
+            (artist_key, album_key_)
+            for artist_key, album_key_, _ in self._conn.execute(
+                """
+                SELECT artist_key, album_key, MIN(position) AS first FROM rows
+                WHERE artist_key != '' AND album_key != ''
+                GROUP BY artist_key, album_key ORDER BY first
+                """
+            )
+        ]
+
+    def album_rows(self, key: AlbumKey) -> List[Dict[str, str]]:
+        cursor = self._conn.execute(
+            "SELECT data FROM rows WHERE artist_key = ? AND album_key = ? ORDER BY position",
+            key,
+        )
+        return [json.loads(data) for (data,) in cursor]
+
+    # -- writes ------------------------------------------------------------
+
+    def update_album(self, key: AlbumKey, values: Dict[str, str], unless_set: str = "") -> int:
+        """Set `values` on the rows of one album; returns the rows touched.
+
+        With `unless_set`, only rows where that column is empty (or
+        whitespace) are updated.
+        """
+        self.ensure_columns(values)
+        sql = "UPDATE rows SET data = json_patch(data, ?) WHERE artist_key = ? AND album_key = ?"
+        params: Tuple = (json.dumps(values, ensure_ascii=False), *key)
+        if unless_set:
+            sql += " AND TRIM(COALESCE(json_extract(data, ?), '')) = ''"
+            params += (_json_path(unless_set),)
+        with self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def update_unkeyed(self, values: Dict[str, str]) -> int:
+        """Set `values` on rows missing an artist or album (they belong to no album)."""
+        self.ensure_columns(values)
+        with self._conn:
+            return self._conn.execute(
+                "UPDATE rows SET data = json_patch(data, ?) WHERE artist_key = '' OR album_key = ''",
+                (json.dumps(values, ensure_ascii=False),),
+            ).rowcount
+
+    def set_default(self, column: str, value: str) -> int:
+        """Like `dict.setdefault` on every row: only rows without the column change."""
+        self.ensure_columns([column])
+        with self._conn:
+            return self._conn.execute(
+                "UPDATE rows SET data = json_set(data, ?, ?) WHERE json_type(data, ?) IS NULL",
+                (_json_path(column), value, _json_path(column)),
+            ).rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def file_sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _json_path(column: str) -> str:
+    return "$." + json.dumps(column, ensure_ascii=False)
+
+
+def open_store(path: Optional[str], input_csv: Path, reimport: bool = False) -> CatalogStore:
+    """Open the catalog for a CLI run, importing `input_csv` when it is empty or `reimport` is set."""
+    store = CatalogStore(Path(path) if path else DEFAULT_STORE_PATH)
+    if reimport or store.count() == 0:
+        imported = store.import_csv(input_csv)
+        print(f"Catalog: imported {imported} rows from {input_csv} into {store.path.name}")
+    elif input_csv.exists():
+        reason = store.source_changed(input_csv)
+        if reason:
+            print(f"Catalog: warning, {input_csv} is ignored and {store.path.name} is used as imported ({reason}); pass --reimport to import it again")
+    return store
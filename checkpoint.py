@@ -0,0 +1,153 @@
+"""
+Crash-safe output for the long enrichment runs.
+
+- `atomic_write()` writes a file through a temp file in the same directory and
+  `os.replace()`s it into place, so readers (and a crash) only ever see the
+  old file or the complete new one.
+- `CheckpointJournal` is an append-only JSON-lines log of per-album results,
+  flushed and fsynced as each album completes. A run started with `--resume`
+  replays it and only fetches what is missing; a successful run deletes it.
+
+The first line of a journal names the run kind (`run_id`); a journal written
+by a different script or an older format is ignored rather than replayed. A
+torn last line (crash mid-write) is dropped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+
+JOURNAL_VERSION = 1
+
+
+# Read once at import: os.umask() can only be read by setting it, which
+# would race with other threads creating files.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _target_mode(path: Path) -> int:
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w", encoding: Optional[str] = "utf-8", newline: Optional[str] = None) -> Iterator[IO]:
+    """Open a temp file next to `path`; on clean exit fsync it and rename it over `path`."""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding, newline=None if "b" in mode else newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; keep the mode the file had (or would get from open())
+        os.chmod(tmp_name, _target_mode(path))
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def journal_path_for(output_path: Path) -> Path:
+    return output_path.with_name(output_path.stem + ".checkpoint.jsonl")
+
+
+class CheckpointJournal:
+    def __init__(self, path: Path, run_id: str):
+        self.path = Path(path)
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self.appended = 0
+
+    def header(self) -> Dict[str, object]:
+        return {"journal": JOURNAL_VERSION, "run": self.run_id}
+
+    def replay(self) -> List[Dict[str, object]]:
+        """Records of a previous run of the same kind, oldest first."""
+        if not self.path.exists():
+            return []
+        records: List[Dict[str, object]] = []
+        with self.path.open("r", encoding="utf-8") as f:
+            for lineno, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # torn tail from an interrupted write
+                if lineno == 0:
+                    if record != self.header():
+                        return []
+                    continue
+                records.append(record)
+        return records
+
+    def start(self, keep: bool) -> None:
+        """Open for appending; `keep` continues the existing journal, otherwise it is truncated."""
+        existing = keep and self.path.exists() and self.path.stat().st_size > 0
+        if existing:
+            self._truncate_torn_tail()
+        self._file = self.path.open("a" if existing else "w", encoding="utf-8")
+        if not existing:
+            self._write_line(self.header())
+
+    def _truncate_torn_tail(self) -> None:
+        data = self.path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            with self.path.open("r+b") as f:
+                f.truncate(end)
+
+    def _write_line(self, record: Dict[str, object]) -> None:
+        assert self._file is not None, "journal not started"
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, record: Dict[str, object]) -> None:
+        with self._lock:
+            self._write_line(record)
+            self.appended += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self) -> None:
+        """Close and delete; called once the final output is safely written."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def open_journal(path: Path, run_id: str, resume: bool) -> Tuple[CheckpointJournal, List[Dict[str, object]]]:
+    """
+    Start the journal at `path`. With `resume`, returns the records to replay
+    and keeps appending after them; without it any old journal is replaced
+    (and mentioned, since its work is about to be thrown away).
+    """
+    journal = CheckpointJournal(path, run_id)
+    records = journal.replay() if resume else []
+    if not resume and path.exists():
+        leftover = len(journal.replay())
+        if leftover:
+            print(f"Checkpoint: discarding {leftover} records in {path.name} (use --resume to reuse them)")
+    journal.start(keep=bool(records))
+    return journal, records
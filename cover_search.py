@@ -0,0 +1,195 @@
+"""
+Cover art search for albums the media matcher has no cover for.
+
+`run_cover_search` used to open a new Session per album and try its terms
+("artist album", "artist title", "artist album title", "artist") one after
+another, remembering results per album only. The same terms come up again
+and again across albums (the bare-artist fallback above all), so
+`CoverSearch` instead
+
+- sends every term through one pooled session,
+- searches each distinct term once (after whitespace/case folding) and
+  shares its Future between every album that needs it,
+- runs the term cascades of many albums concurrently; each album has up to
+  `lookahead` terms in flight, starting from its first undecided one, and
+- as soon as an earlier term wins, cancels the album's later terms that
+  have not started yet, unless another album is still waiting on them.
+
+The first term (in cascade order) with artwork decides, exactly as in the
+serial loop; a failed search counts as "no artwork".
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_WORKERS = 4
+DEFAULT_LOOKAHEAD = 2
+USER_AGENT = "Mozilla/5.0"
+
+
+def term_key(term: str) -> str:
+    return " ".join(term.split()).casefold()
+
+
+def cover_search_terms(artist: str, album: str, title: str, is_youtube_url: Callable[[str], bool] = lambda _: False) -> List[str]:
+    """The cascade for one album, in order, blanks and repeats dropped."""
+    title_term = (title or "").split(",")[0].strip()
+    if is_youtube_url(title_term):
+        title_term = ""
+    terms = [f"{artist} {album}", f"{artist} {title_term}", f"{artist} {album} {title_term}", f"{artist}"]
+    cascade: Dict[str, str] = {}
+    for term in terms:
+        term = " ".join(term.split())
+        if term and term_key(term) not in cascade:
+            cascade[term_key(term)] = term
+    return list(cascade.values())
+
+
+class _Cascade:
+    """One album's walk through its terms; `result` resolves to the winning artwork or ""."""
+
+    def __init__(self, service: "CoverSearch", terms: List[str]):
+        self._service = service
+        self._terms = terms
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self._finished = False
+        self.result: Future = Future()
+
+    def advance(self, _done: object = None) -> None:
+        with self._lock:
+            if self._finished:
+                return
+            first_open = 0
+            winner = None
+            while first_open < len(self._futures) and self._futures[first_open].done():
+                artwork = self._futures[first_open].result()
+                if artwork:
+                    winner = artwork
+                    break
+                first_open += 1
+            if winner is None and first_open == len(self._terms):
+                winner = ""
+            if winner is not None:
+                self._finished = True
+                held, self._futures = self._terms[: len(self._futures)], []
+            else:
+                wanted = min(len(self._terms), first_open + self._service.lookahead)
+                started = [self._service._acquire(term) for term in self._terms[len(self._futures) : wanted]]
+                self._futures.extend(started)
+        if winner is not None:
+            for term in held:
+                self._service._release(term)
+            self.result.set_result(winner)
+            return
+        # outside the lock: an already finished Future runs its callback right here
+        for future in started:
+            future.add_done_callback(self.advance)
+
+
+class CoverSearch:
+    """
+    Shared, deduplicating front-end for per-term artwork lookups.
+
+    `search_term(session, term)` returns the artwork URL for one term or "";
+    it runs on the pool's threads with the pool's session.
+    """
+
+    def __init__(
+        self,
+        search_term: Callable[[requests.Session, str], str],
+        workers: int = DEFAULT_WORKERS,
+        lookahead: int = DEFAULT_LOOKAHEAD,
+        is_youtube_url: Callable[[str], bool] = lambda _: False,
+    ):
+        self._search_term = search_term
+        self._is_youtube_url = is_youtube_url
+        self.workers = max(1, workers)
+        self.lookahead = max(1, lookahead)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_maxsize=self.workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cover-search")
+        self._lock = threading.Lock()
+        self._terms: Dict[str, Future] = {}
+        self._waiters: Counter = Counter()
+        self.stats: Counter = Counter()
+
+    def _run(self, term: str) -> str:
+        self._count("searched")
+        try:
+            artwork = self._search_term(self.session, term)
+        except Exception:
+            self._count("error")
+            return ""
+        self._count("found" if artwork else "not_found")
+        return artwork or ""
+
+    def _count(self, event: str) -> None:
+        with self._lock:
+            self.stats[event] += 1
+
+    def _acquire(self, term: str) -> Future:
+        key = term_key(term)
+        with self._lock:
+            future = self._terms.get(key)
+            if future is None or future.cancelled():
+                future = self._executor.submit(self._run, term)
+                self._terms[key] = future
+            else:
+                self.stats["deduped"] += 1
+            self._waiters[key] += 1
+            return future
+
+    def _release(self, term: str) -> None:
+        key = term_key(term)
+        with self._lock:
+            self._waiters[key] -= 1
+            if self._waiters[key] > 0:
+                return
+            del self._waiters[key]
+            future = self._terms.get(key)
+            # a search nobody waits for any more is dropped if it has not started
+            if future is not None and future.cancel():
+                del self._terms[key]
+                self.stats["cancelled"] += 1
+
+    def submit(self, artist: str, album: str, title: str) -> Future:
+        with self._lock:
+            self.stats["albums"] += 1
+        cascade = _Cascade(self, cover_search_terms(artist, album, title, self._is_youtube_url))
+        cascade.advance()
+        return cascade.result
+
+    def search(self, artist: str, album: str, title: str) -> str:
+        return self.submit(artist, album, title).result()
+
+    def report(self) -> str:
+        with self._lock:
+            stats = dict(self.stats)
+        return (
+            f"Cover search: {stats.get('albums', 0)} albums, {stats.get('searched', 0)} terms searched "
+            f"({stats.get('found', 0)} with artwork, {stats.get('error', 0)} errors), "
+            f"{stats.get('deduped', 0)} deduped, {stats.get('cancelled', 0)} cancelled "
+            f"({self.workers} workers, lookahead {self.lookahead})"
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self) -> "CoverSearch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -2,45 +2,329 @@
 # -*- coding: utf-8 -*-
 """
 톤스튜디오 디스코그래피 크롤러
-양하정이 참여한 모든 곡을 연도별로 수집합니다.
+엔지니어(기본: 양하정)가 참여한 모든 곡을 연도별로 수집합니다.
+여러 엔지니어를 넘기면 페이지마다 한 번의 순회로 모두 찾습니다 (EngineerMatcher).
+페이지별 ETag/Last-Modified, 본문 해시와 파싱 결과를 상태 파일에 남겨 두고
+(PageState), 다음 크롤링에서는 조건부 요청을 보내 304 이거나 본문이 같으면
+파싱 없이 지난 결과를 다시 씁니다.
+--parse-workers 를 주면 요청 스레드는 받기만 하고 파싱은 프로세스 풀(ParsePool)에서 합니다.
 """
 
+import argparse
+import hashlib
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, NavigableString, Tag
 import re
-from collections import defaultdict
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 from urllib.parse import urljoin, urlparse
 
-def crawl_tonestudio_page(url):
+from checkpoint import atomic_write
+from parse_pool import ParsePool, usable_workers
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    etree = None
+    lxml_html = None
+
+# 크레딧 한 줄의 경계가 되는 블록 태그 (br 도 줄바꿈으로 취급)
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'header', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul', 'br',
+])
+SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'template', 'head'])
+
+DEFAULT_BASE_URL = "https://tonestudio.co.kr/tone-discography/d-2024/"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+DEFAULT_ENGINEERS = {'양하정': ['양하정']}
+# 역할 표기 순서 (parse_song_info 가 찾는 순서)
+ROLE_ORDER = ('REC', 'MIX', 'MA')
+DEFAULT_STATE_PATH = 'tonestudio_page_state.json'
+# 파싱 결과의 형식이나 파싱 규칙이 바뀌면 올려서 저장된 결과를 버립니다
+PAGE_STATE_VERSION = 1
+
+
+def _fold(ch):
+    """대소문자 무시용 한 글자 변환 (길이가 바뀌는 글자는 그대로 두어 위치가 어긋나지 않게 합니다)"""
+    low = ch.lower()
+    return low if len(low) == 1 else ch
+
+
+def _is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+class EngineerMatcher:
     """
-    톤스튜디오 디스코그래피 페이지를 크롤링하여 양하정이 참여한 곡을 찾습니다.
+    여러 엔지니어의 이름/별칭을 한 줄에서 한 번에 찾는 Aho-Corasick 매처.
+
+    모든 별칭으로 만든 오토마톤을 라인의 글자마다 한 번씩만 따라가므로,
+    추적하는 엔지니어가 1명이든 50명이든 라인당 비용이 거의 같습니다.
+    영문 별칭은 대소문자를 무시하고 단어 경계에서만 인정하며 ('Kim' 이
+    'Kimchi' 에 걸리지 않도록), 한글 이름은 예전처럼 부분 문자열로 찾습니다.
+    """
+
+    def __init__(self, engineers=None):
+        """
+        engineers: {이름: [별칭, ...]} 또는 이름 목록 (이름 자신도 항상 별칭입니다)
+        """
+        if engineers is None:
+            engineers = DEFAULT_ENGINEERS
+        if not isinstance(engineers, dict):
+            engineers = {name: [] for name in engineers}
+        self.names = list(engineers)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        normalized = {}
+        for name, aliases in engineers.items():
+            normalized[name] = []
+            for alias in dict.fromkeys([name, *aliases]):
+                alias = ' '.join(alias.split())
+                if alias:
+                    self._add(alias, name)
+                    normalized[name].append(alias)
+        self._link()
+        # 같은 이름/별칭이면 같은 키 (PageState 가 저장된 결과를 다시 써도 되는지 판단)
+        encoded = json.dumps(normalized, ensure_ascii=False, sort_keys=True)
+        self.key = hashlib.sha1(encoded.encode('utf-8')).hexdigest()[:16]
+        # 루트 상태에서는 별칭의 첫 글자가 나올 때까지 정규식(C 구현)으로 건너뜁니다
+        first = ''.join(sorted(self._goto[0]))
+        self._skip = re.compile('[' + re.escape(first) + ']') if first else re.compile('(?!)')
+
+    def _add(self, alias, name):
+        state = 0
+        for ch in alias:
+            ch = _fold(ch)
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        bounded = (_is_word_char(alias[0]), _is_word_char(alias[-1]))
+        self._out[state].append((len(alias), name, bounded))
+
+    def _link(self):
+        """실패 링크를 너비 우선으로 채우고, 실패 상태의 출력도 물려받습니다."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                # 깊이 1 상태의 실패 링크는 루트(0) 그대로이므로 그 아래 깊이부터 채웁니다
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def find(self, text):
+        """
+        text 안의 엔지니어 언급을 [(시작, 끝, 이름), ...] 으로 돌려줍니다.
+        겹치면 먼저 시작하는 것, 같은 위치면 더 긴 별칭을 택합니다.
+        """
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = ''.join(_fold(ch) for ch in text)
+        skip = self._skip.search
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        state = 0
+        pos = -1
+        size = len(folded)
+        while pos + 1 < size:
+            pos += 1
+            if not state:
+                hit = skip(folded, pos)
+                if hit is None:
+                    break
+                pos = hit.start()
+            ch = folded[pos]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, name, (bound_start, bound_end) in out[state]:
+                start, end = pos + 1 - length, pos + 1
+                if bound_start and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if bound_end and end < len(text) and _is_word_char(text[end]):
+                    continue
+                found.append((start, end, name))
+        if len(found) < 2:
+            return found
+        found.sort(key=lambda m: (m[0], m[0] - m[1]))
+        mentions = []
+        for match in found:
+            if not mentions or match[0] >= mentions[-1][1]:
+                mentions.append(match)
+        return mentions
+
+    def __contains__(self, text):
+        return bool(self.find(text))
+
+
+DEFAULT_MATCHER = EngineerMatcher()
+
+
+def parse_engineers(specs):
+    """
+    '이름' 또는 '이름=별칭1,별칭2' 형식의 목록을 {이름: [별칭, ...]} 으로 바꿉니다.
+    """
+    engineers = {}
+    for spec in specs:
+        name, _, aliases = spec.partition('=')
+        name = name.strip()
+        if not name:
+            raise ValueError(f"엔지니어 이름이 없습니다: {spec!r}")
+        engineers.setdefault(name, []).extend(a.strip() for a in aliases.split(',') if a.strip())
+    return engineers
+
+class PageState:
+    """
+    페이지 URL 별 {etag, last_modified, sha256, matcher, songs, parsed_at} 를 JSON 파일로 보관합니다.
+
+    저장된 결과는 같은 엔지니어 구성(EngineerMatcher.key)으로 파싱했을 때만
+    다시 씁니다. 구성이 다르면 조건부 헤더 없이 받아서 새로 파싱합니다.
+    여러 스레드가 함께 씁니다 (crawl_years_parallel).
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self.pages = self._load()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if payload.get('version') != PAGE_STATE_VERSION:
+            return {}
+        return payload.get('pages') or {}
+
+    def lookup(self, url, matcher):
+        """matcher 로 파싱한 저장 결과가 있으면 그 항목, 없으면 None"""
+        with self._lock:
+            entry = self.pages.get(url)
+        if entry is None or entry.get('matcher') != matcher.key:
+            return None
+        return entry
+
+    def reuse(self, url, event, response=None):
+        """304(event='not_modified') 또는 본문 해시가 같을 때(event='unchanged') 저장 결과를 씁니다."""
+        with self._lock:
+            entry = self.pages[url]
+            # 검증자가 바뀌었을 때만 다시 저장합니다 (아무것도 안 바뀐 밤에는 파일을 쓰지 않음)
+            for field, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified')):
+                value = response.headers.get(header) if response is not None else None
+                if value and value != entry.get(field):
+                    entry[field] = value
+                    self._dirty = True
+            self.stats[event] += 1
+            return entry['songs']
+
+    def store(self, url, response, digest, matcher, songs):
+        with self._lock:
+            self.pages[url] = {
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', ''),
+                'sha256': digest,
+                'matcher': matcher.key,
+                'songs': songs,
+                'parsed_at': round(time.time(), 3),
+            }
+            self.stats['parsed'] += 1
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            with atomic_write(self.path) as f:
+                json.dump({'version': PAGE_STATE_VERSION, 'pages': self.pages}, f, ensure_ascii=False)
+            self._dirty = False
+
+    def report(self):
+        return (f"페이지 상태: 파싱 {self.stats['parsed']}, 304 {self.stats['not_modified']}, "
+                f"본문 동일 {self.stats['unchanged']} ({self.path})")
+
+def conditional_headers(entry):
+    """저장된 검증자로 만든 조건부 요청 헤더"""
+    headers = {}
+    if entry is not None:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def make_session(pool_size=10):
+    """
+    모든 연도 요청이 함께 쓰는 세션 (호스트당 커넥션 풀 크기 = pool_size)
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+def crawl_tonestudio_page(url, session=None, cancelled=None, matcher=None, state=None, parse_pool=None):
+    """
+    톤스튜디오 디스코그래피 페이지를 크롤링하여 엔지니어가 참여한 곡을 찾습니다.
     
     Args:
         url: 크롤링할 웹페이지 URL
+        session: 공유 requests.Session (없으면 단발 요청)
+        cancelled: threading.Event - 설정되면 요청/파싱을 건너뜁니다
+        matcher: EngineerMatcher (없으면 양하정만)
+        state: PageState - 있으면 조건부 요청을 보내고, 바뀌지 않은 페이지는 파싱하지 않습니다
+        parse_pool: ParsePool - 있으면 파싱을 워커 프로세스에서 합니다
         
     Returns:
-        list: 양하정이 참여한 곡들의 리스트
+        list: 엔지니어가 참여한 곡들의 리스트
     """
+    matcher = matcher or DEFAULT_MATCHER
     try:
+        if cancelled is not None and cancelled.is_set():
+            return []
+        entry = state.lookup(url, matcher) if state is not None else None
         headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': USER_AGENT,
+            **conditional_headers(entry),
         }
-        response = requests.get(url, headers=headers, timeout=10)
+        getter = session.get if session is not None else requests.get
+        response = getter(url, headers=headers, timeout=10)
+        if entry is not None and response.status_code == 304:
+            return state.reuse(url, 'not_modified', response)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # 페이지에서 모든 텍스트를 가져옴
-        page_text = soup.get_text()
-        
-        # 연도 추출 (URL이나 페이지에서)
-        year = extract_year_from_url(url) or extract_year_from_page(soup)
-        
-        # 양하정이 포함된 모든 라인 찾기
-        songs = find_yanghajung_songs(soup, year)
-        
+        # 다른 후보 URL 이 이미 이겼다면 파싱하지 않음
+        if cancelled is not None and cancelled.is_set():
+            return []
+        parse = parse_pool.run if parse_pool is not None else (lambda fn, *args: fn(*args))
+        if state is None:
+            return parse(parse_credit_page, response.content, url, matcher)
+        # 검증자를 주지 않거나 무시하는 서버라도 본문이 같으면 파싱하지 않음
+        digest = hashlib.sha256(response.content).hexdigest()
+        if entry is not None and entry.get('sha256') == digest:
+            return state.reuse(url, 'unchanged', response)
+        songs = parse(parse_credit_page, response.content, url, matcher)
+        state.store(url, response, digest, matcher, songs)
         return songs
         
     except requests.RequestException as e:
@@ -50,6 +334,21 @@ def crawl_tonestudio_page(url):
         print(f"크롤링 오류: {e}")
         return []
 
+def parse_credit_page(content, url, matcher=None):
+    """
+    페이지 HTML(bytes)에서 연도와 엔지니어 크레딧을 추출합니다.
+    lxml 이 설치되어 있으면 BeautifulSoup 트리를 만들지 않고 lxml 로 바로 처리합니다.
+    """
+    if lxml_html is not None:
+        parser = lxml_html.HTMLParser(encoding='utf-8')
+        root = lxml_html.document_fromstring(content, parser=parser)
+        year = extract_year_from_url(url) or extract_year_from_tree(root)
+        return extract_credits(iter_credit_lines_lxml(root), year, matcher)
+
+    soup = BeautifulSoup(content, 'html.parser', from_encoding='utf-8')
+    year = extract_year_from_url(url) or extract_year_from_page(soup)
+    return find_yanghajung_songs(soup, year, matcher)
+
 def extract_year_from_url(url):
     """URL에서 연도 추출"""
     match = re.search(r'/(\d{4})/', url)
@@ -69,80 +368,174 @@ def extract_year_from_page(soup):
                 return year
     return None
 
-def find_yanghajung_songs(soup, year):
+def extract_year_from_tree(root):
+    """lxml 트리에서 연도 추출 (extract_year_from_page 와 동일한 규칙)"""
+    for tag in root.iter('h1', 'h2', 'h3'):
+        match = re.search(r'(\d{4})', tag.text_content())
+        if match:
+            year = match.group(1)
+            if 2010 <= int(year) <= 2025:
+                return year
+    return None
+
+def _join_line(pieces):
+    line = ' '.join(''.join(pieces).split())
+    pieces.clear()
+    return line
+
+def iter_credit_lines(soup):
+    """
+    BeautifulSoup 트리를 한 번만 순회하며 크레딧 라인을 순서대로 돌려줍니다.
+    각 텍스트 노드는 자신을 감싸는 가장 안쪽 블록(또는 br 로 나뉜 구간)의
+    한 라인에만 속하므로, 중첩된 div 가 있어도 같은 텍스트를 다시 읽지 않습니다.
+    """
+    pieces = []
+    stack = [(soup, False)]
+    while stack:
+        node, closing = stack.pop()
+        if closing:
+            line = _join_line(pieces)
+            if line:
+                yield line
+            continue
+        if isinstance(node, Tag):
+            if node.name in SKIP_TAGS:
+                continue
+            if node.name in BLOCK_TAGS:
+                line = _join_line(pieces)
+                if line:
+                    yield line
+                stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.contents))
+        elif type(node) is NavigableString:
+            pieces.append(str(node))
+    line = _join_line(pieces)
+    if line:
+        yield line
+
+def iter_credit_lines_lxml(root):
+    """iter_credit_lines 의 lxml 버전 (동일한 라인을 돌려줍니다)"""
+    pieces = []
+    skip_depth = 0
+    for event, el in etree.iterwalk(root, events=('start', 'end')):
+        tag = el.tag if isinstance(el.tag, str) else None
+        if event == 'start':
+            if skip_depth or tag is None or tag in SKIP_TAGS:
+                skip_depth += 1
+                continue
+            if tag in BLOCK_TAGS:
+                line = _join_line(pieces)
+                if line:
+                    yield line
+            if el.text:
+                pieces.append(el.text)
+            continue
+
+        if skip_depth:
+            skip_depth -= 1
+            if skip_depth:
+                continue
+        elif tag in BLOCK_TAGS:
+            line = _join_line(pieces)
+            if line:
+                yield line
+        # tail 텍스트는 부모 블록의 라인에 이어집니다
+        if el.tail and el is not root:
+            pieces.append(el.tail)
+    line = _join_line(pieces)
+    if line:
+        yield line
+
+def extract_credits(lines, year, matcher=None):
     """
-    페이지에서 양하정이 포함된 모든 곡을 찾습니다.
+    크레딧 라인에서 엔지니어가 포함된 곡을 파싱합니다.
+    라인마다 매처를 한 번만 돌리고, (아티스트, 제목) 해시로 중복을 제거하며
+    처음 나온 순서를 유지합니다. 같은 곡이 다른 엔지니어로 다시 나오면
+    그 엔지니어만 처음 항목에 더합니다.
     """
+    matcher = matcher or DEFAULT_MATCHER
     songs = []
-    
-    # 다양한 패턴으로 양하정 찾기
-    patterns = [
-        r'양하정',
-        r'Mixed by 양하정',
-        r'Mixed by.*양하정',
-        r'양하정.*Mixed',
-        r'REC.*양하정',
-        r'양하정.*REC',
-        r'MIX.*양하정',
-        r'양하정.*MIX',
-        r'MA.*양하정',
-        r'양하정.*MA',
-    ]
-    
-    # 모든 텍스트 노드 찾기
-    all_text_elements = soup.find_all(string=True)
-    
-    for text in all_text_elements:
-        if '양하정' in text:
-            # 부모 요소 찾기
-            parent = text.parent
-            if parent:
-                # 전체 라인 텍스트 가져오기
-                line_text = parent.get_text(strip=True)
-                
-                # 곡 정보 파싱
-                song_info = parse_song_info(line_text, year)
-                if song_info:
-                    # 중복 제거
-                    if not any(s['title'] == song_info['title'] and 
-                              s['artist'] == song_info['artist'] 
-                              for s in songs):
-                        songs.append(song_info)
-    
-    # 리스트 항목에서도 찾기
-    for li in soup.find_all(['li', 'p', 'div']):
-        text = li.get_text()
-        if '양하정' in text:
-            song_info = parse_song_info(text, year)
-            if song_info:
-                if not any(s['title'] == song_info['title'] and 
-                          s['artist'] == song_info['artist'] 
-                          for s in songs):
-                    songs.append(song_info)
-    
+    seen = {}
+    for line in lines:
+        mentions = matcher.find(line)
+        if not mentions:
+            continue
+        song_info = _parse_song_info(line, year, mentions)
+        if not song_info:
+            continue
+        key = (song_info['artist'], song_info['title'])
+        first = seen.get(key)
+        if first is None:
+            seen[key] = song_info
+            songs.append(song_info)
+            continue
+        added = {name: roles for name, roles in song_info['engineers'].items() if name not in first['engineers']}
+        if added:
+            first['engineers'].update(added)
+            first['roles'] = merge_roles(first['roles'], *added.values())
     return songs
 
-def parse_song_info(text, year):
+def find_yanghajung_songs(soup, year, matcher=None):
     """
-    텍스트에서 곡 정보를 파싱합니다.
+    페이지에서 엔지니어(기본: 양하정)가 포함된 모든 곡을 찾습니다.
     """
-    # 양하정이 없는 경우 None 반환
-    if '양하정' not in text:
-        return None
-    
-    # 기본 정보 초기화
-    artist = None
-    title = None
-    album = None
+    return extract_credits(iter_credit_lines(soup), year, matcher)
+
+def detect_roles(text):
+    """텍스트 조각에서 작업 역할(REC/MIX/MA)을 찾습니다."""
     roles = []
-    
-    # 작업 역할 추출
     if '[REC' in text or 'REC,' in text:
         roles.append('REC')
     if '[MIX' in text or 'MIX,' in text or 'Mixed by' in text:
         roles.append('MIX')
     if '[MA' in text or 'MA]' in text:
         roles.append('MA')
+    return roles
+
+def merge_roles(*role_lists):
+    """여러 역할 목록의 합집합 (ROLE_ORDER 순)"""
+    merged = set()
+    for roles in role_lists:
+        merged.update(roles)
+    return [role for role in ROLE_ORDER if role in merged]
+
+def attribute_roles(text, mentions):
+    """
+    라인의 역할을 언급된 엔지니어에게 나눠 줍니다.
+    역할 표기는 이름 앞에 오므로 ("[REC, MIX] Mixed by 양하정"), 각 역할은
+    바로 뒤에 나오는 엔지니어의 것이 되고 마지막 이름 뒤의 역할은 마지막
+    엔지니어의 것이 됩니다. 엔지니어가 한 명이면 라인의 역할이 모두 그의 것입니다.
+    """
+    engineers = {}
+    prev_end = 0
+    for i, (start, end, name) in enumerate(mentions):
+        segment = text[prev_end:start]
+        if i == len(mentions) - 1:
+            segment += ' ' + text[end:]
+        engineers[name] = merge_roles(engineers.get(name, []), detect_roles(segment))
+        prev_end = end
+    return engineers
+
+def parse_song_info(text, year, matcher=None):
+    """
+    텍스트에서 곡 정보를 파싱합니다.
+    """
+    # 엔지니어가 없는 경우 None 반환
+    mentions = (matcher or DEFAULT_MATCHER).find(text)
+    if not mentions:
+        return None
+    return _parse_song_info(text, year, mentions)
+
+def _parse_song_info(text, year, mentions):
+    """parse_song_info 본체 (mentions: 매처가 이미 찾은 엔지니어 언급)"""
+    # 기본 정보 초기화
+    artist = None
+    title = None
+    album = None
+    
+    # 작업 역할 추출 (라인 전체, 그리고 엔지니어별)
+    engineers = attribute_roles(text, mentions)
+    roles = merge_roles(*engineers.values())
     
     # 곡 제목 추출 (따옴표나 작은따옴표 사이)
     title_patterns = [
@@ -195,10 +588,23 @@ def parse_song_info(text, year):
         'title': title,
         'album': album,
         'roles': roles,
+        'engineers': engineers,
         'raw_text': text.strip()
     }
 
-def crawl_multiple_years(base_url, start_year=2010, end_year=2025):
+def candidate_urls(base_url, year):
+    """연도 페이지 후보 URL (중복 제거, 우선순위 순)"""
+    urls = []
+    for url in [
+        base_url.replace('2024', str(year)),
+        f"https://tonestudio.co.kr/tone-discography/d-{year}/",
+        f"https://tonestudio.co.kr/tone-discography/{year}/",
+    ]:
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+def crawl_multiple_years(base_url, start_year=2010, end_year=2025, workers=1, matcher=None, state=None, parse_workers=0):
     """
     여러 연도의 페이지를 크롤링합니다.
     
@@ -206,25 +612,41 @@ def crawl_multiple_years(base_url, start_year=2010, end_year=2025):
         base_url: 기본 URL (예: https://tonestudio.co.kr/tone-discography/d-2024/)
         start_year: 시작 연도
         end_year: 종료 연도
+        workers: 동시에 요청할 수 (1 이면 순차 크롤링)
+        matcher: EngineerMatcher (없으면 양하정만)
+        state: PageState (있으면 바뀌지 않은 페이지는 파싱하지 않음)
+        parse_workers: 파싱 프로세스 수 (0 이면 요청 스레드에서 파싱)
         
     Returns:
         dict: 연도별 곡 목록
     """
+    return crawl_years(base_url, range(start_year, end_year + 1), workers, matcher, state, parse_workers)
+
+def crawl_years(base_url, years, workers=1, matcher=None, state=None, parse_workers=0):
+    """지정한 연도 목록을 크롤링합니다 (workers > 1 이면 병렬). 끝나면 state 를 저장합니다."""
+    # 워커 프로세스는 요청 스레드보다 먼저 띄웁니다 (ParsePool 참고)
+    parse_pool = ParsePool(parse_workers) if parse_workers else None
+    try:
+        return _crawl_years(base_url, list(years), workers, matcher, state, parse_pool)
+    finally:
+        if parse_pool is not None:
+            parse_pool.close()
+        if state is not None:
+            state.save()
+
+def _crawl_years(base_url, years, workers, matcher, state, parse_pool):
+    session = make_session(max(workers, 1))
+    if workers > 1:
+        return crawl_years_parallel(base_url, years, session, workers, matcher, state, parse_pool)
+
     all_songs = defaultdict(list)
     
-    for year in range(start_year, end_year + 1):
-        # URL 패턴 시도
-        url_patterns = [
-            f"{base_url.replace('2024', str(year))}",
-            f"https://tonestudio.co.kr/tone-discography/d-{year}/",
-            f"https://tonestudio.co.kr/tone-discography/{year}/",
-        ]
-        
+    for year in years:
         print(f"\n[{year}년 크롤링 시작]")
         
-        for url in url_patterns:
+        for url in candidate_urls(base_url, year):
             try:
-                songs = crawl_tonestudio_page(url)
+                songs = crawl_tonestudio_page(url, session=session, matcher=matcher, state=state, parse_pool=parse_pool)
                 if songs:
                     all_songs[year].extend(songs)
                     print(f"  ✓ {url}: {len(songs)}곡 발견")
@@ -235,12 +657,65 @@ def crawl_multiple_years(base_url, start_year=2010, end_year=2025):
     
     return dict(all_songs)
 
-def print_results(songs_by_year):
+def crawl_years_parallel(base_url, years, session, workers, matcher=None, state=None, parse_pool=None):
+    """
+    모든 연도의 후보 URL 을 한 번에 요청합니다.
+    한 연도에서 곡을 돌려준 후보가 나오면 그 연도의 나머지 후보는 취소합니다
+    (아직 시작 전이면 실행하지 않고, 요청 중이면 결과를 파싱하지 않고 버립니다).
+    """
+    results = {}
+    won = {year: threading.Event() for year in years}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for year in years:
+            for url in candidate_urls(base_url, year):
+                future = pool.submit(crawl_tonestudio_page, url, session, won[year], matcher, state, parse_pool)
+                futures[future] = (year, url)
+
+        for future in as_completed(futures):
+            year, url = futures[future]
+            if future.cancelled() or won[year].is_set():
+                continue
+            songs = future.result()
+            if not songs:
+                continue
+            won[year].set()
+            results[year] = songs
+            print(f"  ✓ [{year}년] {url}: {len(songs)}곡 발견")
+            for other, (other_year, _) in futures.items():
+                if other_year == year and other is not future:
+                    other.cancel()
+
+    for year in years:
+        if year not in results:
+            print(f"  ✗ [{year}년] 곡을 찾지 못했습니다")
+    return {year: results[year] for year in years if year in results}
+
+def parse_years(text):
+    """'2010-2025', '2019', '2010,2015-2017' 형식의 연도 지정을 정렬된 목록으로 변환"""
+    years = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            years.update(range(int(start), int(end) + 1))
+        else:
+            years.add(int(part))
+    return sorted(years)
+
+def engineer_label(matcher):
+    """출력용 엔지니어 이름 ('양하정', '양하정·홍길동')"""
+    return '·'.join((matcher or DEFAULT_MATCHER).names)
+
+def print_results(songs_by_year, matcher=None):
     """
     결과를 보기 좋게 출력합니다.
     """
+    matcher = matcher or DEFAULT_MATCHER
     print("\n" + "="*80)
-    print("양하정 참여 곡 목록 (연도별)")
+    print(f"{engineer_label(matcher)} 참여 곡 목록 (연도별)")
     print("="*80)
     
     for year in sorted(songs_by_year.keys(), reverse=True):
@@ -254,10 +729,17 @@ def print_results(songs_by_year):
                 print(f"   곡 제목: {song['title']}")
                 if song['album']:
                     print(f"   앨범/트랙: {song['album']}")
-                if song['roles']:
+                if len(matcher.names) > 1:
+                    for name, roles in song['engineers'].items():
+                        print(f"   {name}: {', '.join(roles) or '-'}")
+                elif song['roles']:
                     print(f"   작업 역할: {', '.join(song['roles'])}")
                 print(f"   원문: {song['raw_text'][:100]}...")
 
+    if len(matcher.names) > 1:
+        counts = Counter(name for songs in songs_by_year.values() for song in songs for name in song['engineers'])
+        print("\n엔지니어별 곡 수: " + ", ".join(f"{name} {counts[name]}곡" for name in matcher.names))
+
 def save_to_json(songs_by_year, filename='yanghajung_songs.json'):
     """
     결과를 JSON 파일로 저장합니다.
@@ -268,49 +750,59 @@ def save_to_json(songs_by_year, filename='yanghajung_songs.json'):
 
 def main():
     """
-    메인 함수
+    메인 함수 (cron 에서도 돌 수 있도록 입력 프롬프트 없이 인자로만 동작)
     """
+    parser = argparse.ArgumentParser(description="톤스튜디오 디스코그래피 크롤러 - 엔지니어 참여 곡 수집")
+    parser.add_argument("--url", default=DEFAULT_BASE_URL, help="단일 페이지 모드에서 크롤링할 URL")
+    parser.add_argument("--years", default="", help="여러 연도 크롤링 (예: 2010-2025, 2019, 2010,2015-2017)")
+    parser.add_argument("--workers", type=int, default=4, help="동시 요청 수 (1 이면 순차)")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="연도 URL 을 만들 기준 URL")
+    parser.add_argument("--output", default="yanghajung_songs.json", help="결과 JSON 파일")
+    parser.add_argument("--engineer", action="append", default=[], metavar="이름[=별칭,...]",
+                        help="찾을 엔지니어 (여러 번 지정 가능, 기본: 양하정)")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="페이지별 ETag/해시/파싱 결과 파일")
+    parser.add_argument("--no-state", action="store_true", help="상태 파일 없이 모든 페이지를 받아 파싱")
+    parser.add_argument("--parse-workers", type=int, default=0, help="파싱 프로세스 수 (0 이면 요청 스레드에서 파싱, 코어가 1개면 항상 0)")
+    args = parser.parse_args()
+    state = None if args.no_state else PageState(args.state)
+    try:
+        matcher = EngineerMatcher(parse_engineers(args.engineer) or None)
+    except ValueError as e:
+        parser.error(str(e))
+
     print("톤스튜디오 디스코그래피 크롤러")
-    print("양하정 참여 곡 수집\n")
-    
-    # 기본 URL
-    base_url = "https://tonestudio.co.kr/tone-discography/d-2024/"
-    
-    # 단일 페이지 크롤링
-    print("단일 페이지 크롤링 모드")
-    print(f"URL: {base_url}")
-    
-    url = input("\n크롤링할 URL을 입력하세요 (엔터 시 기본 URL 사용): ").strip()
-    if not url:
-        url = base_url
-    
-    # 단일 페이지 크롤링
-    songs = crawl_tonestudio_page(url)
-    
-    if songs:
-        print(f"\n✓ {len(songs)}곡 발견!")
-        for song in songs:
-            print(f"\n- {song['artist']} – '{song['title']}'")
-            if song['roles']:
-                print(f"  작업: {', '.join(song['roles'])}")
-    else:
-        print("\n✗ 양하정이 참여한 곡을 찾을 수 없습니다.")
-    
-    # 여러 연도 크롤링 여부 확인
-    multi_year = input("\n여러 연도를 크롤링하시겠습니까? (y/n): ").strip().lower()
-    
-    if multi_year == 'y':
-        start_year = int(input("시작 연도 (기본: 2010): ") or "2010")
-        end_year = int(input("종료 연도 (기본: 2025): ") or "2025")
-        
-        all_songs = crawl_multiple_years(base_url, start_year, end_year)
-        
-        # 결과 출력
-        print_results(all_songs)
+    print(f"{engineer_label(matcher)} 참여 곡 수집\n")
+
+    if not args.years:
+        print("단일 페이지 크롤링 모드")
+        print(f"URL: {args.url}")
+        songs = crawl_tonestudio_page(args.url, matcher=matcher, state=state)
+        if state is not None:
+            state.save()
+            print(state.report())
         
-        # JSON 저장
-        save_to_json(all_songs)
+        if songs:
+            print(f"\n✓ {len(songs)}곡 발견!")
+            for song in songs:
+                print(f"\n- {song['artist']} – '{song['title']}'")
+                if song['roles']:
+                    print(f"  작업: {', '.join(song['roles'])}")
+        else:
+            print(f"\n✗ {engineer_label(matcher)} 참여 곡을 찾을 수 없습니다.")
+        return
+
+    years = parse_years(args.years)
+    if not years:
+        parser.error("--years 에 연도가 없습니다")
+    all_songs = crawl_years(args.base_url, years, args.workers, matcher, state, usable_workers(args.parse_workers))
+    if state is not None:
+        print(state.report())
+
+    # 결과 출력
+    print_results(all_songs, matcher)
+
+    # JSON 저장
+    save_to_json(all_songs, args.output)
 
 if __name__ == "__main__":
     main()
-
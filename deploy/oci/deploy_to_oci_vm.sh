@@ -22,18 +22,37 @@ fi
 
 WORK_DIR="/tmp/sound-portfolio-deploy"
 
+# pipeline.py's output is served when present (see build_views.served_csv_path)
+SERVED_CSV="$ROOT_DIR/Portfolio_list_with_priority.csv"
+if [[ ! -f "$SERVED_CSV" ]]; then
+  SERVED_CSV="$ROOT_DIR/Portfolio_list.csv"
+fi
+
 echo "[1/4] Preparing local deployment bundle..."
+if python3 -c "import PIL" 2>/dev/null; then
+  python3 "$ROOT_DIR/build_images.py"
+fi
+python3 "$ROOT_DIR/enrich_media.py" --shards-only
+python3 "$ROOT_DIR/build_views.py" --input "$SERVED_CSV"
 rm -rf "$ROOT_DIR/.deploy_tmp"
-mkdir -p "$ROOT_DIR/.deploy_tmp"
+mkdir -p "$ROOT_DIR/.deploy_tmp/media" "$ROOT_DIR/.deploy_tmp/images"
 cp "$ROOT_DIR/index.html" "$ROOT_DIR/.deploy_tmp/"
 cp "$ROOT_DIR/styles.css" "$ROOT_DIR/.deploy_tmp/"
 cp "$ROOT_DIR/script.js" "$ROOT_DIR/.deploy_tmp/"
-cp "$ROOT_DIR/Portfolio_list.csv" "$ROOT_DIR/.deploy_tmp/"
+cp "$SERVED_CSV" "$ROOT_DIR/.deploy_tmp/Portfolio_list.csv"
 cp "$ROOT_DIR/portfolio_media_map.json" "$ROOT_DIR/.deploy_tmp/"
+cp "$ROOT_DIR"/portfolio_media_manifest.json* "$ROOT_DIR/.deploy_tmp/"
+cp "$ROOT_DIR"/portfolio_views.json* "$ROOT_DIR/.deploy_tmp/"
+if [[ -d "$ROOT_DIR/media" ]]; then
+  cp -r "$ROOT_DIR"/media/. "$ROOT_DIR/.deploy_tmp/media/"
+fi
+if [[ -d "$ROOT_DIR/images" ]]; then
+  cp -r "$ROOT_DIR"/images/. "$ROOT_DIR/.deploy_tmp/images/"
+fi
 
 echo "[2/4] Uploading files to VM ($VM_IP)..."
 ssh -i "$SSH_KEY" -o StrictHostKeyChecking=accept-new "${SSH_USER}@${VM_IP}" "mkdir -p ${WORK_DIR}"
-scp -i "$SSH_KEY" "$ROOT_DIR/.deploy_tmp/"* "${SSH_USER}@${VM_IP}:${WORK_DIR}/"
+scp -r -i "$SSH_KEY" "$ROOT_DIR/.deploy_tmp/"* "${SSH_USER}@${VM_IP}:${WORK_DIR}/"
 
 echo "[3/4] Installing and configuring Nginx..."
 ssh -i "$SSH_KEY" "${SSH_USER}@${VM_IP}" "bash -s" <<EOF
@@ -46,6 +65,12 @@ sudo cp ${WORK_DIR}/styles.css /var/www/portfolio/styles.css
 sudo cp ${WORK_DIR}/script.js /var/www/portfolio/script.js
 sudo cp ${WORK_DIR}/Portfolio_list.csv /var/www/portfolio/Portfolio_list.csv
 sudo cp ${WORK_DIR}/portfolio_media_map.json /var/www/portfolio/portfolio_media_map.json
+sudo cp ${WORK_DIR}/portfolio_media_manifest.json* /var/www/portfolio/
+sudo cp ${WORK_DIR}/portfolio_views.json* /var/www/portfolio/
+sudo rm -rf /var/www/portfolio/media
+sudo cp -r ${WORK_DIR}/media /var/www/portfolio/media
+sudo rm -rf /var/www/portfolio/images
+sudo cp -r ${WORK_DIR}/images /var/www/portfolio/images
 
 sudo tee /etc/nginx/sites-available/portfolio >/dev/null <<NGINX
 server {
@@ -60,6 +85,20 @@ server {
         try_files \$uri \$uri/ /index.html;
     }
 
+    # serve the precompressed .gz next to each file when the client accepts gzip
+    gzip_static on;
+
+    # media shards carry a content hash in the name, so they never change.
+    # ^~ keeps the *.json regex location below from taking these requests.
+    location ^~ /media/ {
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
+
+    # image renditions are named after the source bytes and render settings
+    location ^~ /images/ {
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
+
     location ~* \\.(css|js|json|csv)$ {
         add_header Cache-Control "public, max-age=300";
     }
@@ -3,28 +3,62 @@
 Build media matches for Portfolio_list.csv.
 
 Outputs:
-  - portfolio_media_map.json
+  - portfolio_media_map.json       full match list (pipeline state, legacy frontend)
+  - portfolio_media_manifest.json  artist -> shard path, what script.js loads first
+  - media/<artist>.<content>.json  one minified shard per artist, plus .gz/.br
+
+When build_images.py has run, the map and every shard also carry an
+`images` object: source key (cover URL, or "youtube:<id>") -> local resized
+asset, for the covers and videos their songs use.
+
+`--shards-only` rebuilds the manifest and shards from the existing
+portfolio_media_map.json without any network access.
+
+YouTube oEmbed results (titles, and which videos are gone) are kept between
+runs in portfolio_oembed_state.json; see oembed_resolver.py.
 """
 
+import argparse
 import csv
+import gzip
+import hashlib
 import json
 import os
 import re
-import subprocess
+from concurrent.futures import Future
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote_plus
 
 import requests
 
+from cover_search import DEFAULT_WORKERS as COVER_SEARCH_WORKERS, CoverSearch
+from http_cache import ResponseCache, fetch, open_cache
+from net_stats import write_run_stats
+from oembed_resolver import DEFAULT_WORKERS as OEMBED_WORKERS, OEmbedResolver
+from rate_limit import HostPacers, RetryPolicy
+from youtube_search import DEFAULT_WORKERS as YT_SEARCH_WORKERS, SearchPool, open_search_pool
+
+try:
+    import brotli
+except ImportError:  # optional: only the .br shard variants need it
+    brotli = None
+
 
 ROOT = Path(__file__).resolve().parent
 CSV_PATH = ROOT / "Portfolio_list.csv"
 OUTPUT_PATH = ROOT / "portfolio_media_map.json"
 MELON_CSV_PATH = ROOT / "Portfolio_list_with_melon.csv"
-YTDLP_PATH = Path.home() / "Library" / "Python" / "3.9" / "bin" / "yt-dlp"
+MANIFEST_PATH = ROOT / "portfolio_media_manifest.json"
+SHARD_DIR = ROOT / "media"
+SHARD_NAME_RE = re.compile(r"^[0-9a-f]{10}\.[0-9a-f]{10}\.json(?:\.gz|\.br)?$")
+SHARD_FIELDS = ("youtube_id", "youtube_title", "youtube_url", "youtube_thumbnail", "cover_url")
+IMAGE_INDEX_PATH = ROOT / "portfolio_image_index.json"
+OEMBED_STATE_PATH = ROOT / "portfolio_oembed_state.json"
+OEMBED_URL = "https://www.youtube.com/oembed?format=json&url={url}"
+ITUNES_SEARCH_URL = "https://itunes.apple.com/search?term={term}&entity=album,song&country=KR&limit=5"
 ENABLE_YT_SEARCH = os.getenv("ENABLE_YT_SEARCH", "").strip().lower() in {"1", "true", "yes"}
 MANUAL_ALBUM_COVER_OVERRIDES = {
     "잔나비|구여친클럽 ost": "https://is1-ssl.mzstatic.com/image/thumb/Music7/v4/7a/e8/3e/7ae83e8c-c5c1-5ac1-f674-226026046b43/JA.jpg/600x600bb.jpg",
@@ -33,6 +67,17 @@ MANUAL_ALBUM_COVER_OVERRIDES = {
     "잔나비|혼술남녀 ost": "https://is1-ssl.mzstatic.com/image/thumb/Music211/v4/9c/a3/c6/9ca3c65d-7a6a-682d-b05a-452ea772b2a1/8809484118353_Cover.jpg/1200x630wp-60.jpg",
     "잔나비|she": "https://is1-ssl.mzstatic.com/image/thumb/Music118/v4/4b/8c/0f/4b8c0f1e-472e-732b-8dd8-f4a690ef95db/cover-_DS.jpg/1200x630wp-60.jpg",
 }
+# Shared response cache; opened by main() unless HTTP_CACHE=0.
+HTTP_CACHE: Optional[ResponseCache] = None
+# oEmbed and iTunes are not paced up front, but back off and retry when they throttle.
+PACERS = HostPacers(0.0)
+RETRY = RetryPolicy()
+# Search pool for rows with no known video; opened by main() when ENABLE_YT_SEARCH is set.
+YT_SEARCH: Optional[SearchPool] = None
+# iTunes artwork search for albums without a cover; opened by main(), else per build_matches() call.
+COVER_SEARCH: Optional[CoverSearch] = None
+# Batch oEmbed lookups, persisted in OEMBED_STATE_PATH; opened by main(), else per build_matches() call without state.
+OEMBED: Optional[OEmbedResolver] = None
 
 
 def normalize(value: str) -> str:
@@ -121,99 +166,91 @@ def load_melon_album_fallbacks() -> Dict[str, Dict[str, str]]:
     return fallbacks
 
 
-def run_yt_search(query: str) -> Dict[str, str]:
-    if not ENABLE_YT_SEARCH:
-        return {}
-    if not YTDLP_PATH.exists():
-        return {}
+def youtube_oembed_title(session: requests.Session, video_id: str) -> Tuple[int, str]:
+    """(HTTP status, title) of oEmbed's answer for one video."""
+    url = OEMBED_URL.format(url=quote_plus(f"https://www.youtube.com/watch?v={video_id}"))
+    resp = fetch(session, url, endpoint="youtube_oembed", cache=HTTP_CACHE, timeout=15, pacer=PACERS.for_url(url), retry=RETRY)
+    if resp.status_code != 200:
+        return resp.status_code, ""
+    return resp.status_code, resp.json().get("title") or ""
 
-    try:
-        cmd = [
-            str(YTDLP_PATH),
-            "--no-warnings",
-            "--skip-download",
-            "--dump-json",
-            f"ytsearch1:{query}",
-        ]
-        result = subprocess.run(cmd, check=False, capture_output=True, text=True, timeout=30)
-        if result.returncode != 0 or not result.stdout.strip():
-            return {}
-
-        first = json.loads(result.stdout.splitlines()[0])
-        video_id = first.get("id") or ""
-        if not video_id:
-            return {}
-
-        thumbnails = first.get("thumbnails") or []
-        thumb = ""
-        if thumbnails:
-            thumb = thumbnails[-1].get("url") or thumbnails[0].get("url") or ""
-
-        return {
-            "youtube_id": video_id,
-            "youtube_title": first.get("title") or "",
-            "youtube_url": f"https://www.youtube.com/watch?v={video_id}",
-            "youtube_thumbnail": thumb or f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
-        }
-    except Exception:
-        return {}
 
+def open_oembed_resolver(workers: int = OEMBED_WORKERS, state_path: Optional[Path] = None, refresh: bool = False) -> OEmbedResolver:
+    return OEmbedResolver(youtube_oembed_title, state_path=state_path, workers=workers, refresh=refresh)
 
-def fetch_youtube_oembed(youtube_url: str) -> Dict[str, str]:
-    canonical = to_canonical_youtube_url(youtube_url)
-    if not canonical:
-        return {}
-    try:
-        url = f"https://www.youtube.com/oembed?format=json&url={quote_plus(canonical)}"
-        resp = requests.get(url, timeout=15)
-        if resp.status_code != 200:
-            return {}
-        data = resp.json()
-        video_id = extract_youtube_id(canonical)
-        return {
-            "youtube_id": video_id,
-            "youtube_title": data.get("title") or "",
-            "youtube_url": canonical,
-            "youtube_thumbnail": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg" if video_id else "",
-        }
-    except Exception:
+
+def oembed_video_ids(raws: List[Dict[str, str]], existing_by_key: Dict[str, Dict[str, str]]) -> List[str]:
+    """Video ids of the rows build_matches takes from oEmbed (no video in the existing map), in CSV order."""
+    video_ids = []
+    for raw in raws:
+        artist = (raw.get("Artist") or "").strip()
+        if not artist:
+            continue
+        title = (raw.get("Title") or "").strip()
+        youtube_url = (raw.get("YoutubeURL") or raw.get("YouTubeURL") or raw.get("youtube_url") or "").strip()
+        source_url = youtube_url or (title if is_youtube_url(title) else "")
+        exact_existing = existing_by_key.get(make_key(artist, (raw.get("Album") or "").strip(), title), {})
+        if source_url and not (exact_existing.get("youtube_id") or exact_existing.get("youtube_url")):
+            video_ids.append(extract_youtube_id(source_url))
+    return video_ids
+
+
+def oembed_youtube_fields(video_id: str, titles: Dict[str, str]) -> Dict[str, str]:
+    if video_id not in titles:
         return {}
+    return {
+        "youtube_id": video_id,
+        "youtube_title": titles[video_id],
+        "youtube_url": f"https://www.youtube.com/watch?v={video_id}",
+        "youtube_thumbnail": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
+    }
 
 
-def run_cover_search(artist: str, album: str, title: str) -> str:
-    title_term = (title or "").split(",")[0].strip()
-    if is_youtube_url(title_term):
-        title_term = ""
-    terms = [f"{artist} {album}", f"{artist} {title_term}", f"{artist} {album} {title_term}", f"{artist}"]
-    session = requests.Session()
-    headers = {"User-Agent": "Mozilla/5.0"}
-
-    for term in terms:
-        term = " ".join(term.split())
-        if not term:
-            continue
-        try:
-            url = f"https://itunes.apple.com/search?term={quote_plus(term)}&entity=album,song&country=KR&limit=5"
-            resp = session.get(url, headers=headers, timeout=15)
-            if resp.status_code != 200:
-                continue
-            data = resp.json()
-            results = data.get("results") or []
-            for item in results:
-                artwork = item.get("artworkUrl100") or item.get("artworkUrl60")
-                if artwork:
-                    return artwork.replace("100x100bb", "600x600bb").replace("60x60bb", "600x600bb")
-        except Exception:
-            continue
+def itunes_artwork(session: requests.Session, term: str) -> str:
+    """Artwork URL (600px) of the first iTunes result for `term` that has one, or ""."""
+    url = ITUNES_SEARCH_URL.format(term=quote_plus(term))
+    resp = fetch(session, url, endpoint="itunes_search", cache=HTTP_CACHE, timeout=15, pacer=PACERS.for_url(url), retry=RETRY)
+    if resp.status_code != 200:
+        return ""
+    for item in resp.json().get("results") or []:
+        artwork = item.get("artworkUrl100") or item.get("artworkUrl60")
+        if artwork:
+            return artwork.replace("100x100bb", "600x600bb").replace("60x60bb", "600x600bb")
     return ""
 
 
+def open_cover_search(workers: int = COVER_SEARCH_WORKERS) -> CoverSearch:
+    return CoverSearch(itunes_artwork, workers=workers, is_youtube_url=is_youtube_url)
+
+
+def run_cover_search(artist: str, album: str, title: str) -> str:
+    if COVER_SEARCH is not None:
+        return COVER_SEARCH.search(artist, album, title)
+    with open_cover_search(workers=1) as service:
+        return service.search(artist, album, title)
+
+
+def youtube_search_query(artist: str, album: str, title: str) -> str:
+    query_parts = [artist]
+    if title and not is_youtube_url(title):
+        query_parts.append(title.split(",")[0].strip())
+    elif album:
+        query_parts.append(album)
+    return " ".join(part for part in query_parts if part)
+
+
+def apply_youtube_fields(item: MediaMatch, yt: Dict[str, str]) -> None:
+    item.youtube_id = yt.get("youtube_id", "")
+    item.youtube_title = yt.get("youtube_title", "")
+    item.youtube_url = yt.get("youtube_url", "")
+    item.youtube_thumbnail = yt.get("youtube_thumbnail", "")
+
+
 def build_matches() -> List[MediaMatch]:
     existing_by_key = load_existing_media()
     melon_by_album = load_melon_album_fallbacks()
     existing_album_cache: Dict[str, Dict[str, str]] = {}
-    cover_cache: Dict[str, str] = {}
-    youtube_cache: Dict[str, Dict[str, str]] = {}
+    cover_searches: Dict[str, Future] = {}
 
     for item in existing_by_key.values():
         album_key = make_album_key(item.get("artist", ""), item.get("album", ""))
@@ -228,106 +265,325 @@ def build_matches() -> List[MediaMatch]:
             cached["youtube_thumbnail"] = item["youtube_thumbnail"]
 
     rows: List[MediaMatch] = []
+    # searches run in the pools while the loop moves on; results are applied at the end
+    pending_searches: List[Tuple[MediaMatch, Future]] = []
+    pending_covers: List[Tuple[MediaMatch, Future]] = []
     with CSV_PATH.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        for raw in reader:
+        raws = list(csv.DictReader(f))
+
+    # every video the loop needs from oEmbed, resolved in one batch up front
+    resolver = OEMBED if OEMBED is not None else open_oembed_resolver()
+    try:
+        oembed_titles = resolver.resolve(oembed_video_ids(raws, existing_by_key))
+    finally:
+        if resolver is not OEMBED:
+            resolver.close()
+
+    cover_search = COVER_SEARCH if COVER_SEARCH is not None else open_cover_search()
+    for raw in raws:
+        artist = (raw.get("Artist") or "").strip()
+        album = (raw.get("Album") or "").strip()
+        title = (raw.get("Title") or "").strip()
+        youtube_url = (raw.get("YoutubeURL") or raw.get("YouTubeURL") or raw.get("youtube_url") or "").strip()
+        work = (raw.get("Work") or "").strip()
+        note = (raw.get("note") or "").strip()
+        if not artist:
+            continue
+
+        item = MediaMatch(
+            artist=artist,
+            album=album,
+            title=title,
+            work=work,
+            note=note,
+            key=make_key(artist, album, title),
+        )
+        album_key = make_album_key(artist, album)
+        exact_existing = existing_by_key.get(item.key, {})
+        album_existing = existing_album_cache.get(album_key, {})
+        melon_fallback = melon_by_album.get(album_key, {})
+
+        source_url = youtube_url or (title if is_youtube_url(title) else "")
+        yt = {}
+        if exact_existing.get("youtube_id") or exact_existing.get("youtube_url"):
+            yt = {
+                "youtube_id": exact_existing.get("youtube_id", ""),
+                "youtube_title": exact_existing.get("youtube_title", ""),
+                "youtube_url": exact_existing.get("youtube_url", ""),
+                "youtube_thumbnail": exact_existing.get("youtube_thumbnail", ""),
+            }
+        elif source_url:
+            yt = oembed_youtube_fields(extract_youtube_id(source_url), oembed_titles)
+        elif album_existing.get("youtube_url"):
+            yt = {
+                "youtube_id": extract_youtube_id(album_existing.get("youtube_url", "")),
+                "youtube_title": album_existing.get("youtube_title", ""),
+                "youtube_url": album_existing.get("youtube_url", ""),
+                "youtube_thumbnail": album_existing.get("youtube_thumbnail", ""),
+            }
+        elif melon_fallback.get("youtube_url"):
+            yt_url = melon_fallback["youtube_url"]
+            yt = {
+                "youtube_id": extract_youtube_id(yt_url),
+                "youtube_title": "",
+                "youtube_url": yt_url,
+                "youtube_thumbnail": f"https://img.youtube.com/vi/{extract_youtube_id(yt_url)}/hqdefault.jpg" if extract_youtube_id(yt_url) else "",
+            }
+
+        if not yt and YT_SEARCH is not None:
+            pending_searches.append((item, YT_SEARCH.submit(youtube_search_query(artist, album, title))))
+
+        apply_youtube_fields(item, yt)
+        if exact_existing.get("cover_url"):
+            item.cover_url = exact_existing["cover_url"]
+        elif MANUAL_ALBUM_COVER_OVERRIDES.get(album_key):
+            item.cover_url = MANUAL_ALBUM_COVER_OVERRIDES[album_key]
+        elif melon_fallback.get("cover_url"):
+            item.cover_url = melon_fallback["cover_url"]
+        elif album_existing.get("cover_url"):
+            item.cover_url = album_existing["cover_url"]
+        else:
+            if album_key not in cover_searches:
+                cover_searches[album_key] = cover_search.submit(artist, album, title)
+            pending_covers.append((item, cover_searches[album_key]))
+
+        rows.append(item)
+        print(f"Matched: {artist} | {title or '(no title)'}")
+
+    for item, future in pending_searches:
+        apply_youtube_fields(item, future.result())
+    for item, future in pending_covers:
+        item.cover_url = future.result() or ""
+    if cover_search is not COVER_SEARCH:
+        cover_search.close()
+    return rows
+
+
+def load_csv_media_sources() -> Dict[str, Dict[str, str]]:
+    """Cover URL and YouTube id per media key, as script.js reads them from the CSV."""
+    if not CSV_PATH.exists():
+        return {}
+    sources: Dict[str, Dict[str, str]] = {}
+    with CSV_PATH.open("r", encoding="utf-8-sig", newline="") as f:
+        for raw in csv.DictReader(f):
             artist = (raw.get("Artist") or "").strip()
-            album = (raw.get("Album") or "").strip()
-            title = (raw.get("Title") or "").strip()
-            youtube_url = (raw.get("YoutubeURL") or raw.get("YouTubeURL") or raw.get("youtube_url") or "").strip()
-            work = (raw.get("Work") or "").strip()
-            note = (raw.get("note") or "").strip()
             if not artist:
                 continue
+            title = (raw.get("Title") or "").strip()
+            youtube_url = (raw.get("YoutubeURL") or raw.get("YouTubeURL") or raw.get("youtube_url") or "").strip()
+            sources[make_key(artist, (raw.get("Album") or "").strip(), title)] = {
+                "cover_url": (raw.get("CoverImageURL") or "").strip(),
+                "youtube_id": extract_youtube_id(youtube_url or (title if is_youtube_url(title) else "")),
+            }
+    return sources
+
+
+def image_source_keys(item: Dict[str, str], csv_sources: Dict[str, Dict[str, str]]) -> List[str]:
+    """Image index keys a media item's card can show: covers by URL, videos by id."""
+    csv_source = csv_sources.get(item.get("key") or "", {})
+    keys = [csv_source.get("cover_url", ""), item.get("cover_url") or ""]
+    for video_id in (csv_source.get("youtube_id", ""), item.get("youtube_id") or ""):
+        if video_id:
+            keys.append(f"youtube:{video_id}")
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def load_image_assets() -> Dict[str, Dict[str, object]]:
+    """Source key -> frontend asset from build_images.py's index ({} before its first run)."""
+    if not IMAGE_INDEX_PATH.exists():
+        return {}
+    try:
+        index = json.loads(IMAGE_INDEX_PATH.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+    assets = index.get("assets") or {}
+    return {
+        key: assets[source["asset"]]
+        for key, source in (index.get("sources") or {}).items()
+        if source.get("asset") in assets
+    }
 
-            item = MediaMatch(
-                artist=artist,
-                album=album,
-                title=title,
-                work=work,
-                note=note,
-                key=make_key(artist, album, title),
-            )
-            album_key = make_album_key(artist, album)
-            exact_existing = existing_by_key.get(item.key, {})
-            album_existing = existing_album_cache.get(album_key, {})
-            melon_fallback = melon_by_album.get(album_key, {})
-
-            source_url = youtube_url or (title if is_youtube_url(title) else "")
-            yt = {}
-            if exact_existing.get("youtube_id") or exact_existing.get("youtube_url"):
-                yt = {
-                    "youtube_id": exact_existing.get("youtube_id", ""),
-                    "youtube_title": exact_existing.get("youtube_title", ""),
-                    "youtube_url": exact_existing.get("youtube_url", ""),
-                    "youtube_thumbnail": exact_existing.get("youtube_thumbnail", ""),
-                }
-            elif source_url:
-                canonical_source = to_canonical_youtube_url(source_url)
-                if canonical_source in youtube_cache:
-                    yt = youtube_cache[canonical_source]
-                else:
-                    yt = fetch_youtube_oembed(source_url)
-                    youtube_cache[canonical_source] = yt
-            elif album_existing.get("youtube_url"):
-                yt = {
-                    "youtube_id": extract_youtube_id(album_existing.get("youtube_url", "")),
-                    "youtube_title": album_existing.get("youtube_title", ""),
-                    "youtube_url": album_existing.get("youtube_url", ""),
-                    "youtube_thumbnail": album_existing.get("youtube_thumbnail", ""),
-                }
-            elif melon_fallback.get("youtube_url"):
-                yt_url = melon_fallback["youtube_url"]
-                yt = {
-                    "youtube_id": extract_youtube_id(yt_url),
-                    "youtube_title": "",
-                    "youtube_url": yt_url,
-                    "youtube_thumbnail": f"https://img.youtube.com/vi/{extract_youtube_id(yt_url)}/hqdefault.jpg" if extract_youtube_id(yt_url) else "",
-                }
-
-            if not yt:
-                query_parts = [artist]
-                if title and not is_youtube_url(title):
-                    query_parts.append(title.split(",")[0].strip())
-                elif album:
-                    query_parts.append(album)
-                query = " ".join(part for part in query_parts if part)
-                yt = run_yt_search(query)
-
-            item.youtube_id = yt.get("youtube_id", "")
-            item.youtube_title = yt.get("youtube_title", "")
-            item.youtube_url = yt.get("youtube_url", "")
-            item.youtube_thumbnail = yt.get("youtube_thumbnail", "")
-            if exact_existing.get("cover_url"):
-                item.cover_url = exact_existing["cover_url"]
-            elif MANUAL_ALBUM_COVER_OVERRIDES.get(album_key):
-                item.cover_url = MANUAL_ALBUM_COVER_OVERRIDES[album_key]
-            elif melon_fallback.get("cover_url"):
-                item.cover_url = melon_fallback["cover_url"]
-            elif album_existing.get("cover_url"):
-                item.cover_url = album_existing["cover_url"]
-            else:
-                cached_cover = cover_cache.get(album_key)
-                if cached_cover is None:
-                    cached_cover = run_cover_search(artist, album, title)
-                    cover_cache[album_key] = cached_cover
-                item.cover_url = cached_cover or ""
-
-            rows.append(item)
-            print(f"Matched: {artist} | {title or '(no title)'}")
-    return rows
 
+def item_images(
+    items: List[Dict[str, str]],
+    assets: Dict[str, Dict[str, object]],
+    csv_sources: Dict[str, Dict[str, str]],
+) -> Dict[str, Dict[str, object]]:
+    return {
+        key: assets[key]
+        for item in items
+        for key in image_source_keys(item, csv_sources)
+        if key in assets
+    }
 
-def main() -> None:
-    matches = build_matches()
+
+def minified_json(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def write_precompressed(path: Path, data: bytes) -> None:
+    """Write `path` plus .gz (and .br when brotli is installed) for static serving."""
+    path.write_bytes(data)
+    # mtime=0 keeps the .gz byte-identical across runs
+    Path(f"{path}.gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        Path(f"{path}.br").write_bytes(brotli.compress(data, quality=11))
+
+
+def write_media_shards(items: List[Dict[str, str]], generated_at: str) -> Dict[str, str]:
+    """Split the media map into per-artist shards with content-hashed names.
+
+    Shards only carry the media fields script.js reads (empty ones dropped),
+    keyed by the same artist|album|title key it builds from the CSV, plus
+    the artist's image assets. Returns the manifest's artist -> shard path
+    mapping.
+    """
+    assets = load_image_assets()
+    csv_sources = load_csv_media_sources() if assets else {}
+    by_artist: Dict[str, Dict[str, Dict[str, str]]] = {}
+    images_by_artist: Dict[str, Dict[str, Dict[str, object]]] = {}
+    for item in items:
+        key = item.get("key") or ""
+        media = {field: item[field] for field in SHARD_FIELDS if item.get(field)}
+        if not key or not media:
+            continue
+        artist_key = key.split("|", 1)[0]
+        by_artist.setdefault(artist_key, {})[key] = media
+        images_by_artist.setdefault(artist_key, {}).update(item_images([item], assets, csv_sources))
+
+    SHARD_DIR.mkdir(exist_ok=True)
+    shards: Dict[str, str] = {}
+    for artist_key in sorted(by_artist):
+        shard: Dict[str, object] = {"items": by_artist[artist_key]}
+        if images_by_artist[artist_key]:
+            shard["images"] = images_by_artist[artist_key]
+        data = minified_json(shard)
+        artist_hash = hashlib.sha1(artist_key.encode("utf-8")).hexdigest()[:10]
+        name = f"{artist_hash}.{hashlib.sha1(data).hexdigest()[:10]}.json"
+        if not (SHARD_DIR / name).exists():
+            write_precompressed(SHARD_DIR / name, data)
+        shards[artist_key] = f"{SHARD_DIR.name}/{name}"
+
+    # Previous generations are unreachable from the new manifest.
+    live = {Path(path).name for path in shards.values()}
+    for path in SHARD_DIR.iterdir():
+        if SHARD_NAME_RE.match(path.name) and path.name.split(".json")[0] + ".json" not in live:
+            path.unlink()
+
+    manifest = {"version": 1, "generated_at": generated_at, "count": len(items), "shards": shards}
+    write_precompressed(MANIFEST_PATH, minified_json(manifest))
+    return shards
+
+
+def save_media_map(payload: Dict[str, object]) -> None:
+    """Write portfolio_media_map.json (with image assets) and its shards."""
+    items = payload.get("items") or []
+    images = item_images(items, load_image_assets(), load_csv_media_sources())
+    if images:
+        payload["images"] = images
+    else:
+        payload.pop("images", None)
+    OUTPUT_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Saved: {OUTPUT_PATH}")
+    shards = write_media_shards(items, payload.get("generated_at") or "")
+    print(f"Saved: {MANIFEST_PATH} ({len(shards)} shards in {SHARD_DIR.name}/)")
+
+
+def refresh_media_map() -> bool:
+    """Re-apply the CSV's Work and note columns to the existing media map, with no lookups.
+
+    Only meaningful when nothing a lookup reads has changed (see pipeline.py).
+    False when there is no map yet or a row has no item in it; a full run is
+    needed then.
+    """
+    if not OUTPUT_PATH.exists():
+        return False
+    payload = json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))
+    previous = {item.get("key", ""): item for item in payload.get("items") or [] if item.get("key")}
+    items = []
+    with CSV_PATH.open("r", encoding="utf-8-sig", newline="") as f:
+        for raw in csv.DictReader(f):
+            artist = (raw.get("Artist") or "").strip()
+            if not artist:
+                continue
+            item = previous.get(make_key(artist, (raw.get("Album") or "").strip(), (raw.get("Title") or "").strip()))
+            if item is None:
+                return False
+            items.append({**item, "work": (raw.get("Work") or "").strip(), "note": (raw.get("note") or "").strip()})
+    payload.update(generated_at=datetime.now(timezone.utc).isoformat(), count=len(items), items=items)
+    save_media_map(payload)
+    return True
+
+
+def enrich(
+    cache: Optional[ResponseCache],
+    yt_search_backend: Optional[str] = None,
+    yt_search_workers: int = YT_SEARCH_WORKERS,
+    cover_search_workers: int = COVER_SEARCH_WORKERS,
+    oembed_workers: int = OEMBED_WORKERS,
+    oembed_state: Optional[Path] = OEMBED_STATE_PATH,
+    refresh_oembed: bool = False,
+) -> None:
+    """Match every CSV row with its lookup services open, then save the media map."""
+    global HTTP_CACHE, YT_SEARCH, COVER_SEARCH, OEMBED
+    HTTP_CACHE = cache
+    if ENABLE_YT_SEARCH:
+        YT_SEARCH = open_search_pool(yt_search_backend, workers=yt_search_workers)
+    COVER_SEARCH = open_cover_search(cover_search_workers)
+    OEMBED = open_oembed_resolver(oembed_workers, oembed_state, refresh_oembed)
+    yt_search, cover_search, oembed = YT_SEARCH, COVER_SEARCH, OEMBED
+    try:
+        matches = build_matches()
+    finally:
+        if yt_search is not None:
+            yt_search.close()
+        cover_search.close()
+        oembed.close()
+        YT_SEARCH = COVER_SEARCH = OEMBED = None
     payload = {
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "count": len(matches),
         "items": [asdict(m) for m in matches],
     }
-    OUTPUT_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Saved: {OUTPUT_PATH}")
+    save_media_map(payload)
+    if cache is not None:
+        print(cache.report())
+    if yt_search is not None:
+        print(yt_search.report())
+    print(oembed.report())
+    print(cover_search.report())
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build media matches for Portfolio_list.csv")
+    parser.add_argument("--shards-only", action="store_true", help="Rebuild manifest/shards from the existing media map, no lookups")
+    parser.add_argument("--yt-search-backend", default=None, help="YouTube search backend: ytdlp, ytdlp-cli or stub (default: YT_SEARCH_BACKEND)")
+    parser.add_argument("--yt-search-workers", type=int, default=YT_SEARCH_WORKERS, help="Concurrent YouTube searches (ENABLE_YT_SEARCH=1 only)")
+    parser.add_argument("--cover-search-workers", type=int, default=COVER_SEARCH_WORKERS, help="Concurrent iTunes cover searches")
+    parser.add_argument("--oembed-workers", type=int, default=OEMBED_WORKERS, help="Concurrent YouTube oEmbed lookups")
+    parser.add_argument("--oembed-state", default=str(OEMBED_STATE_PATH), help="oEmbed results kept between runs ('' keeps none)")
+    parser.add_argument("--refresh-oembed", action="store_true", help="Look every video up again, ignoring the oEmbed state")
+    parser.add_argument("--stats-path", default="", help="Network stats JSON (.prom written alongside; default: next to the media map)")
+    args = parser.parse_args()
+
+    if args.shards_only:
+        payload = json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))
+        shards = write_media_shards(payload.get("items") or [], payload.get("generated_at") or "")
+        print(f"Saved: {MANIFEST_PATH} ({len(shards)} shards in {SHARD_DIR.name}/)")
+        return
+
+    try:
+        enrich(
+            open_cache(None),
+            yt_search_backend=args.yt_search_backend,
+            yt_search_workers=args.yt_search_workers,
+            cover_search_workers=args.cover_search_workers,
+            oembed_workers=args.oembed_workers,
+            oembed_state=Path(args.oembed_state) if args.oembed_state else None,
+            refresh_oembed=args.refresh_oembed,
+        )
+    finally:
+        write_run_stats("enrich_media", OUTPUT_PATH, args.stats_path)
+
 if __name__ == "__main__":
     main()
@@ -19,73 +19,54 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
+import json
 import re
-import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from urllib.parse import quote_plus
 
 import requests
-from bs4 import BeautifulSoup
+
+from album_match import PendingQueries, normalize, rank
+from catalog_store import CatalogStore, open_store
+from checkpoint import atomic_write, journal_path_for, open_journal
+from html_extract import BACKENDS, BUGS_ALBUM_HREF_RE, MELON_ALBUM_HREF_RE, get_extractor
+from http_cache import CachedResponse, ResponseCache, fetch, open_cache
+from net_stats import timed_extractor, write_run_stats
+from parse_pool import ParsePool, PooledExtractor, usable_workers
+from rate_limit import DEFAULT_MAX_RETRIES, AdaptivePacer, RetryPolicy
+from row_stream import OrderedRowWriter, iter_csv_rows, read_fieldnames
 
 
 SEARCH_URL = "https://www.melon.com/search/total/index.htm?q={query}"
 ALBUM_DETAIL_URL = "https://www.melon.com/album/detail.htm?albumId={album_id}"
 BUGS_SEARCH_URL = "https://music.bugs.co.kr/search/album?q={query}"
 BUGS_ALBUM_DETAIL_URL = "https://music.bugs.co.kr/album/{album_id}"
-HTML_PARSER = "html.parser"
-
-try:
-    import lxml  # noqa: F401
-    HTML_PARSER = "lxml"
-except Exception:
-    HTML_PARSER = "html.parser"
-
-
-def normalize(text: str) -> str:
-    text = (text or "").strip().lower()
-    text = re.sub(r"\s+", " ", text)
-    return text
-
-
-def compact(text: str) -> str:
-    return re.sub(r"[^0-9a-z가-힣]", "", normalize(text))
+# Bump when lookup logic changes so incremental runs re-resolve every album.
+LOOKUP_VERSION = "1"
+CHECKPOINT_RUN_ID = "enrich_melon_metadata"
+# Columns enrich_csv writes, appended in this order when the input lacks them.
+ADDED_FIELDS = [
+    "Genre",
+    "GenreMelon",
+    "GenreBugs",
+    "GenreSource",
+    "CoverImageURL",
+    "MelonAlbumId",
+    "MelonAlbumURL",
+    "MelonReleaseDate",
+    "MelonLookupStatus",
+]
 
 
 def is_youtube_url(text: str) -> bool:
     return bool(re.match(r"^https?://(?:www\.)?(?:youtu\.be|youtube\.com)/", (text or "").strip(), re.IGNORECASE))
 
 
-def score_candidate(query_artist: str, query_album: str, cand_artist: str, cand_album: str) -> int:
-    qa = compact(query_artist)
-    qal = compact(query_album)
-    ca = compact(cand_artist)
-    cal = compact(cand_album)
-
-    score = 0
-    if qal and cal == qal:
-        score += 12
-    elif qal and qal in cal:
-        score += 8
-    elif qal and cal in qal:
-        score += 4
-
-    if qa and ca == qa:
-        score += 8
-    elif qa and qa in ca:
-        score += 4
-
-    # Shared token overlap can salvage minor spacing/punctuation differences.
-    q_tokens = set(normalize(query_album).split())
-    c_tokens = set(normalize(cand_album).split())
-    if q_tokens and c_tokens:
-        overlap = len(q_tokens & c_tokens)
-        score += overlap
-
-    return score
-
-
 @dataclass
 class MelonAlbumMeta:
     album_id: str = ""
@@ -98,9 +79,24 @@ class MelonAlbumMeta:
 
 
 class MelonClient:
-    def __init__(self, sleep_seconds: float = 0.45, timeout: int = 15):
+    def __init__(
+        self,
+        sleep_seconds: float = 0.45,
+        timeout: int = 15,
+        pacer: Optional[AdaptivePacer] = None,
+        cache: Optional[ResponseCache] = None,
+        extractor=None,
+        retry: Optional[RetryPolicy] = None,
+        pending: Optional[PendingQueries] = None,
+    ):
         self.sleep_seconds = sleep_seconds
         self.timeout = timeout
+        self.pacer = pacer or AdaptivePacer(sleep_seconds)
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        self.extractor = timed_extractor(extractor or get_extractor())
+        # albums of this run not searched yet; pages settle them (album_match)
+        self.pending = pending or PendingQueries()
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -109,9 +105,8 @@ class MelonClient:
             }
         )
 
-    def _get(self, url: str) -> requests.Response:
-        time.sleep(self.sleep_seconds)
-        resp = self.session.get(url, timeout=self.timeout)
+    def _get(self, url: str, endpoint: str) -> CachedResponse:
+        resp = fetch(self.session, url, endpoint=endpoint, cache=self.cache, timeout=self.timeout, pacer=self.pacer, retry=self.retry)
         resp.raise_for_status()
         return resp
 
@@ -119,49 +114,25 @@ class MelonClient:
         query = " ".join(part for part in [artist, album] if part).strip()
         if not query:
             return "", "", ""
+        settled = self.pending.claim(artist, album)
+        if settled is not None:
+            return settled.candidate.album_id, settled.candidate.album, settled.candidate.artist
 
         url = SEARCH_URL.format(query=quote_plus(query))
-        html = self._get(url).text
-        soup = BeautifulSoup(html, HTML_PARSER)
+        html = self._get(url, "melon_search").text
 
-        # Prefer explicit album list area.
-        section = soup.select_one("div.d_album_list") or soup
-
-        candidates: List[Tuple[int, str, str, str]] = []
-        for a in section.select("a[href*='goAlbumDetail']"):
-            href = a.get("href", "")
-            m = re.search(r"goAlbumDetail\('([0-9]+)'\)", href)
-            if not m:
-                continue
-            album_id = m.group(1)
-
-            cand_album = a.get_text(" ", strip=True)
-            if not cand_album:
-                continue
+        candidates = self.extractor.melon_search(html)
+        self.pending.observe(candidates)
+        ranked = rank(artist, album, candidates)
+        if ranked:
+            best = ranked[0].candidate
+            return best.album_id, best.album, best.artist
 
-            # Try to infer artist from nearby container.
-            cand_artist = ""
-            li = a.find_parent("li")
-            if li:
-                artist_a = li.select_one("a[href*='goArtistDetail']")
-                if artist_a:
-                    cand_artist = artist_a.get_text(" ", strip=True)
-
-            s = score_candidate(artist, album, cand_artist, cand_album)
-            candidates.append((s, album_id, cand_album, cand_artist))
-
-        if not candidates:
-            # Fallback: search whole page for goAlbumDetail in song result rows.
-            for m in re.finditer(r"goAlbumDetail\('([0-9]+)'\)", html):
-                album_id = m.group(1)
-                candidates.append((0, album_id, "", ""))
-
-        if not candidates:
-            return "", "", ""
-
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        _, best_id, best_album, best_artist = candidates[0]
-        return best_id, best_album, best_artist
+        # Fallback: search whole page for goAlbumDetail in song result rows.
+        m = MELON_ALBUM_HREF_RE.search(html)
+        if m:
+            return m.group(1), "", ""
+        return "", "", ""
 
     def fetch_album_meta(self, album_id: str) -> MelonAlbumMeta:
         if not album_id:
@@ -169,34 +140,14 @@ class MelonClient:
 
         url = ALBUM_DETAIL_URL.format(album_id=album_id)
         try:
-            html = self._get(url).text
-            soup = BeautifulSoup(html, HTML_PARSER)
-
-            cover_url = ""
-            og_image = soup.select_one("meta[property='og:image']")
-            if og_image:
-                cover_url = (og_image.get("content") or "").strip()
-
-            genre = ""
-            release_date = ""
-            for dt in soup.select("div.meta dl.list dt"):
-                label = dt.get_text(" ", strip=True)
-                dd = dt.find_next_sibling("dd")
-                if not dd:
-                    continue
-                value = dd.get_text(" ", strip=True)
-                if label == "장르":
-                    genre = value
-                elif label == "발매일":
-                    release_date = value
-
+            info = self.extractor.melon_album(self._get(url, "melon_album").text)
             return MelonAlbumMeta(
                 album_id=album_id,
                 album_url=url,
-                cover_url=cover_url,
-                genre=genre,
-                release_date=release_date,
-                status="found" if (genre or cover_url) else "partial",
+                cover_url=info.cover_url,
+                genre=info.genre,
+                release_date=info.release_date,
+                status="found" if (info.genre or info.cover_url) else "partial",
                 source="melon",
             )
         except Exception:
@@ -204,9 +155,24 @@ class MelonClient:
 
 
 class BugsClient:
-    def __init__(self, sleep_seconds: float = 0.45, timeout: int = 15):
+    def __init__(
+        self,
+        sleep_seconds: float = 0.45,
+        timeout: int = 15,
+        pacer: Optional[AdaptivePacer] = None,
+        cache: Optional[ResponseCache] = None,
+        extractor=None,
+        retry: Optional[RetryPolicy] = None,
+        pending: Optional[PendingQueries] = None,
+    ):
         self.sleep_seconds = sleep_seconds
         self.timeout = timeout
+        self.pacer = pacer or AdaptivePacer(sleep_seconds)
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        self.extractor = timed_extractor(extractor or get_extractor())
+        # albums of this run not searched yet; pages settle them (album_match)
+        self.pending = pending or PendingQueries()
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -215,9 +181,8 @@ class BugsClient:
             }
         )
 
-    def _get(self, url: str) -> requests.Response:
-        time.sleep(self.sleep_seconds)
-        resp = self.session.get(url, timeout=self.timeout)
+    def _get(self, url: str, endpoint: str) -> CachedResponse:
+        resp = fetch(self.session, url, endpoint=endpoint, cache=self.cache, timeout=self.timeout, pacer=self.pacer, retry=self.retry)
         resp.raise_for_status()
         return resp
 
@@ -225,41 +190,24 @@ class BugsClient:
         query = " ".join(part for part in [artist, album] if part).strip()
         if not query:
             return "", "", ""
+        settled = self.pending.claim(artist, album)
+        if settled is not None:
+            return settled.candidate.album_id, settled.candidate.album, settled.candidate.artist
 
         url = BUGS_SEARCH_URL.format(query=quote_plus(query))
-        html = self._get(url).text
-        soup = BeautifulSoup(html, HTML_PARSER)
-
-        candidates: List[Tuple[int, str, str, str]] = []
-        for row in soup.select("table.byAlbum tbody tr"):
-            album_a = row.select_one("p.title a[href*='/album/']")
-            if not album_a:
-                album_a = row.select_one("a[href*='/album/']")
-            if not album_a:
-                continue
+        html = self._get(url, "bugs_search").text
 
-            href = album_a.get("href", "")
-            m = re.search(r"/album/([0-9]+)", href)
-            if not m:
-                continue
+        candidates = self.extractor.bugs_search(html)
+        self.pending.observe(candidates)
+        ranked = rank(artist, album, candidates)
+        if ranked:
+            best = ranked[0].candidate
+            return best.album_id, best.album, best.artist
 
-            album_id = m.group(1)
-            cand_album = album_a.get_text(" ", strip=True)
-            artist_a = row.select_one("p.artist a") or row.select_one("a[href*='/artist/']")
-            cand_artist = artist_a.get_text(" ", strip=True) if artist_a else ""
-            score = score_candidate(artist, album, cand_artist, cand_album)
-            candidates.append((score, album_id, cand_album, cand_artist))
-
-        if not candidates:
-            for m in re.finditer(r"/album/([0-9]+)", html):
-                candidates.append((0, m.group(1), "", ""))
-
-        if not candidates:
-            return "", "", ""
-
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        _, best_id, best_album, best_artist = candidates[0]
-        return best_id, best_album, best_artist
+        m = BUGS_ALBUM_HREF_RE.search(html)
+        if m:
+            return m.group(1), "", ""
+        return "", "", ""
 
     def fetch_album_meta(self, album_id: str) -> MelonAlbumMeta:
         if not album_id:
@@ -267,78 +215,210 @@ class BugsClient:
 
         url = BUGS_ALBUM_DETAIL_URL.format(album_id=album_id)
         try:
-            html = self._get(url).text
-            soup = BeautifulSoup(html, HTML_PARSER)
-
-            cover_url = ""
-            og_image = soup.select_one("meta[property='og:image']")
-            if og_image:
-                cover_url = (og_image.get("content") or "").strip()
-
-            genre = ""
-            release_date = ""
-            info_table = soup.select_one("table.info")
-            if info_table:
-                for row in info_table.select("tr"):
-                    th = row.select_one("th")
-                    td = row.select_one("td")
-                    if not th or not td:
-                        continue
-                    label = th.get_text(" ", strip=True)
-                    value = td.get_text(" ", strip=True)
-                    if label == "장르":
-                        genre = value
-                    elif label == "발매일":
-                        release_date = value
-
+            info = self.extractor.bugs_album(self._get(url, "bugs_album").text)
             return MelonAlbumMeta(
                 album_id=album_id,
                 album_url=url,
-                cover_url=cover_url,
-                genre=genre,
-                release_date=release_date,
-                status="found" if (genre or cover_url) else "partial",
+                cover_url=info.cover_url,
+                genre=info.genre,
+                release_date=info.release_date,
+                status="found" if (info.genre or info.cover_url) else "partial",
                 source="bugs",
             )
         except Exception:
             return MelonAlbumMeta(album_id=album_id, album_url=url, status="error", source="bugs")
 
 
+def lookup_album(client: MelonClient, bugs_client: BugsClient, artist: str, album: str, title_hint: str) -> MelonAlbumMeta:
+    """Run the Melon search->detail chain for one album, falling back to Bugs for genre."""
+    attempts = [
+        (artist, album),
+        (artist, title_hint),
+        ("", title_hint),
+    ]
+
+    meta = MelonAlbumMeta(status="not_found")
+    for attempt_artist, attempt_album in attempts:
+        if not attempt_album:
+            continue
+        album_id, _, _ = client.find_album_id(attempt_artist, attempt_album)
+        if not album_id:
+            continue
+        meta = client.fetch_album_meta(album_id)
+        if meta.status == "found" and meta.genre:
+            break
+
+    if meta.status in {"not_found", "error"} or not meta.genre:
+        bugs_meta = MelonAlbumMeta(status="not_found", source="bugs")
+        for attempt_artist, attempt_album in attempts:
+            if not attempt_album:
+                continue
+            bugs_album_id, _, _ = bugs_client.find_album_id(attempt_artist, attempt_album)
+            if not bugs_album_id:
+                continue
+            bugs_meta = bugs_client.fetch_album_meta(bugs_album_id)
+            if bugs_meta.status == "found" and bugs_meta.genre:
+                break
+
+        if bugs_meta.status == "found" and bugs_meta.genre:
+            if not meta.cover_url and bugs_meta.cover_url:
+                meta.cover_url = bugs_meta.cover_url
+            if not meta.release_date and bugs_meta.release_date:
+                meta.release_date = bugs_meta.release_date
+            meta.genre = bugs_meta.genre
+            meta.source = bugs_meta.source
+            if meta.status in {"not_found", "error"}:
+                meta.album_id = bugs_meta.album_id
+                meta.album_url = bugs_meta.album_url
+                meta.status = bugs_meta.status
+        elif meta.status in {"not_found", "error"}:
+            meta = bugs_meta
+    return meta
+
+
+def lookup_fingerprint(key: Tuple[str, str], title_hint: str) -> str:
+    """Hash of everything a lookup for `key` depends on."""
+    payload = "\x1f".join([LOOKUP_VERSION, key[0], key[1], title_hint])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def meta_from_row(row: Dict[str, str]) -> MelonAlbumMeta:
+    """Rebuild the lookup result already recorded in an enriched row."""
+    genre = row.get("GenreMelon") if "GenreMelon" in row else row.get("Genre")
+    return MelonAlbumMeta(
+        album_id=(row.get("MelonAlbumId") or "").strip(),
+        album_url=(row.get("MelonAlbumURL") or "").strip(),
+        cover_url=(row.get("CoverImageURL") or "").strip(),
+        genre=(genre or "").strip(),
+        release_date=(row.get("MelonReleaseDate") or "").strip(),
+        status=(row.get("MelonLookupStatus") or "").strip(),
+        source=(row.get("GenreSource") or "").strip() or "melon",
+    )
+
+
+def load_resolved_albums(rows: Iterable[Dict[str, str]]) -> Dict[Tuple[str, str], MelonAlbumMeta]:
+    """Albums whose rows already carry a found lookup with an album id and a cover."""
+    resolved: Dict[Tuple[str, str], MelonAlbumMeta] = {}
+    for row in rows:
+        key = (normalize(row.get("Artist", "")), normalize(row.get("Album", "")))
+        if not key[0] or not key[1] or key in resolved:
+            continue
+        meta = meta_from_row(row)
+        if meta.status == "found" and meta.album_id and meta.cover_url:
+            resolved[key] = meta
+    return resolved
+
+
+def load_lookup_state(path: Path) -> Optional[Dict[str, Dict[str, str]]]:
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return payload.get("albums") or {}
+
+
+def state_key(key: Tuple[str, str]) -> str:
+    return f"{key[0]}|{key[1]}"
+
+
+def album_values(meta: MelonAlbumMeta, fill_empty_genre: bool) -> Dict[str, str]:
+    """Columns written to every row of a resolved album."""
+    values = {
+        "GenreMelon": meta.genre,
+        "GenreBugs": meta.genre if meta.source == "bugs" else "",
+        "GenreSource": meta.source,
+        "CoverImageURL": meta.cover_url,
+        "MelonAlbumId": meta.album_id,
+        "MelonAlbumURL": meta.album_url,
+        "MelonReleaseDate": meta.release_date,
+        "MelonLookupStatus": meta.status,
+    }
+    if fill_empty_genre and meta.genre:
+        values["Genre"] = meta.genre
+    return values
+
+
+def apply_album_result(row: Dict[str, str], meta: Optional[MelonAlbumMeta], fill_empty_genre: bool) -> None:
+    if not meta:
+        # Not processed because of limit or empty key
+        row.setdefault("MelonLookupStatus", "skipped")
+        return
+    row.update(album_values(meta, fill_empty_genre))
+
+
 def enrich_csv(
     input_path: Path,
     output_path: Path,
     fill_empty_genre: bool,
     sleep_seconds: float,
     limit_albums: int,
+    concurrency: int = 1,
+    host_concurrency: int = 2,
+    cache: Optional[ResponseCache] = None,
+    incremental: bool = False,
+    parser_backend: str = "",
+    store: Optional[CatalogStore] = None,
+    resume: bool = False,
+    stream: bool = False,
+    min_sleep_seconds: Optional[float] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    parse_workers: int = 0,
 ) -> None:
-    with input_path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-        fieldnames = list(reader.fieldnames or [])
-
-    added_fields = [
-        "Genre",
-        "GenreMelon",
-        "GenreBugs",
-        "GenreSource",
-        "CoverImageURL",
-        "MelonAlbumId",
-        "MelonAlbumURL",
-        "MelonReleaseDate",
-        "MelonLookupStatus",
-    ]
-    for col in added_fields:
+    # `stream`: never hold the rows; scan the input for album keys now and
+    # read it again while writing (see row_stream).
+    if stream and store is not None:
+        raise ValueError("stream mode reads and writes CSV; the store already works album by album")
+    rows: List[Dict[str, str]] = []
+    if store is not None:
+        rows = list(store.iter_rows())
+        fieldnames = store.fieldnames
+    elif stream:
+        fieldnames = read_fieldnames(input_path)
+    else:
+        with input_path.open("r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = list(reader.fieldnames or [])
+
+    def input_rows() -> Iterable[Dict[str, str]]:
+        return iter_csv_rows(input_path) if stream else rows
+
+    for col in ADDED_FIELDS:
         if col not in fieldnames:
             fieldnames.append(col)
-
-    client = MelonClient(sleep_seconds=sleep_seconds)
-    bugs_client = BugsClient(sleep_seconds=max(0.1, sleep_seconds))
-    cache: Dict[Tuple[str, str], MelonAlbumMeta] = {}
+    if store is not None:
+        store.ensure_columns(ADDED_FIELDS)
+
+    bugs_sleep = max(0.1, sleep_seconds)
+    # With parse workers the lookup threads only fetch; pages are parsed in
+    # worker processes (see parse_pool), closed with the output below.
+    parse_pool = ParsePool(parse_workers)
+    extractor = PooledExtractor(parser_backend, parse_pool) if parse_workers else get_extractor(parser_backend)
+    # melon.com and music.bugs.co.kr each get their own pacer, so a slow or
+    # throttling Bugs never eats into Melon's request rate (or vice versa).
+    in_flight = host_concurrency if concurrency > 1 else 1
+    client = MelonClient(
+        sleep_seconds=sleep_seconds,
+        pacer=AdaptivePacer(sleep_seconds, min_interval=min_sleep_seconds, max_in_flight=in_flight),
+        cache=cache,
+        extractor=extractor,
+        retry=RetryPolicy(max_retries),
+    )
+    bugs_client = BugsClient(
+        sleep_seconds=bugs_sleep,
+        pacer=AdaptivePacer(bugs_sleep, min_interval=min_sleep_seconds, max_in_flight=in_flight),
+        cache=cache,
+        extractor=extractor,
+        retry=RetryPolicy(max_retries),
+    )
+    results: Dict[Tuple[str, str], MelonAlbumMeta] = {}
 
     unique_keys = []
     title_by_key: Dict[Tuple[str, str], str] = {}
     seen = set()
-    for row in rows:
+    for row in input_rows():
         key = (normalize(row.get("Artist", "")), normalize(row.get("Album", "")))
         if not key[0] or not key[1] or key in seen:
             if key[0] and key[1]:
@@ -352,108 +432,194 @@ def enrich_csv(
         if title and not is_youtube_url(title):
             title_by_key[key] = title
 
+    state_path = output_path.with_name(output_path.stem + ".lookup_state.json")
+    fingerprints = {key: lookup_fingerprint(key, title_by_key.get(key, "").strip()) for key in unique_keys}
+    if incremental:
+        # Reuse what the previous output recorded; the input is the fallback
+        # for a first incremental run when no output exists yet.
+        # With a store, the store itself holds the previous results.
+        seed_path = output_path if output_path.exists() and store is None else input_path
+        resolved = load_resolved_albums(input_rows() if seed_path == input_path else iter_csv_rows(seed_path))
+        previous_state = load_lookup_state(state_path)
+
+        pending = []
+        for key in unique_keys:
+            meta = resolved.get(key)
+            if meta is not None and previous_state is not None:
+                if (previous_state.get(state_key(key)) or {}).get("fingerprint") != fingerprints[key]:
+                    meta = None
+            if meta is None:
+                pending.append(key)
+            else:
+                results[key] = meta
+        reused = len(results)
+        print(f"Incremental: {reused} albums unchanged, {len(pending)} new/changed/failed")
+        unique_keys = pending
+
+    # Every finished album is journaled; --resume replays the journal of an
+    # interrupted run (same lookup inputs, not errors) instead of refetching.
+    journal, replayed = open_journal(journal_path_for(output_path), CHECKPOINT_RUN_ID, resume)
+    if replayed:
+        pending_by_state_key = {state_key(key): key for key in unique_keys}
+        for record in replayed:
+            key = pending_by_state_key.get(str(record.get("album") or ""))
+            meta = MelonAlbumMeta(**record.get("meta") or {})
+            if key is None or record.get("fingerprint") != fingerprints[key] or meta.status == "error":
+                continue
+            results[key] = meta
+            if store is not None:
+                store.update_album(key, album_values(meta, fill_empty_genre))
+        resumed = [key for key in unique_keys if key in results]
+        unique_keys = [key for key in unique_keys if key not in results]
+        print(f"Resume: {len(resumed)} albums from {journal.path.name}, {len(unique_keys)} left")
+
     if limit_albums > 0:
         unique_keys = unique_keys[:limit_albums]
 
     print(f"Target unique albums: {len(unique_keys)}")
+    for key in unique_keys:
+        client.pending.add(*key)
+        bugs_client.pending.add(*key)
 
-    for idx, (artist_n, album_n) in enumerate(unique_keys, start=1):
-        artist = artist_n.strip()
-        album = album_n.strip()
-        title_hint = title_by_key.get((artist_n, album_n), "").strip()
+    def resolve(key: Tuple[str, str]) -> MelonAlbumMeta:
+        artist_n, album_n = key
         try:
-            attempts = [
-                (artist, album),
-                (artist, title_hint),
-                ("", title_hint),
-            ]
-
-            meta = MelonAlbumMeta(status="not_found")
-            for attempt_artist, attempt_album in attempts:
-                if not attempt_album:
-                    continue
-                album_id, _, _ = client.find_album_id(attempt_artist, attempt_album)
-                if not album_id:
-                    continue
-                meta = client.fetch_album_meta(album_id)
-                if meta.status == "found" and meta.genre:
-                    break
-
-            if meta.status in {"not_found", "error"} or not meta.genre:
-                bugs_meta = MelonAlbumMeta(status="not_found", source="bugs")
-                for attempt_artist, attempt_album in attempts:
-                    if not attempt_album:
-                        continue
-                    bugs_album_id, _, _ = bugs_client.find_album_id(attempt_artist, attempt_album)
-                    if not bugs_album_id:
-                        continue
-                    bugs_meta = bugs_client.fetch_album_meta(bugs_album_id)
-                    if bugs_meta.status == "found" and bugs_meta.genre:
-                        break
-
-                if bugs_meta.status == "found" and bugs_meta.genre:
-                    if not meta.cover_url and bugs_meta.cover_url:
-                        meta.cover_url = bugs_meta.cover_url
-                    if not meta.release_date and bugs_meta.release_date:
-                        meta.release_date = bugs_meta.release_date
-                    meta.genre = bugs_meta.genre
-                    meta.source = bugs_meta.source
-                    if meta.status in {"not_found", "error"}:
-                        meta.album_id = bugs_meta.album_id
-                        meta.album_url = bugs_meta.album_url
-                        meta.status = bugs_meta.status
-                elif meta.status in {"not_found", "error"}:
-                    meta = bugs_meta
-            cache[(artist_n, album_n)] = meta
-            print(f"[{idx}/{len(unique_keys)}] {artist} | {album} -> {meta.status} [{meta.source or 'melon'}] ({meta.album_id})")
+            return lookup_album(client, bugs_client, artist_n.strip(), album_n.strip(), title_by_key.get(key, "").strip())
         except Exception:
-            cache[(artist_n, album_n)] = MelonAlbumMeta(status="error")
-            print(f"[{idx}/{len(unique_keys)}] {artist} | {album} -> error")
-
-    for row in rows:
-        key = (normalize(row.get("Artist", "")), normalize(row.get("Album", "")))
-        meta = cache.get(key)
-        if not meta:
-            # Not processed because of limit or empty key
-            row.setdefault("MelonLookupStatus", "skipped")
-            continue
-
-        row["GenreMelon"] = meta.genre
-        row["GenreBugs"] = meta.genre if meta.source == "bugs" else ""
-        row["GenreSource"] = meta.source
-        row["CoverImageURL"] = meta.cover_url
-        row["MelonAlbumId"] = meta.album_id
-        row["MelonAlbumURL"] = meta.album_url
-        row["MelonReleaseDate"] = meta.release_date
-        row["MelonLookupStatus"] = meta.status
-
-        if fill_empty_genre and meta.genre:
-            row["Genre"] = meta.genre
-
-    with output_path.open("w", encoding="utf-8-sig", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+            return MelonAlbumMeta(status="error")
+
+    def report(done: int, key: Tuple[str, str], meta: MelonAlbumMeta) -> None:
+        artist, album = key[0].strip(), key[1].strip()
+        if meta.status == "error" and not meta.source:
+            print(f"[{done}/{len(unique_keys)}] {artist} | {album} -> error")
+        else:
+            print(f"[{done}/{len(unique_keys)}] {artist} | {album} -> {meta.status} [{meta.source or 'melon'}] ({meta.album_id})")
+        if store is not None:
+            store.update_album(key, album_values(meta, fill_empty_genre))
+        journal.append({"album": state_key(key), "fingerprint": fingerprints[key], "meta": asdict(meta)})
+        if row_writer is not None:
+            row_writer.advance()
+
+    with ExitStack() as output:
+        output.callback(parse_pool.close)
+        row_writer: Optional[OrderedRowWriter] = None
+        if stream:
+            # Rows go out in input order as soon as their album is settled:
+            # resolved now, reused, or not a lookup target at all.
+            targets = set(unique_keys)
+            row_writer = OrderedRowWriter(
+                input_path,
+                output.enter_context(atomic_write(output_path, encoding="utf-8-sig", newline="")),
+                fieldnames,
+                is_ready=lambda key: key in results or key not in targets,
+                fill_row=lambda row, key: apply_album_result(row, results.get(key), fill_empty_genre),
+            )
+            row_writer.advance()
+
+        if concurrency > 1:
+            # Results land in `results` keyed by album, and rows are written back in
+            # input order, so completion order never affects the output file.
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                futures = {pool.submit(resolve, key): key for key in unique_keys}
+                try:
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        key = futures[future]
+                        results[key] = future.result()
+                        report(done, key, results[key])
+                except BaseException:
+                    # Ctrl-C: drop queued albums instead of fetching them unjournaled
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    raise
+        else:
+            for idx, key in enumerate(unique_keys, start=1):
+                results[key] = resolve(key)
+                report(idx, key, results[key])
+
+        if row_writer is not None:
+            row_writer.finish()
+
+    if store is not None:
+        # Resolved albums were written as they finished; only the skip marker
+        # for untouched rows and the CSV projection remain.
+        store.set_default("MelonLookupStatus", "skipped")
+        store.export_csv(output_path)
+    elif not stream:
+        for row in rows:
+            key = (normalize(row.get("Artist", "")), normalize(row.get("Album", "")))
+            apply_album_result(row, results.get(key), fill_empty_genre)
+
+        with atomic_write(output_path, encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
 
     print(f"Saved: {output_path}")
 
+    state = {
+        state_key(key): {"fingerprint": fingerprints[key], "status": meta.status}
+        for key, meta in results.items()
+        if key in fingerprints
+    }
+    with atomic_write(state_path) as f:
+        f.write(json.dumps({"version": LOOKUP_VERSION, "albums": state}, ensure_ascii=False))
+    journal.discard()
+    if incremental:
+        print(f"Incremental: avoided {reused} of {len(fingerprints)} album lookups")
+    for name, c in (("Melon", client), ("Bugs", bugs_client)):
+        print(f"Pacing ({name}): {c.pacer.report()}; {c.retry.report()}")
+        print(f"{name}: {c.pending.report()}")
+    if parse_workers:
+        print(parse_pool.report())
+    if cache is not None:
+        print(cache.report())
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Enrich portfolio CSV from Melon metadata")
     parser.add_argument("--input", default="Portfolio_list.csv", help="Input CSV path")
     parser.add_argument("--output", default="Portfolio_list_with_melon.csv", help="Output CSV path")
     parser.add_argument("--fill-genre-empty", action="store_true", help="Fill empty Genre with GenreMelon")
-    parser.add_argument("--sleep", type=float, default=0.45, help="Sleep between requests (seconds)")
+    parser.add_argument("--sleep", type=float, default=0.45, help="Starting spacing between requests per host (seconds)")
+    parser.add_argument("--min-sleep", type=float, default=None, help="Fastest spacing the pacer may reach while healthy (default: --sleep / 4)")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES, help="Retries per request on 429/5xx or connection errors")
     parser.add_argument("--limit-albums", type=int, default=0, help="Limit unique album lookups for testing")
+    parser.add_argument("--concurrency", type=int, default=1, help="Albums looked up in parallel (1 = serial)")
+    parser.add_argument("--host-concurrency", type=int, default=2, help="Max in-flight requests per host when concurrent")
+    parser.add_argument("--cache-path", default="", help="HTTP response cache database (default: .http_cache.sqlite)")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from the network")
+    parser.add_argument("--incremental", action="store_true", help="Only look up new, changed or previously failed albums")
+    parser.add_argument("--store", default="", help="Read/write this SQLite catalog (default: none, CSV in/out)")
+    parser.add_argument("--reimport", action="store_true", help="With --store, replace the catalog with --input first")
+    parser.add_argument("--parser-backend", choices=sorted(BACKENDS), default="", help="HTML extraction backend (default: lxml if installed)")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Parse pages in this many worker processes (0 = on the lookup threads; forced to 0 on a single core)")
+    parser.add_argument("--resume", action="store_true", help="Replay the checkpoint journal of an interrupted run and fetch only the rest")
+    parser.add_argument("--stats-path", default="", help="Network stats JSON (.prom written alongside; default: <output>.net_stats.json)")
+    parser.add_argument("--stream", action="store_true", help="Bounded memory: keep per-album state only and write rows as albums resolve")
     args = parser.parse_args()
 
-    enrich_csv(
-        input_path=Path(args.input),
-        output_path=Path(args.output),
-        fill_empty_genre=args.fill_genre_empty,
-        sleep_seconds=args.sleep,
-        limit_albums=args.limit_albums,
-    )
+    store = open_store(args.store, Path(args.input), reimport=args.reimport) if args.store else None
+    try:
+        enrich_csv(
+            input_path=Path(args.input),
+            output_path=Path(args.output),
+            fill_empty_genre=args.fill_genre_empty,
+            sleep_seconds=args.sleep,
+            limit_albums=args.limit_albums,
+            concurrency=args.concurrency,
+            host_concurrency=args.host_concurrency,
+            cache=open_cache(args.cache_path, disabled=args.no_cache),
+            incremental=args.incremental,
+            parser_backend=args.parser_backend,
+            store=store,
+            resume=args.resume,
+            stream=args.stream,
+            min_sleep_seconds=args.min_sleep,
+            max_retries=args.max_retries,
+            parse_workers=usable_workers(args.parse_workers),
+        )
+    finally:
+        # Interrupted runs report too; that is usually when the numbers matter.
+        write_run_stats("enrich_melon_metadata", Path(args.output), args.stats_path)
 
 
 if __name__ == "__main__":
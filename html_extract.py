@@ -0,0 +1,459 @@
+"""
+Structured field extraction for Melon/Bugs pages with pluggable backends.
+
+The clients only need a handful of fields from each page (og:image, a few
+dt/dd or th/td pairs, goAlbumDetail anchors), so building a full
+BeautifulSoup tree is mostly wasted work. Three backends return identical
+results:
+
+- "bs4":   BeautifulSoup with CSS selectors (the original implementation)
+- "lxml":  lxml.html with precompiled XPath
+- "regex": a tag scanner over the raw markup, no tree at all
+
+Text values follow BeautifulSoup's `get_text(" ", strip=True)`: every text
+node stripped, empty ones dropped, the rest joined with single spaces.
+"""
+
+from __future__ import annotations
+
+import html as html_lib
+import os
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover - lxml is in requirements.txt
+    etree = None
+    lxml_html = None
+
+
+MELON_ALBUM_HREF_RE = re.compile(r"goAlbumDetail\('([0-9]+)'\)")
+BUGS_ALBUM_HREF_RE = re.compile(r"/album/([0-9]+)")
+
+
+@dataclass
+class SearchCandidate:
+    album_id: str
+    album: str
+    artist: str
+
+
+@dataclass
+class AlbumPageInfo:
+    cover_url: str = ""
+    genre: str = ""
+    release_date: str = ""
+
+
+def _pick_album_fields(pairs: List[Tuple[str, str]]) -> Tuple[str, str]:
+    genre = ""
+    release_date = ""
+    for label, value in pairs:
+        if label == "장르":
+            genre = value
+        elif label == "발매일":
+            release_date = value
+    return genre, release_date
+
+
+class SoupExtractor:
+    name = "bs4"
+
+    def __init__(self, parser: Optional[str] = None):
+        self.parser = parser or ("lxml" if lxml_html is not None else "html.parser")
+
+    def _soup(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, self.parser)
+
+    @staticmethod
+    def _og_image(soup: BeautifulSoup) -> str:
+        og_image = soup.select_one("meta[property='og:image']")
+        return (og_image.get("content") or "").strip() if og_image else ""
+
+    def melon_search(self, html: str) -> List[SearchCandidate]:
+        soup = self._soup(html)
+        section = soup.select_one("div.d_album_list") or soup
+        candidates = []
+        for a in section.select("a[href*='goAlbumDetail']"):
+            m = MELON_ALBUM_HREF_RE.search(a.get("href", ""))
+            if not m:
+                continue
+            cand_album = a.get_text(" ", strip=True)
+            if not cand_album:
+                continue
+            cand_artist = ""
+            li = a.find_parent("li")
+            if li:
+                artist_a = li.select_one("a[href*='goArtistDetail']")
+                if artist_a:
+                    cand_artist = artist_a.get_text(" ", strip=True)
+            candidates.append(SearchCandidate(m.group(1), cand_album, cand_artist))
+        return candidates
+
+    def melon_album(self, html: str) -> AlbumPageInfo:
+        soup = self._soup(html)
+        pairs = []
+        for dt in soup.select("div.meta dl.list dt"):
+            dd = dt.find_next_sibling("dd")
+            if dd:
+                pairs.append((dt.get_text(" ", strip=True), dd.get_text(" ", strip=True)))
+        genre, release_date = _pick_album_fields(pairs)
+        return AlbumPageInfo(self._og_image(soup), genre, release_date)
+
+    def melon_song_meta(self, html: str) -> List[Tuple[str, str]]:
+        soup = self._soup(html)
+        pairs = []
+        for dt in soup.select("div.section_info div.meta dl.list dt"):
+            dd = dt.find_next_sibling("dd")
+            if dd:
+                pairs.append((dt.get_text(" ", strip=True), dd.get_text(" ", strip=True)))
+        return pairs
+
+    def bugs_search(self, html: str) -> List[SearchCandidate]:
+        soup = self._soup(html)
+        candidates = []
+        for row in soup.select("table.byAlbum tbody tr"):
+            album_a = row.select_one("p.title a[href*='/album/']") or row.select_one("a[href*='/album/']")
+            if not album_a:
+                continue
+            m = BUGS_ALBUM_HREF_RE.search(album_a.get("href", ""))
+            if not m:
+                continue
+            artist_a = row.select_one("p.artist a") or row.select_one("a[href*='/artist/']")
+            candidates.append(
+                SearchCandidate(m.group(1), album_a.get_text(" ", strip=True), artist_a.get_text(" ", strip=True) if artist_a else "")
+            )
+        return candidates
+
+    def bugs_album(self, html: str) -> AlbumPageInfo:
+        soup = self._soup(html)
+        pairs = []
+        info_table = soup.select_one("table.info")
+        if info_table:
+            for row in info_table.select("tr"):
+                th = row.select_one("th")
+                td = row.select_one("td")
+                if th and td:
+                    pairs.append((th.get_text(" ", strip=True), td.get_text(" ", strip=True)))
+        genre, release_date = _pick_album_fields(pairs)
+        return AlbumPageInfo(self._og_image(soup), genre, release_date)
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlExtractor:
+    name = "lxml"
+
+    def __init__(self):
+        if lxml_html is None:
+            raise RuntimeError("lxml is not installed")
+        xp = etree.XPath
+        self._og_image_xp = xp("(//meta[@property='og:image'])[1]/@content")
+        self._album_section_xp = xp(f"(//div[{_has_class('d_album_list')}])[1]")
+        self._album_anchors_xp = xp(".//a[contains(@href, 'goAlbumDetail')]")
+        self._parent_li_xp = xp("ancestor::li[1]")
+        self._artist_anchor_xp = xp("(.//a[contains(@href, 'goArtistDetail')])[1]")
+        self._album_meta_dt_xp = xp(f"//div[{_has_class('meta')}]//dl[{_has_class('list')}]//dt")
+        self._song_meta_dt_xp = xp(f"//div[{_has_class('section_info')}]//div[{_has_class('meta')}]//dl[{_has_class('list')}]//dt")
+        self._next_dd_xp = xp("following-sibling::dd[1]")
+        self._bugs_rows_xp = xp(f"//table[{_has_class('byAlbum')}]//tbody//tr")
+        self._bugs_title_a_xp = xp(f"(.//p[{_has_class('title')}]//a[contains(@href, '/album/')])[1]")
+        self._bugs_any_album_a_xp = xp("(.//a[contains(@href, '/album/')])[1]")
+        self._bugs_artist_p_a_xp = xp(f"(.//p[{_has_class('artist')}]//a)[1]")
+        self._bugs_any_artist_a_xp = xp("(.//a[contains(@href, '/artist/')])[1]")
+        self._bugs_info_table_xp = xp(f"(//table[{_has_class('info')}])[1]")
+        self._rows_xp = xp(".//tr")
+        self._first_th_xp = xp("(.//th)[1]")
+        self._first_td_xp = xp("(.//td)[1]")
+
+    @staticmethod
+    def _root(html: str):
+        return lxml_html.document_fromstring(html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8"))
+
+    @staticmethod
+    def _text(el) -> str:
+        return " ".join(part.strip() for part in el.itertext() if part.strip())
+
+    def _first(self, xpath, node):
+        found = xpath(node)
+        return found[0] if found else None
+
+    def _og_image(self, root) -> str:
+        content = self._og_image_xp(root)
+        return content[0].strip() if content else ""
+
+    def _dt_pairs(self, dts) -> List[Tuple[str, str]]:
+        pairs = []
+        for dt in dts:
+            dd = self._first(self._next_dd_xp, dt)
+            if dd is not None:
+                pairs.append((self._text(dt), self._text(dd)))
+        return pairs
+
+    def melon_search(self, html: str) -> List[SearchCandidate]:
+        root = self._root(html)
+        section = self._first(self._album_section_xp, root)
+        if section is None:
+            section = root
+        candidates = []
+        for a in self._album_anchors_xp(section):
+            m = MELON_ALBUM_HREF_RE.search(a.get("href", ""))
+            if not m:
+                continue
+            cand_album = self._text(a)
+            if not cand_album:
+                continue
+            cand_artist = ""
+            li = self._first(self._parent_li_xp, a)
+            if li is not None:
+                artist_a = self._first(self._artist_anchor_xp, li)
+                if artist_a is not None:
+                    cand_artist = self._text(artist_a)
+            candidates.append(SearchCandidate(m.group(1), cand_album, cand_artist))
+        return candidates
+
+    def melon_album(self, html: str) -> AlbumPageInfo:
+        root = self._root(html)
+        genre, release_date = _pick_album_fields(self._dt_pairs(self._album_meta_dt_xp(root)))
+        return AlbumPageInfo(self._og_image(root), genre, release_date)
+
+    def melon_song_meta(self, html: str) -> List[Tuple[str, str]]:
+        return self._dt_pairs(self._song_meta_dt_xp(self._root(html)))
+
+    def bugs_search(self, html: str) -> List[SearchCandidate]:
+        root = self._root(html)
+        candidates = []
+        for row in self._bugs_rows_xp(root):
+            album_a = self._first(self._bugs_title_a_xp, row)
+            if album_a is None:
+                album_a = self._first(self._bugs_any_album_a_xp, row)
+            if album_a is None:
+                continue
+            m = BUGS_ALBUM_HREF_RE.search(album_a.get("href", ""))
+            if not m:
+                continue
+            artist_a = self._first(self._bugs_artist_p_a_xp, row)
+            if artist_a is None:
+                artist_a = self._first(self._bugs_any_artist_a_xp, row)
+            candidates.append(SearchCandidate(m.group(1), self._text(album_a), self._text(artist_a) if artist_a is not None else ""))
+        return candidates
+
+    def bugs_album(self, html: str) -> AlbumPageInfo:
+        root = self._root(html)
+        pairs = []
+        table = self._first(self._bugs_info_table_xp, root)
+        if table is not None:
+            for row in self._rows_xp(table):
+                th = self._first(self._first_th_xp, row)
+                td = self._first(self._first_td_xp, row)
+                if th is not None and td is not None:
+                    pairs.append((self._text(th), self._text(td)))
+        genre, release_date = _pick_album_fields(pairs)
+        return AlbumPageInfo(self._og_image(root), genre, release_date)
+
+
+_IGNORED_BLOCK_RE = re.compile(r"<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>", re.S | re.I)
+_TAG_RE = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)\b((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>")
+_ATTR_RE = re.compile(r"([a-zA-Z_:][-a-zA-Z0-9_:.]*)\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s\"'>]+)")
+_VOID_TAGS = frozenset(["area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"])
+
+
+@dataclass
+class _Element:
+    tag: str
+    attrs: Dict[str, str]
+    start: int  # offset of "<"
+    inner_start: int  # offset just after the opening tag
+    inner_end: int  # offset of the closing tag (or end of parent when unclosed)
+    parent: Optional["_Element"]
+    index: int  # position in _ScannedPage.elements
+
+    def has_class(self, name: str) -> bool:
+        return name in self.attrs.get("class", "").split()
+
+
+class _ScannedPage:
+    """A flat list of elements with source offsets, built by one regex pass."""
+
+    def __init__(self, html: str):
+        self.html = _IGNORED_BLOCK_RE.sub(lambda m: " " * len(m.group(0)), html)
+        self.elements: List[_Element] = []
+        stack: List[_Element] = []
+        for m in _TAG_RE.finditer(self.html):
+            closing, tag = m.group(1), m.group(2).lower()
+            if closing:
+                # Close the nearest matching open element; anything opened
+                # inside it and left unclosed ends at the same point.
+                for depth in range(len(stack) - 1, -1, -1):
+                    if stack[depth].tag == tag:
+                        for el in stack[depth:]:
+                            el.inner_end = m.start()
+                        del stack[depth:]
+                        break
+                continue
+            attrs = {k.lower(): html_lib.unescape(v.strip("\"'")) for k, v in _ATTR_RE.findall(m.group(3))}
+            el = _Element(tag, attrs, m.start(), m.end(), len(self.html), stack[-1] if stack else None, len(self.elements))
+            self.elements.append(el)
+            if tag not in _VOID_TAGS and not m.group(3).rstrip().endswith("/"):
+                stack.append(el)
+        self._starts = [el.start for el in self.elements]
+
+    def text(self, el: _Element) -> str:
+        inner = self.html[el.inner_start : el.inner_end]
+        parts = (html_lib.unescape(part).strip() for part in re.split(r"<[^>]*>", inner))
+        return " ".join(part for part in parts if part)
+
+    def find_all(self, tag: str, within: Optional[_Element] = None) -> List[_Element]:
+        if within is None:
+            return [el for el in self.elements if el.tag == tag]
+        lo = bisect_right(self._starts, within.start)
+        hi = bisect_right(self._starts, within.inner_end)
+        return [el for el in self.elements[lo:hi] if el.tag == tag]
+
+    def first(self, tag: str, within: Optional[_Element] = None, predicate=None) -> Optional[_Element]:
+        for el in self.find_all(tag, within):
+            if predicate is None or predicate(el):
+                return el
+        return None
+
+    @staticmethod
+    def ancestor(el: _Element, tag: str, predicate=None) -> Optional[_Element]:
+        node = el.parent
+        while node is not None:
+            if node.tag == tag and (predicate is None or predicate(node)):
+                return node
+            node = node.parent
+        return None
+
+    def og_image(self) -> str:
+        meta = self.first("meta", predicate=lambda el: el.attrs.get("property") == "og:image")
+        return (meta.attrs.get("content") or "").strip() if meta else ""
+
+
+def _inside(el: _Element, tag: str, cls: str) -> bool:
+    return _ScannedPage.ancestor(el, tag, lambda node: node.has_class(cls)) is not None
+
+
+class RegexExtractor:
+    name = "regex"
+
+    def melon_search(self, html: str) -> List[SearchCandidate]:
+        page = _ScannedPage(html)
+        section = page.first("div", predicate=lambda el: el.has_class("d_album_list"))
+        candidates = []
+        for a in page.find_all("a", section):
+            m = MELON_ALBUM_HREF_RE.search(a.attrs.get("href", ""))
+            if not m:
+                continue
+            cand_album = page.text(a)
+            if not cand_album:
+                continue
+            cand_artist = ""
+            li = page.ancestor(a, "li")
+            if li is not None:
+                artist_a = page.first("a", li, lambda el: "goArtistDetail" in el.attrs.get("href", ""))
+                if artist_a is not None:
+                    cand_artist = page.text(artist_a)
+            candidates.append(SearchCandidate(m.group(1), cand_album, cand_artist))
+        return candidates
+
+    def _dt_pairs(self, page: _ScannedPage, in_section_info: bool) -> List[Tuple[str, str]]:
+        pairs = []
+        for dt in page.find_all("dt"):
+            dl = page.ancestor(dt, "dl", lambda node: node.has_class("list"))
+            if dl is None:
+                continue
+            if not (self._meta_chain_in_section_info(dl) if in_section_info else _inside(dl, "div", "meta")):
+                continue
+            dd = self._next_dd(page, dt)
+            if dd is not None:
+                pairs.append((page.text(dt), page.text(dd)))
+        return pairs
+
+    @staticmethod
+    def _meta_chain_in_section_info(dl: _Element) -> bool:
+        # `div.section_info div.meta dl.list`: any div.meta ancestor of the dl
+        # that itself sits inside a div.section_info.
+        node = dl.parent
+        while node is not None:
+            if node.tag == "div" and node.has_class("meta") and _inside(node, "div", "section_info"):
+                return True
+            node = node.parent
+        return False
+
+    @staticmethod
+    def _next_dd(page: _ScannedPage, dt: _Element) -> Optional[_Element]:
+        parent = dt.parent
+        for el in page.elements[dt.index + 1 :]:
+            if parent is not None and el.start >= parent.inner_end:
+                break
+            if el.parent is parent and el.tag == "dd":
+                return el
+        return None
+
+    def melon_album(self, html: str) -> AlbumPageInfo:
+        page = _ScannedPage(html)
+        genre, release_date = _pick_album_fields(self._dt_pairs(page, in_section_info=False))
+        return AlbumPageInfo(page.og_image(), genre, release_date)
+
+    def melon_song_meta(self, html: str) -> List[Tuple[str, str]]:
+        return self._dt_pairs(_ScannedPage(html), in_section_info=True)
+
+    def bugs_search(self, html: str) -> List[SearchCandidate]:
+        page = _ScannedPage(html)
+        candidates = []
+        for row in page.find_all("tr"):
+            tbody = page.ancestor(row, "tbody")
+            if tbody is None or not _inside(tbody, "table", "byAlbum"):
+                continue
+            album_a = page.first(
+                "a",
+                row,
+                lambda el: "/album/" in el.attrs.get("href", "") and _ScannedPage.ancestor(el, "p", lambda p: p.has_class("title")) is not None,
+            ) or page.first("a", row, lambda el: "/album/" in el.attrs.get("href", ""))
+            if album_a is None:
+                continue
+            m = BUGS_ALBUM_HREF_RE.search(album_a.attrs.get("href", ""))
+            if not m:
+                continue
+            artist_a = page.first(
+                "a", row, lambda el: _ScannedPage.ancestor(el, "p", lambda p: p.has_class("artist")) is not None
+            ) or page.first("a", row, lambda el: "/artist/" in el.attrs.get("href", ""))
+            candidates.append(SearchCandidate(m.group(1), page.text(album_a), page.text(artist_a) if artist_a is not None else ""))
+        return candidates
+
+    def bugs_album(self, html: str) -> AlbumPageInfo:
+        page = _ScannedPage(html)
+        pairs = []
+        table = page.first("table", predicate=lambda el: el.has_class("info"))
+        if table is not None:
+            for row in page.find_all("tr", table):
+                th = page.first("th", row)
+                td = page.first("td", row)
+                if th is not None and td is not None:
+                    pairs.append((page.text(th), page.text(td)))
+        genre, release_date = _pick_album_fields(pairs)
+        return AlbumPageInfo(page.og_image(), genre, release_date)
+
+
+BACKENDS = {
+    "bs4": SoupExtractor,
+    "lxml": LxmlExtractor,
+    "regex": RegexExtractor,
+}
+DEFAULT_BACKEND = os.getenv("HTML_EXTRACT_BACKEND", "").strip().lower() or ("lxml" if lxml_html is not None else "bs4")
+
+
+def get_extractor(name: Optional[str] = None):
+    backend = (name or DEFAULT_BACKEND).strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML extraction backend: {backend} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()
@@ -0,0 +1,303 @@
+"""
+Persistent HTTP response cache shared by the scraper scripts.
+
+Every outbound GET from the Melon/Bugs clients, the priority client and the
+media matcher goes through `fetch()`. When a `ResponseCache` is attached:
+
+- fresh entries (younger than the endpoint's TTL) are served from SQLite
+  without touching the network or the politeness sleep
+- stale entries are revalidated with If-None-Match / If-Modified-Since and
+  a 304 refreshes them in place
+- the database is bounded by `max_bytes`; least recently used entries are
+  evicted first
+- hits/misses/revalidations are counted per endpoint for `report()`
+
+Every call is also recorded in `net_stats.STATS` (latency, bytes, sleep,
+cache events), with or without a cache. Network round trips go through
+`rate_limit.send_paced()` with the caller's pacer and retry policy.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from net_stats import STATS, host_of
+from rate_limit import AdaptivePacer, RetryPolicy, send_paced
+
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / ".http_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Album pages and artwork rarely change; search pages and like counters do.
+ENDPOINT_TTLS: Dict[str, float] = {
+    "melon_search": 1 * DAY,
+    "melon_album": 7 * DAY,
+    "melon_song": 1 * DAY,
+    "melon_like": 6 * HOUR,
+    "bugs_search": 1 * DAY,
+    "bugs_album": 7 * DAY,
+    "youtube_oembed": 7 * DAY,
+    "itunes_search": 7 * DAY,
+}
+DEFAULT_TTL = 1 * HOUR
+
+
+@dataclass
+class CachedResponse:
+    """The subset of `requests.Response` the scrapers use, detached from the socket."""
+
+    url: str
+    status_code: int
+    content: bytes
+    encoding: str = "utf-8"
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+    @classmethod
+    def from_requests(cls, resp: requests.Response) -> "CachedResponse":
+        return cls(
+            url=resp.url,
+            status_code=resp.status_code,
+            content=resp.content,
+            encoding=resp.encoding or resp.apparent_encoding or "utf-8",
+            headers={k: v for k, v in resp.headers.items()},
+        )
+
+
+@dataclass
+class _Entry:
+    response: CachedResponse
+    endpoint: str
+    etag: str
+    last_modified: str
+    fetched_at: float
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttls = dict(ENDPOINT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                encoding TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT NOT NULL DEFAULT '',
+                last_modified TEXT NOT NULL DEFAULT '',
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def count(self, endpoint: str, event: str) -> None:
+        with self._lock:
+            per_endpoint = self.stats.setdefault(endpoint, {"hit": 0, "miss": 0, "revalidated": 0, "stored": 0, "evicted": 0})
+            per_endpoint[event] = per_endpoint.get(event, 0) + 1
+
+    def lookup(self, url: str) -> Optional[_Entry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT endpoint, status, headers, encoding, body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        endpoint, status, headers, encoding, body, etag, last_modified, fetched_at = row
+        response = CachedResponse(
+            url=url,
+            status_code=status,
+            content=bytes(body),
+            encoding=encoding,
+            headers=json.loads(headers),
+            from_cache=True,
+        )
+        return _Entry(response, endpoint, etag, last_modified, fetched_at)
+
+    def is_fresh(self, entry: _Entry) -> bool:
+        return time.time() - entry.fetched_at < self.ttl_for(entry.endpoint)
+
+    def store(self, url: str, endpoint: str, response: CachedResponse) -> None:
+        body = response.content
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (url, endpoint, status, headers, encoding, body, size, etag, last_modified, fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    url,
+                    endpoint,
+                    response.status_code,
+                    json.dumps(response.headers),
+                    response.encoding or "utf-8",
+                    sqlite3.Binary(body),
+                    len(body),
+                    response.headers.get("ETag", ""),
+                    response.headers.get("Last-Modified", ""),
+                    now,
+                    now,
+                ),
+            )
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            evicted = self._evict_locked()
+            self._conn.commit()
+        self.count(endpoint, "stored")
+        for evicted_endpoint in evicted:
+            self.count(evicted_endpoint, "evicted")
+
+    def refresh(self, url: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+
+    def _evict_locked(self) -> List[str]:
+        evicted: List[str] = []
+        if self._total_bytes <= self.max_bytes:
+            return evicted
+        # Trim to 90% so a full cache doesn't evict on every single store.
+        target = int(self.max_bytes * 0.9)
+        cursor = self._conn.execute("SELECT url, endpoint, size FROM responses ORDER BY last_access ASC")
+        doomed = []
+        for url, endpoint, size in cursor:
+            if self._total_bytes <= target:
+                break
+            doomed.append((url,))
+            evicted.append(endpoint)
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+        return evicted
+
+    def report(self) -> str:
+        with self._lock:
+            stats = {endpoint: dict(counts) for endpoint, counts in self.stats.items()}
+        totals = {"hit": 0, "miss": 0, "revalidated": 0}
+        lines = []
+        for endpoint in sorted(stats):
+            counts = stats[endpoint]
+            for key in totals:
+                totals[key] += counts.get(key, 0)
+            lines.append(
+                f"  {endpoint}: {counts['hit']} hit, {counts['miss']} miss, "
+                f"{counts['revalidated']} revalidated, {counts['evicted']} evicted"
+            )
+        served = totals["hit"] + totals["revalidated"]
+        lookups = served + totals["miss"]
+        rate = (100.0 * served / lookups) if lookups else 0.0
+        header = (
+            f"HTTP cache ({self.path.name}, {self._total_bytes / 1024 / 1024:.1f} MB): "
+            f"{totals['hit']} hit, {totals['miss']} miss, {totals['revalidated']} revalidated ({rate:.1f}% served from cache)"
+        )
+        return "\n".join([header] + lines)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_cache(path: Optional[str], disabled: bool = False) -> Optional[ResponseCache]:
+    """Open the shared cache for a CLI run; `HTTP_CACHE=0` in the environment also disables it."""
+    if disabled or os.getenv("HTTP_CACHE", "").strip().lower() in {"0", "false", "no", "off"}:
+        return None
+    return ResponseCache(Path(path) if path else Path(os.getenv("HTTP_CACHE_PATH") or DEFAULT_CACHE_PATH))
+
+
+def fetch(
+    session: Optional[requests.Session],
+    url: str,
+    *,
+    endpoint: str,
+    cache: Optional[ResponseCache] = None,
+    timeout: float = 15,
+    headers: Optional[Dict[str, str]] = None,
+    pacer: Optional[AdaptivePacer] = None,
+    retry: Optional[RetryPolicy] = None,
+) -> CachedResponse:
+    """GET `url`, consulting `cache` first.
+
+    `pacer` and `retry` apply only to the real network round trip, so cache
+    hits are served without waiting. Once retries run out the last 429/5xx
+    is returned like any other response.
+    """
+    entry = cache.lookup(url) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        cache.count(endpoint, "hit")
+        STATS.cache_event(host_of(url), endpoint, "hit")
+        return entry.response
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry.etag:
+            request_headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            request_headers["If-Modified-Since"] = entry.last_modified
+
+    getter = session.get if session is not None else requests.get
+    resp = send_paced(url, endpoint, lambda: getter(url, headers=request_headers or None, timeout=timeout), pacer=pacer, retry=retry)
+
+    if entry is not None and resp.status_code == 304:
+        cache.refresh(url)
+        cache.count(endpoint, "revalidated")
+        STATS.cache_event(host_of(url), endpoint, "revalidated")
+        return entry.response
+
+    response = CachedResponse.from_requests(resp)
+    if cache is not None:
+        cache.count(endpoint, "miss")
+        STATS.cache_event(host_of(url), endpoint, "miss")
+        if response.status_code == 200:
+            cache.store(url, endpoint, response)
+    return response
@@ -0,0 +1,370 @@
+"""
+Run statistics for every outbound request the pipeline scripts make.
+
+`http_cache.fetch()`, the image downloader and the YouTube search pool all
+report into the process-wide `STATS`, keyed by (host, endpoint):
+
+- requests by outcome (HTTP status, "error", or a search result)
+- round-trip latency as a fixed-bucket histogram, plus its sum and max
+- response bytes and transport retries
+- time spent in the politeness sleep / host throttle before each request
+- cache events (hit, miss, revalidated, deduped)
+
+HTML parsing is timed separately through `timed_extractor()`, so a slow run
+can be split into network, waiting and parsing. At the end of a run
+`write_run_stats()` saves a JSON report and a Prometheus textfile (for the
+node_exporter textfile collector) next to the output and prints a summary.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from checkpoint import atomic_write
+
+
+# Seconds; the last bucket is +Inf.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = "portfolio"
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def response_retries(resp) -> int:
+    """Retries urllib3 made for `resp` (0 unless the session mounts a Retry)."""
+    retries = getattr(getattr(resp, "raw", None), "retries", None)
+    return len(getattr(retries, "history", None) or ())
+
+
+@dataclass
+class EndpointStats:
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes: int = 0
+    retries: int = 0
+    sleep_seconds: float = 0.0
+    cache: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.outcomes.values())
+
+    def observe(self, seconds: float) -> None:
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def quantile(self, q: float) -> float:
+        """Histogram estimate (linear within the bucket), as histogram_quantile() does."""
+        total = sum(self.buckets)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(self.buckets):
+            upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max_seconds
+            if count and seen + count >= rank:
+                return min(self.max_seconds, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+            lower = upper
+        return self.max_seconds
+
+
+class NetStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self.endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+            self.parse: Dict[str, List[float]] = {}
+
+    def _endpoint(self, host: str, endpoint: str) -> EndpointStats:
+        key = (host, endpoint)
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        return stats
+
+    # -- recording ---------------------------------------------------------
+
+    def request(
+        self,
+        host: str,
+        endpoint: str,
+        outcome: str,
+        seconds: float,
+        nbytes: int = 0,
+        retries: int = 0,
+        sleep_seconds: float = 0.0,
+    ) -> None:
+        with self._lock:
+            stats = self._endpoint(host, endpoint)
+            stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+            stats.observe(seconds)
+            stats.bytes += nbytes
+            stats.retries += retries
+            stats.sleep_seconds += sleep_seconds
+
+    def retry(self, host: str, endpoint: str, count: int = 1) -> None:
+        with self._lock:
+            self._endpoint(host, endpoint).retries += count
+
+    def sleep(self, host: str, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._endpoint(host, endpoint).sleep_seconds += seconds
+
+    def cache_event(self, host: str, endpoint: str, event: str) -> None:
+        with self._lock:
+            cache = self._endpoint(host, endpoint).cache
+            cache[event] = cache.get(event, 0) + 1
+
+    def parsed(self, name: str, seconds: float) -> None:
+        with self._lock:
+            calls = self.parse.setdefault(name, [0, 0.0])
+            calls[0] += 1
+            calls[1] += seconds
+
+    def observe(self, url: str, endpoint: str, send: Callable[[], object], pace: Optional[Callable[[], ContextManager]] = None):
+        """
+        Call `send()` inside `pace()` and record it: the time spent entering
+        `pace` counts as sleep, the call itself as latency. Exceptions are
+        recorded as outcome "error" and re-raised.
+        """
+        host = host_of(url)
+        waiting = time.perf_counter()
+        with (pace() if pace is not None else nullcontext()):
+            started = time.perf_counter()
+            try:
+                resp = send()
+            except Exception:
+                self.request(host, endpoint, "error", time.perf_counter() - started, sleep_seconds=started - waiting)
+                raise
+            elapsed = time.perf_counter() - started
+            nbytes = len(getattr(resp, "content", b"") or b"")
+        self.request(
+            host,
+            endpoint,
+            str(getattr(resp, "status_code", "")),
+            elapsed,
+            nbytes=nbytes,
+            retries=response_retries(resp),
+            sleep_seconds=started - waiting,
+        )
+        return resp
+
+    # -- reports -----------------------------------------------------------
+
+    def snapshot(self, job: str = "") -> Dict[str, object]:
+        finished = time.time()
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            endpoints = []
+            totals = {"requests": 0, "errors": 0, "bytes": 0, "retries": 0, "request_seconds": 0.0, "sleep_seconds": 0.0, "cache": {}}
+            for (host, endpoint), stats in items:
+                errors = sum(n for outcome, n in stats.outcomes.items() if outcome == "error" or outcome[:1] in "45")
+                endpoints.append(
+                    {
+                        "host": host,
+                        "endpoint": endpoint,
+                        "requests": stats.requests,
+                        "outcomes": dict(sorted(stats.outcomes.items())),
+                        "bytes": stats.bytes,
+                        "retries": stats.retries,
+                        "sleep_seconds": round(stats.sleep_seconds, 6),
+                        "cache": dict(sorted(stats.cache.items())),
+                        "latency": {
+                            "sum_seconds": round(stats.seconds, 6),
+                            "max_seconds": round(stats.max_seconds, 6),
+                            "p50_seconds": round(stats.quantile(0.5), 6),
+                            "p95_seconds": round(stats.quantile(0.95), 6),
+                            "buckets": {_le(i): n for i, n in enumerate(stats.buckets)},
+                        },
+                    }
+                )
+                totals["requests"] += stats.requests
+                totals["errors"] += errors
+                totals["bytes"] += stats.bytes
+                totals["retries"] += stats.retries
+                totals["request_seconds"] += stats.seconds
+                totals["sleep_seconds"] += stats.sleep_seconds
+                for event, n in stats.cache.items():
+                    totals["cache"][event] = totals["cache"].get(event, 0) + n
+            parse = {name: {"calls": calls, "seconds": round(seconds, 6)} for name, (calls, seconds) in sorted(self.parse.items())}
+            started = self.started
+        totals["request_seconds"] = round(totals["request_seconds"], 6)
+        totals["sleep_seconds"] = round(totals["sleep_seconds"], 6)
+        totals["parse_seconds"] = round(sum(p["seconds"] for p in parse.values()), 6)
+        return {
+            "job": job,
+            "started_at": datetime.fromtimestamp(started, timezone.utc).isoformat(),
+            "finished_at": datetime.fromtimestamp(finished, timezone.utc).isoformat(),
+            "duration_seconds": round(finished - started, 6),
+            "totals": totals,
+            "endpoints": endpoints,
+            "parse": parse,
+        }
+
+    def prometheus(self, job: str) -> str:
+        """The run in the Prometheus text exposition format."""
+        snap = self.snapshot(job)
+        out: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            metric = f"{METRIC_PREFIX}_{name}"
+            out.append(f"# HELP {metric} {help_text}")
+            out.append(f"# TYPE {metric} {kind}")
+            return metric
+
+        def sample(metric: str, labels: Dict[str, str], value) -> None:
+            rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in {"job": job, **labels}.items())
+            out.append(f"{metric}{{{rendered}}} {_number(value)}")
+
+        endpoints = snap["endpoints"]
+        metric = family("http_requests_total", "counter", "Outbound requests by host, endpoint and outcome (HTTP status or error).")
+        for e in endpoints:
+            for outcome, n in e["outcomes"].items():
+                sample(metric, {"host": e["host"], "endpoint": e["endpoint"], "outcome": outcome}, n)
+
+        metric = family("http_request_duration_seconds", "histogram", "Round-trip time of outbound requests, excluding pacing.")
+        for e in endpoints:
+            labels = {"host": e["host"], "endpoint": e["endpoint"]}
+            cumulative = 0
+            for le, n in e["latency"]["buckets"].items():
+                cumulative += n
+                sample(metric + "_bucket", {**labels, "le": le}, cumulative)
+            sample(metric + "_sum", labels, e["latency"]["sum_seconds"])
+            sample(metric + "_count", labels, e["requests"])
+
+        for name, key, help_text in (
+            ("http_response_bytes_total", "bytes", "Response body bytes received."),
+            ("http_retries_total", "retries", "Transport-level retries."),
+            ("http_sleep_seconds_total", "sleep_seconds", "Time spent in politeness sleeps and host throttles before requests."),
+        ):
+            metric = family(name, "counter", help_text)
+            for e in endpoints:
+                sample(metric, {"host": e["host"], "endpoint": e["endpoint"]}, e[key])
+
+        metric = family("http_cache_events_total", "counter", "Response cache events (hit, miss, revalidated, deduped).")
+        for e in endpoints:
+            for event, n in e["cache"].items():
+                sample(metric, {"host": e["host"], "endpoint": e["endpoint"], "event": event}, n)
+
+        metric = family("parse_seconds_total", "counter", "Time spent extracting fields from fetched pages.")
+        for name, p in snap["parse"].items():
+            sample(metric, {"parser": name}, p["seconds"])
+        metric = family("parse_calls_total", "counter", "Pages passed to the field extractor.")
+        for name, p in snap["parse"].items():
+            sample(metric, {"parser": name}, p["calls"])
+
+        metric = family("run_duration_seconds", "gauge", "Wall-clock duration of the last run.")
+        sample(metric, {}, snap["duration_seconds"])
+        metric = family("run_finished_timestamp_seconds", "gauge", "Unix time the last run finished.")
+        sample(metric, {}, datetime.fromisoformat(snap["finished_at"]).timestamp())
+        return "\n".join(out) + "\n"
+
+    def report(self) -> str:
+        snap = self.snapshot()
+        totals = snap["totals"]
+        cache = totals["cache"]
+        lines = [
+            f"Network ({snap['duration_seconds']:.1f} s run): {totals['requests']} requests, {totals['errors']} errors, "
+            f"{totals['bytes'] / 1024 / 1024:.1f} MB, {totals['retries']} retries, "
+            f"{totals['request_seconds']:.1f} s in requests, {totals['sleep_seconds']:.1f} s sleeping, "
+            f"{totals['parse_seconds']:.1f} s parsing"
+            + (", cache " + " / ".join(f"{n} {event}" for event, n in sorted(cache.items())) if cache else "")
+        ]
+        for e in snap["endpoints"]:
+            latency = e["latency"]
+            outcomes = " ".join(f"{outcome}:{n}" for outcome, n in e["outcomes"].items())
+            lines.append(
+                f"  {e['host']} {e['endpoint']}: {e['requests']} req [{outcomes or '-'}], "
+                f"p50 {latency['p50_seconds'] * 1000:.0f} ms, p95 {latency['p95_seconds'] * 1000:.0f} ms, "
+                f"max {latency['max_seconds'] * 1000:.0f} ms, {e['bytes'] / 1024:.0f} KB, sleep {e['sleep_seconds']:.1f} s"
+            )
+        for name, p in snap["parse"].items():
+            lines.append(f"  parse {name}: {p['calls']} pages, {p['seconds'] * 1000:.0f} ms")
+        return "\n".join(lines)
+
+    def write_reports(self, json_path: Path, prom_path: Path, job: str) -> None:
+        with atomic_write(json_path) as f:
+            f.write(json.dumps(self.snapshot(job), ensure_ascii=False, indent=2))
+        with atomic_write(prom_path) as f:
+            f.write(self.prometheus(job))
+
+
+def _le(index: int) -> str:
+    return _number(LATENCY_BUCKETS[index]) if index < len(LATENCY_BUCKETS) else "+Inf"
+
+
+def _number(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STATS = NetStats()
+
+
+class _TimedExtractor:
+    """Proxy that times every extractor method call into `STATS.parse`."""
+
+    def __init__(self, extractor, stats: NetStats):
+        self._extractor = extractor
+        self._stats = stats
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._extractor, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self._stats.parsed(name, time.perf_counter() - started)
+
+        return timed
+
+
+def timed_extractor(extractor, stats: Optional[NetStats] = None):
+    return _TimedExtractor(extractor, stats or STATS)
+
+
+def stats_paths(output_path: Path, stats_path: str = "") -> Tuple[Path, Path]:
+    """JSON and Prometheus report paths: `stats_path` if given, else next to the output."""
+    base = Path(stats_path) if stats_path else Path(output_path).with_name(Path(output_path).stem + ".net_stats.json")
+    return base, base.with_suffix(".prom")
+
+
+def write_run_stats(job: str, output_path: Path, stats_path: str = "", stats: Optional[NetStats] = None) -> None:
+    """Print the run summary and save the JSON / Prometheus reports."""
+    stats = stats or STATS
+    json_path, prom_path = stats_paths(output_path, stats_path)
+    stats.write_reports(json_path, prom_path, job)
+    print(stats.report())
+    print(f"Saved: {json_path}, {prom_path.name}")
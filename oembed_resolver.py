@@ -0,0 +1,189 @@
+"""
+Batch YouTube oEmbed resolution for the media matcher.
+
+`build_matches` used to call oEmbed inline, one row at a time, and only kept
+results for the length of the run; a deleted or private video (oEmbed
+answers 401/403/404) was asked about again on every run. `OEmbedResolver`
+instead
+
+- takes every video id the CSV needs up front, deduplicated,
+- answers what it can from a JSON state file: found videos (with their
+  title) stay good for `ok_ttl`, unavailable ones for `missing_ttl`,
+- looks the rest up concurrently through one pooled session, and
+- writes the new outcomes back to the state file (expired entries are
+  dropped on save).
+
+Lookups that fail for any other reason (5xx, throttling once retries run out,
+connection errors, bad JSON) are not stored, so the next run tries again.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from checkpoint import atomic_write
+from net_stats import STATS
+
+
+STATE_VERSION = 1
+HOUR = 3600
+DAY = 24 * HOUR
+DEFAULT_OK_TTL = 30 * DAY
+# A private video may come back; check again sooner.
+DEFAULT_MISSING_TTL = 3 * DAY
+DEFAULT_WORKERS = 4
+USER_AGENT = "Mozilla/5.0"
+# What oEmbed answers for deleted, private and non-embeddable videos.
+MISSING_STATUSES = frozenset({400, 401, 403, 404, 410})
+STATS_HOST = "www.youtube.com"
+
+
+class OEmbedState:
+    """video id -> {"status": "ok"|"missing", "title", "http_status", "checked_at"} on disk."""
+
+    def __init__(self, path: Optional[Path], ok_ttl: float = DEFAULT_OK_TTL, missing_ttl: float = DEFAULT_MISSING_TTL):
+        self.path = Path(path) if path else None
+        self.ttls = {"ok": ok_ttl, "missing": missing_ttl}
+        self.videos: Dict[str, Dict[str, object]] = self._load()
+        self.dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, object]]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if payload.get("version") != STATE_VERSION:
+            return {}
+        return payload.get("videos") or {}
+
+    def is_fresh(self, entry: Dict[str, object], now: float) -> bool:
+        ttl = self.ttls.get(str(entry.get("status")), 0)
+        return now - float(entry.get("checked_at") or 0) < ttl
+
+    def get(self, video_id: str, now: float) -> Optional[Dict[str, object]]:
+        entry = self.videos.get(video_id)
+        return entry if entry is not None and self.is_fresh(entry, now) else None
+
+    def put(self, video_id: str, status: str, title: str, http_status: int, now: float) -> None:
+        entry: Dict[str, object] = {"status": status, "http_status": http_status, "checked_at": round(now, 3)}
+        if status == "ok":
+            entry["title"] = title
+        self.videos[video_id] = entry
+        self.dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        now = time.time()
+        videos = {video_id: entry for video_id, entry in sorted(self.videos.items()) if self.is_fresh(entry, now)}
+        with atomic_write(self.path) as f:
+            json.dump({"version": STATE_VERSION, "videos": videos}, f, ensure_ascii=False, indent=1)
+        self.dirty = False
+
+
+class OEmbedResolver:
+    """
+    Resolve many video ids at once.
+
+    `lookup(session, video_id)` returns (HTTP status, title) for one video;
+    it runs on the pool's threads with the pool's session.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[requests.Session, str], Tuple[int, str]],
+        state_path: Optional[Path] = None,
+        workers: int = DEFAULT_WORKERS,
+        ok_ttl: float = DEFAULT_OK_TTL,
+        missing_ttl: float = DEFAULT_MISSING_TTL,
+        refresh: bool = False,
+    ):
+        self._lookup = lookup
+        self.state = OEmbedState(state_path, ok_ttl, missing_ttl)
+        self.workers = max(1, workers)
+        self.refresh = refresh
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_maxsize=self.workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats: Counter = Counter()
+
+    def _resolve_one(self, video_id: str) -> Tuple[str, str, int]:
+        """(status, title, http status); status is "ok", "missing" or "error"."""
+        try:
+            http_status, title = self._lookup(self.session, video_id)
+        except Exception:
+            return "error", "", 0
+        if http_status == 200:
+            return "ok", title or "", http_status
+        if http_status in MISSING_STATUSES:
+            return "missing", "", http_status
+        return "error", "", http_status
+
+    def resolve(self, video_ids: Iterable[str]) -> Dict[str, str]:
+        """Title per video id that oEmbed knows; unavailable and failed ids are left out."""
+        now = time.time()
+        titles: Dict[str, str] = {}
+        pending = []
+        seen = set()
+        for video_id in video_ids:
+            if not video_id:
+                continue
+            if video_id in seen:
+                self.stats["deduped"] += 1
+                STATS.cache_event(STATS_HOST, "youtube_oembed", "deduped")
+                continue
+            seen.add(video_id)
+            entry = None if self.refresh else self.state.get(video_id, now)
+            if entry is None:
+                pending.append(video_id)
+                continue
+            self.stats[f"stored_{entry['status']}"] += 1
+            if entry["status"] == "ok":
+                titles[video_id] = str(entry.get("title") or "")
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending)), thread_name_prefix="oembed") as pool:
+                outcomes = list(pool.map(self._resolve_one, pending))
+            checked_at = time.time()
+            for video_id, (status, title, http_status) in zip(pending, outcomes):
+                self.stats[status] += 1
+                if status == "error":
+                    continue
+                self.state.put(video_id, status, title, http_status, checked_at)
+                if status == "ok":
+                    titles[video_id] = title
+        self.stats["ids"] += len(seen)
+        self.state.save()
+        return titles
+
+    def report(self) -> str:
+        stats = dict(self.stats)
+        return (
+            f"oEmbed: {stats.get('ids', 0)} videos ({stats.get('deduped', 0)} duplicate rows), "
+            f"{stats.get('stored_ok', 0) + stats.get('stored_missing', 0)} from state "
+            f"({stats.get('stored_missing', 0)} unavailable), "
+            f"{stats.get('ok', 0) + stats.get('missing', 0) + stats.get('error', 0)} looked up "
+            f"({stats.get('ok', 0)} found, {stats.get('missing', 0)} unavailable, {stats.get('error', 0)} failed; "
+            f"{self.workers} workers)"
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "OEmbedResolver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
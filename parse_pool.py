@@ -0,0 +1,147 @@
+"""
+Worker processes for the HTML parsing that follows each fetch.
+
+The clients fetch a page and parse it on the same thread, so however many
+fetch threads run, parsing happens one page at a time under the GIL and
+caps a fast run at one core. `ParsePool` moves the parsing into a
+`ProcessPoolExecutor`:
+
+- fetch threads only fetch; they hand the page to the pool and get back a
+  small record (search candidates, album fields, credit dicts), never a tree;
+- at most `max_pending` pages are queued in or running on the pool. A fetch
+  thread that would go over blocks until a parse finishes (counted as
+  `blocked`), so fetching cannot outrun parsing and pile up page bodies;
+- `workers=0` parses on the calling thread, as before. On a one-core host
+  the pool can only add overhead, so the CLIs pass `--parse-workers`
+  through `usable_workers()`, which turns it into 0 there.
+
+The worker processes are all started when the pool is created, so callers
+create it before starting their fetch threads and no worker forks mid-fetch.
+
+`PooledExtractor` has the methods of an html_extract backend and runs them
+in the pool, so the clients take it in place of `get_extractor()`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, Iterator, Optional
+
+from html_extract import DEFAULT_BACKEND, get_extractor
+
+
+DEFAULT_PENDING_PER_WORKER = 2
+
+
+def _ready() -> bool:
+    return True
+
+
+def usable_workers(requested: int) -> int:
+    """`requested` parse workers, or 0 when there is only one core to run them on."""
+    if requested > 0 and (os.cpu_count() or 1) <= 1:
+        print(f"Parse pool: 1 CPU core, parsing on the fetching threads instead of {requested} processes")
+        return 0
+    return max(0, requested)
+
+
+class ParsePool:
+    def __init__(self, workers: int = 0, max_pending: int = 0):
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending or self.workers * DEFAULT_PENDING_PER_WORKER)
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        if self.workers:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+            # start every worker now (see the module docstring)
+            self._executor.submit(_ready).result()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Parse `fn(*args)` in a worker; blocks while `max_pending` parses are outstanding."""
+        with self._lock:
+            self.stats["submitted"] += 1
+        if self._executor is None:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["blocked"] += 1
+            self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args):
+        return self.submit(fn, *args).result()
+
+    def map(self, fn: Callable, items: Iterable) -> Iterator:
+        """`fn(item)` per item, in order, with at most `max_pending` in flight."""
+        pending: Deque[Future] = deque()
+        for item in items:
+            pending.append(self.submit(fn, item))
+            while pending and (pending[0].done() or len(pending) > self.max_pending):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def report(self) -> str:
+        if not self.workers:
+            return f"Parsing: {self.stats['submitted']} pages on the fetching threads"
+        return (
+            f"Parse pool: {self.stats['submitted']} pages on {self.workers} processes, "
+            f"fetching blocked {self.stats['blocked']} times on a full queue (max {self.max_pending} pending)"
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# One extractor per backend in each worker process.
+_extractors: Dict[str, object] = {}
+
+
+def _extract(backend: str, method: str, html: str):
+    extractor = _extractors.get(backend)
+    if extractor is None:
+        extractor = _extractors[backend] = get_extractor(backend)
+    return getattr(extractor, method)(html)
+
+
+class PooledExtractor:
+    """An html_extract backend whose methods run in a `ParsePool`."""
+
+    def __init__(self, backend: str, pool: ParsePool):
+        self.backend = (backend or DEFAULT_BACKEND).strip().lower()
+        get_extractor(self.backend)  # unknown names fail here, not in a worker
+        self.pool = pool
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def pooled(html: str):
+            return self.pool.run(_extract, self.backend, method, html)
+
+        return pooled
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Run the data scripts as one dependency-aware pipeline.
+
+Stages, the files they read and the files they write:
+
+  crawl     crawler.py                     -> yanghajung_songs.json (only with --years)
+  melon     enrich_melon_metadata.py       Portfolio_list.csv -> Portfolio_list_with_melon.csv
+  priority  update_priority_from_melon.py  Portfolio_list_with_melon.csv -> Portfolio_list_with_priority.csv
+  media     enrich_media.py                Portfolio_list.csv, Portfolio_list_with_melon.csv
+                                           -> portfolio_media_map.json, manifest and shards
+  views     build_views.py                 Portfolio_list_with_priority.csv -> portfolio_views.json
+
+A stage depends on the stages whose outputs it reads and starts as soon as
+they are done, so priority and media run side by side after melon (`--jobs`).
+A failed stage skips its dependents; independent stages still run.
+
+Before a stage starts, two hashes are taken over its settings and inputs:
+
+- the input hash covers the input files in full;
+- the lookup hash cuts every input CSV down to the columns the stage's
+  network lookups read (the stage's own output columns included), row by row.
+
+With the input hash of its last successful run (and its outputs in place)
+a stage is skipped. With only the lookup hash unchanged, something like a
+note was edited: the stage is refreshed offline instead of run (the CSV
+stages copy their columns over from the previous output row by row, media
+re-applies Work/note to the existing map), so no scraping happens.
+Otherwise it runs, with the Melon lookups incremental.
+
+Hashes and timings of the last successful run per stage are kept in
+pipeline_state.json. build_images.py is not part of the pipeline.
+
+Portfolio_list.csv is the hand-edited source and is never written here:
+a stage that wrote it back would change the melon stage's input on every
+run. Instead the priority output is what gets deployed. The deploy
+script and the CI workflow upload Portfolio_list_with_priority.csv under
+the name Portfolio_list.csv when it exists, and build_views.py builds
+from the same file by default (build_views.served_csv_path()), so the
+served CSV and portfolio_views.json always come from one file. Without a
+pipeline run both fall back to Portfolio_list.csv.
+
+crawl has no input files, so once it has run it is only repeated with
+`--force crawl` (e.g. nightly); year pages that have not changed since the
+last crawl then cost a conditional request each and are not parsed again
+(tonestudio_page_state.json).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import build_views
+import crawler
+import enrich_media
+from checkpoint import atomic_write
+from enrich_melon_metadata import ADDED_FIELDS, enrich_csv
+from http_cache import ResponseCache, open_cache
+from net_stats import write_run_stats
+from row_stream import iter_csv_rows, read_fieldnames
+from update_priority_from_melon import METRIC_FIELDS, update_priorities
+
+
+ROOT = Path(__file__).resolve().parent
+PRIORITY_CSV_PATH = build_views.PRIORITY_CSV_PATH
+SONGS_PATH = ROOT / "yanghajung_songs.json"
+STATE_PATH = ROOT / "pipeline_state.json"
+PAGE_STATE_PATH = ROOT / crawler.DEFAULT_STATE_PATH
+STATE_VERSION = 1
+DEFAULT_JOBS = 2
+
+PRIORITY_COLUMNS = ["priority", *METRIC_FIELDS, "MelonAlbumId", "MelonAlbumURL"]
+MEDIA_CSV_COLUMNS = ["Artist", "Album", "Title", "YoutubeURL", "YouTubeURL", "youtube_url"]
+MEDIA_MELON_COLUMNS = ["Artist", "Album", "CoverImageURL", "YoutubeURL"]
+
+
+@dataclass
+class StageInput:
+    path: Path
+    # CSV columns the stage's lookups read; None when the whole file matters
+    lookup_columns: Optional[Sequence[str]] = None
+
+
+@dataclass
+class Stage:
+    name: str
+    inputs: List[StageInput]
+    outputs: List[Path]
+    run: Callable[[], None]
+    # offline rebuild for when only non-lookup columns changed; False means "run instead"
+    refresh: Optional[Callable[[], bool]] = None
+    settings: Dict[str, object] = field(default_factory=dict)
+
+
+@dataclass
+class Outcome:
+    action: str  # run, refresh, skip, failed, blocked
+    reason: str
+    seconds: float = 0.0
+
+
+def file_digest(path: Path) -> str:
+    if not path.exists():
+        return "missing"
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def csv_columns_digest(path: Path, columns: Sequence[str]) -> str:
+    """Hash of `columns` of every row, in row order; other columns do not count."""
+    if not path.exists():
+        return "missing"
+    h = hashlib.sha1()
+    for row in iter_csv_rows(path):
+        h.update("\x1f".join(row.get(col) or "" for col in columns).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def stage_hashes(stage: Stage) -> Tuple[str, str]:
+    """(input hash, lookup hash) of `stage` as its inputs are now."""
+    settings = json.dumps({"stage": stage.name, **stage.settings}, sort_keys=True).encode("utf-8")
+    full, lookup = hashlib.sha1(settings), hashlib.sha1(settings)
+    for item in stage.inputs:
+        digest = file_digest(item.path)
+        full.update(f"{item.path.name}={digest}\n".encode("utf-8"))
+        if item.lookup_columns is not None:
+            digest = csv_columns_digest(item.path, item.lookup_columns)
+        lookup.update(f"{item.path.name}={digest}\n".encode("utf-8"))
+    return full.hexdigest(), lookup.hexdigest()
+
+
+def carry_over_columns(input_path: Path, output_path: Path, columns: Sequence[str], key_columns: Sequence[str]) -> bool:
+    """
+    Rewrite `output_path` as `input_path` plus `columns` taken from the
+    current `output_path`, row by row. The two must line up (same number of
+    rows, same `key_columns` in each); False, with nothing written, otherwise.
+    """
+    if not output_path.exists():
+        return False
+    rows = list(iter_csv_rows(input_path))
+    previous = list(iter_csv_rows(output_path))
+    if len(rows) != len(previous):
+        return False
+    for row, old in zip(rows, previous):
+        if any((row.get(col) or "") != (old.get(col) or "") for col in key_columns):
+            return False
+        row.update({col: old.get(col) or "" for col in columns})
+    fieldnames = read_fieldnames(input_path)
+    fieldnames += [col for col in columns if col not in fieldnames]
+    with atomic_write(output_path, encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Saved: {output_path} (columns carried over, no lookups)")
+    return True
+
+
+def build_stages(
+    cache: Optional[ResponseCache],
+    years: Sequence[int] = (),
+    base_url: str = crawler.DEFAULT_BASE_URL,
+    crawl_workers: int = 4,
+    engineers: Optional[Dict[str, List[str]]] = None,
+    melon_concurrency: int = 1,
+    fill_empty_genre: bool = False,
+    melon_sleep: float = 0.45,
+    priority_sleep: float = 0.25,
+) -> List[Stage]:
+    source_csv, melon_csv = enrich_media.CSV_PATH, enrich_media.MELON_CSV_PATH
+    melon_keys = ["Artist", "Album", "Title"]
+    priority_keys = ["Artist", "Album"]
+
+    def run_crawl() -> None:
+        matcher = crawler.EngineerMatcher(engineers or None)
+        state = crawler.PageState(str(PAGE_STATE_PATH))
+        crawler.save_to_json(crawler.crawl_years(base_url, years, crawl_workers, matcher, state), str(SONGS_PATH))
+        print(state.report())
+
+    def run_melon() -> None:
+        enrich_csv(
+            source_csv,
+            melon_csv,
+            fill_empty_genre=fill_empty_genre,
+            sleep_seconds=melon_sleep,
+            limit_albums=0,
+            concurrency=melon_concurrency,
+            cache=cache,
+            incremental=True,
+        )
+
+    def run_views() -> None:
+        payload = build_views.build_views(PRIORITY_CSV_PATH)
+        build_views.write_precompressed(build_views.VIEWS_PATH, build_views.minified_json(payload))
+        print(f"Saved: {build_views.VIEWS_PATH}")
+
+    stages = [
+        Stage(
+            "melon",
+            inputs=[StageInput(source_csv, melon_keys + ADDED_FIELDS)],
+            outputs=[melon_csv],
+            run=run_melon,
+            refresh=lambda: carry_over_columns(source_csv, melon_csv, ADDED_FIELDS, melon_keys),
+            settings={"fill_empty_genre": fill_empty_genre},
+        ),
+        Stage(
+            "priority",
+            inputs=[StageInput(melon_csv, priority_keys + PRIORITY_COLUMNS)],
+            outputs=[PRIORITY_CSV_PATH],
+            run=lambda: update_priorities(melon_csv, PRIORITY_CSV_PATH, sleep_seconds=priority_sleep, cache=cache),
+            refresh=lambda: carry_over_columns(melon_csv, PRIORITY_CSV_PATH, PRIORITY_COLUMNS, priority_keys),
+        ),
+        Stage(
+            "media",
+            inputs=[StageInput(source_csv, MEDIA_CSV_COLUMNS), StageInput(melon_csv, MEDIA_MELON_COLUMNS)],
+            outputs=[enrich_media.OUTPUT_PATH, enrich_media.MANIFEST_PATH],
+            run=lambda: enrich_media.enrich(cache, oembed_state=enrich_media.OEMBED_STATE_PATH),
+            refresh=enrich_media.refresh_media_map,
+        ),
+        Stage(
+            "views",
+            inputs=[StageInput(PRIORITY_CSV_PATH)],
+            outputs=[build_views.VIEWS_PATH],
+            run=run_views,
+        ),
+    ]
+    if years:
+        stages.insert(0, Stage("crawl", inputs=[], outputs=[SONGS_PATH], run=run_crawl, settings={"years": list(years), "base_url": base_url, "engineers": engineers or crawler.DEFAULT_ENGINEERS}))
+    return stages
+
+
+def dependencies(stages: List[Stage]) -> Dict[str, List[str]]:
+    """Stage name -> names of the stages that write one of its inputs."""
+    writers = {path: stage.name for stage in stages for path in stage.outputs}
+    deps = {}
+    for stage in stages:
+        deps[stage.name] = sorted({writers[item.path] for item in stage.inputs if item.path in writers} - {stage.name})
+    return deps
+
+
+def load_state(path: Path) -> Dict[str, Dict[str, object]]:
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+    if payload.get("version") != STATE_VERSION:
+        return {}
+    return payload.get("stages") or {}
+
+
+def save_state(path: Path, stages: Dict[str, Dict[str, object]]) -> None:
+    with atomic_write(path) as f:
+        json.dump({"version": STATE_VERSION, "stages": stages}, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def decide(stage: Stage, record: Optional[Dict[str, object]], hashes: Tuple[str, str], forced: bool) -> Tuple[str, str]:
+    """(action, reason) for `stage`: run, refresh or skip."""
+    if forced:
+        return "run", "forced"
+    if record is None:
+        return "run", "no previous run"
+    missing = [path.name for path in stage.outputs if not path.exists()]
+    if missing:
+        return "run", f"missing {', '.join(missing)}"
+    if record.get("input_hash") == hashes[0]:
+        return "skip", "inputs unchanged"
+    if record.get("lookup_hash") == hashes[1]:
+        if stage.refresh is None:
+            return "skip", "lookup columns unchanged"
+        return "refresh", "only non-lookup columns changed"
+    return "run", "inputs changed"
+
+
+def execute(stage: Stage, record: Optional[Dict[str, object]], forced: bool) -> Tuple[Outcome, Dict[str, object]]:
+    t0 = time.perf_counter()
+    hashes = stage_hashes(stage)
+    action, reason = decide(stage, record, hashes, forced)
+    print(f"[pipeline] {stage.name}: {action} ({reason})")
+    if action == "refresh" and not stage.refresh():
+        action, reason = "run", "previous output does not line up"
+        print(f"[pipeline] {stage.name}: {action} ({reason})")
+    if action == "run":
+        stage.run()
+    seconds = time.perf_counter() - t0
+    new_record = {
+        "input_hash": hashes[0],
+        "lookup_hash": hashes[1],
+        "action": action,
+        "seconds": round(seconds, 3),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return Outcome(action, reason, seconds), new_record
+
+
+def run_pipeline(stages: List[Stage], state_path: Path = STATE_PATH, jobs: int = DEFAULT_JOBS, force: Sequence[str] = ()) -> Dict[str, Outcome]:
+    state = load_state(state_path)
+    deps = dependencies(stages)
+    outcomes: Dict[str, Outcome] = {}
+    running: Dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="stage") as pool:
+        while True:
+            for stage in stages:
+                if stage.name in outcomes or stage.name in running.values():
+                    continue
+                upstream = [outcomes.get(name) for name in deps[stage.name]]
+                if any(o is not None and o.action in ("failed", "blocked") for o in upstream):
+                    failed = [name for name in deps[stage.name] if outcomes[name].action in ("failed", "blocked")]
+                    outcomes[stage.name] = Outcome("blocked", f"{', '.join(failed)} did not finish")
+                    print(f"[pipeline] {stage.name}: blocked ({outcomes[stage.name].reason})")
+                elif all(o is not None for o in upstream):
+                    forced = "all" in force or stage.name in force
+                    running[pool.submit(execute, stage, state.get(stage.name), forced)] = stage.name
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    outcome, record = future.result()
+                except Exception:
+                    traceback.print_exc()
+                    outcomes[name] = Outcome("failed", "raised", 0.0)
+                    print(f"[pipeline] {name}: failed")
+                    continue
+                outcomes[name] = outcome
+                state[name] = record
+                save_state(state_path, state)
+    return {stage.name: outcomes[stage.name] for stage in stages}
+
+
+def plan_pipeline(stages: List[Stage], state_path: Path = STATE_PATH, force: Sequence[str] = ()) -> Dict[str, Tuple[str, str]]:
+    """What run_pipeline would do with the files as they are now (--dry-run)."""
+    state = load_state(state_path)
+    deps = dependencies(stages)
+    plan: Dict[str, Tuple[str, str]] = {}
+    for stage in stages:
+        changing = [name for name in deps[stage.name] if plan[name][0] != "skip"]
+        if changing:
+            plan[stage.name] = ("after " + ", ".join(changing), "decided once they finish")
+            continue
+        forced = "all" in force or stage.name in force
+        plan[stage.name] = decide(stage, state.get(stage.name), stage_hashes(stage), forced)
+    return plan
+
+
+def parse_stage_names(text: str, stages: List[Stage]) -> List[str]:
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    known = {stage.name for stage in stages} | {"all"}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"unknown stage(s): {', '.join(unknown)} (known: {', '.join(sorted(known))})")
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run crawl/melon/priority/media/views as a DAG, skipping up-to-date stages")
+    parser.add_argument("--years", default="", help="Also crawl tonestudio for these years (e.g. 2010-2025)")
+    parser.add_argument("--crawl-workers", type=int, default=4, help="Concurrent crawler requests")
+    parser.add_argument("--engineer", action="append", default=[], metavar="NAME[=ALIAS,...]", help="Engineer the crawl looks for (repeatable; default: 양하정)")
+    parser.add_argument("--melon-concurrency", type=int, default=1, help="Albums looked up in parallel by the melon stage")
+    parser.add_argument("--fill-genre-empty", action="store_true", help="Fill empty Genre with GenreMelon")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Stages run in parallel when their inputs allow")
+    parser.add_argument("--force", default="", help="Comma-separated stages to run regardless of their inputs ('all' for every stage)")
+    parser.add_argument("--dry-run", action="store_true", help="Print what would run, run nothing")
+    parser.add_argument("--state-path", default=str(STATE_PATH), help="Per-stage hashes of the last successful run")
+    parser.add_argument("--cache-path", default="", help="HTTP response cache database (default: .http_cache.sqlite)")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from the network")
+    parser.add_argument("--stats-path", default="", help="Network stats JSON (.prom written alongside; default: next to the state file)")
+    args = parser.parse_args()
+
+    years = crawler.parse_years(args.years) if args.years else []
+    try:
+        engineers = crawler.parse_engineers(args.engineer)
+    except ValueError as e:
+        parser.error(str(e))
+    cache = open_cache(args.cache_path, disabled=args.no_cache)
+    stages = build_stages(
+        cache,
+        years=years,
+        crawl_workers=args.crawl_workers,
+        engineers=engineers,
+        melon_concurrency=args.melon_concurrency,
+        fill_empty_genre=args.fill_genre_empty,
+    )
+    try:
+        force = parse_stage_names(args.force, stages)
+    except ValueError as e:
+        parser.error(str(e))
+    state_path = Path(args.state_path)
+
+    if args.dry_run:
+        for name, (action, reason) in plan_pipeline(stages, state_path, force).items():
+            print(f"{name:<10}{action:<20}{reason}")
+        return
+
+    try:
+        outcomes = run_pipeline(stages, state_path, jobs=args.jobs, force=force)
+    finally:
+        write_run_stats("pipeline", state_path, args.stats_path)
+    print(f"\n{'stage':<10}{'action':<9}{'seconds':>9}  reason")
+    for name, outcome in outcomes.items():
+        print(f"{name:<10}{outcome.action:<9}{outcome.seconds:>9.1f}  {outcome.reason}")
+    if any(outcome.action in ("failed", "blocked") for outcome in outcomes.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
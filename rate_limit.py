@@ -0,0 +1,268 @@
+"""
+Adaptive request pacing and retries for the scraper clients.
+
+The clients used to sleep a fixed `sleep_seconds` before every request and
+give up on the first 429/5xx. Instead:
+
+- `AdaptivePacer` paces one host. It spaces request starts `interval` apart
+  and caps in-flight requests, like the HostThrottle it replaces, but the
+  interval moves (AIMD on the request rate): every healthy response adds
+  `increase` requests/s, up to 1/`min_interval`; a 429/5xx or a connection
+  error multiplies the rate by `decrease`, once per congestion event (the
+  other in-flight requests failing too don't slow it further). A
+  Retry-After holds every request to the host until it has passed.
+- `RetryPolicy` retries 429/5xx and connection errors with full-jitter
+  exponential backoff (or the Retry-After, when longer), at most
+  `max_retries` times per request. Retries also draw from a budget refilled by
+  each new request, so a provider that is down is not hit with every
+  request several times over.
+- `send_paced()` runs one request through both and records retries and
+  backoff in `net_stats`; `http_cache.fetch()` and the image downloader use it.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Optional
+
+import requests
+
+from net_stats import STATS, host_of
+
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Unless told otherwise a pacer may speed up to 4x its starting rate.
+MIN_INTERVAL_RATIO = 0.25
+MAX_INTERVAL = 10.0
+# A Retry-After longer than this pauses the host only this long.
+MAX_HOLD = 60.0
+# Floor for the first backoff of an unpaced (interval 0) host.
+MIN_BACKOFF_INTERVAL = 0.05
+DEFAULT_INCREASE = 0.25
+DEFAULT_DECREASE = 0.5
+DEFAULT_MAX_RETRIES = 3
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def is_congestion(status: Optional[int]) -> bool:
+    return status is None or status in RETRYABLE_STATUSES
+
+
+class AdaptivePacer:
+    """Politeness budget for one host, shared by every worker thread."""
+
+    def __init__(
+        self,
+        interval: float,
+        min_interval: Optional[float] = None,
+        max_interval: float = MAX_INTERVAL,
+        max_in_flight: int = 1,
+        increase: float = DEFAULT_INCREASE,
+        decrease: float = DEFAULT_DECREASE,
+    ):
+        self.initial_interval = max(0.0, interval)
+        self.min_interval = self.initial_interval * MIN_INTERVAL_RATIO if min_interval is None else max(0.0, min(min_interval, self.initial_interval))
+        self.max_interval = max(max_interval, self.initial_interval)
+        self.increase = increase
+        self.decrease = decrease
+        self._interval = self.initial_interval
+        self._slots = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self._hold_until = 0.0
+        self._last_backoff = 0.0
+        self.stats: Counter = Counter()
+
+    @property
+    def interval(self) -> float:
+        with self._lock:
+            return self._interval
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self._slots.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start, self._hold_until)
+                self._next_start = start + self._interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            self._slots.release()
+
+    def record(self, status: Optional[int], retry_after: Optional[float] = None, sent_at: Optional[float] = None) -> None:
+        """
+        Feed back one outcome; `status` is None when no response arrived.
+        `sent_at` (time.monotonic() when the request was issued) lets a
+        failure of a request sent before the last backoff be ignored.
+        """
+        with self._lock:
+            if is_congestion(status):
+                if sent_at is None or sent_at >= self._last_backoff:
+                    self.stats["backoff"] += 1
+                    self._last_backoff = time.monotonic()
+                    slowed = self._interval / self.decrease if self._interval > 0 else MIN_BACKOFF_INTERVAL
+                    self._interval = min(self.max_interval, max(slowed, MIN_BACKOFF_INTERVAL))
+                if retry_after:
+                    self.stats["held"] += 1
+                    self._hold_until = max(self._hold_until, time.monotonic() + min(retry_after, MAX_HOLD))
+            elif self._interval > self.min_interval:
+                self.stats["speedup"] += 1
+                rate = 1.0 / self._interval + self.increase
+                self._interval = max(self.min_interval, 1.0 / rate)
+
+    def report(self) -> str:
+        with self._lock:
+            interval, stats = self._interval, dict(self.stats)
+        return (
+            f"interval {interval:.3f}s (start {self.initial_interval:.3f}s, floor {self.min_interval:.3f}s), "
+            f"{stats.get('backoff', 0)} backoffs, {stats.get('held', 0)} Retry-After holds"
+        )
+
+
+class HostPacers:
+    """One `AdaptivePacer` per host, created on first use with the same settings."""
+
+    def __init__(self, interval: float = 0.0, max_in_flight: int = 4, **pacer_options):
+        self.interval = interval
+        self.max_in_flight = max_in_flight
+        self._options = pacer_options
+        self._pacers: Dict[str, AdaptivePacer] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> AdaptivePacer:
+        host = host_of(url)
+        with self._lock:
+            pacer = self._pacers.get(host)
+            if pacer is None:
+                pacer = self._pacers[host] = AdaptivePacer(self.interval, max_in_flight=self.max_in_flight, **self._options)
+            return pacer
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff with a run-wide retry budget.
+
+    The budget starts at `budget` tokens; every request adds `budget_ratio`
+    (capped at `max_budget`) and every retry spends one. A Retry-After longer
+    than `max_delay` is not waited out; the response is returned as is.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        budget: float = 10.0,
+        budget_ratio: float = 0.2,
+        max_budget: float = 100.0,
+        seed: Optional[int] = None,
+    ):
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.max_budget = max_budget
+        self._tokens = float(budget)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_budget, self._tokens + self.budget_ratio)
+
+    def allow(self, attempt: int, retry_after: Optional[float] = None) -> bool:
+        """Whether retry number `attempt + 1` may go ahead; spends a budget token if so."""
+        with self._lock:
+            if attempt >= self.max_retries or (retry_after is not None and retry_after > self.max_delay):
+                self.stats["gave_up"] += 1
+                return False
+            if self._tokens < 1:
+                self.stats["budget_exhausted"] += 1
+                return False
+            self._tokens -= 1
+            self.stats["retried"] += 1
+            return True
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        with self._lock:
+            backoff = self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        return max(backoff, retry_after or 0.0)
+
+    def report(self) -> str:
+        with self._lock:
+            stats = dict(self.stats)
+        return f"{stats.get('retried', 0)} retries, {stats.get('gave_up', 0)} gave up, {stats.get('budget_exhausted', 0)} over budget"
+
+
+def send_paced(
+    url: str,
+    endpoint: str,
+    send: Callable[[], requests.Response],
+    pacer: Optional[AdaptivePacer] = None,
+    retry: Optional[RetryPolicy] = None,
+) -> requests.Response:
+    """
+    `send()` through `pacer`, retried per `retry`. Returns the last response,
+    which may still be a 429/5xx once retries run out; a connection error on
+    the last attempt is raised.
+    """
+    host = host_of(url)
+    pace = pacer.slot if pacer is not None else None
+    if retry is not None:
+        retry.deposit()
+    attempt = 0
+    sent: Dict[str, float] = {}
+
+    def timed_send() -> requests.Response:
+        # taken inside the pacer slot, after any wait for it: a request that
+        # queued across a backoff was still sent after it
+        sent["at"] = time.monotonic()
+        return send()
+
+    while True:
+        sent.clear()
+        try:
+            resp = STATS.observe(url, endpoint, timed_send, pace=pace)
+        except (requests.ConnectionError, requests.Timeout):
+            if pacer is not None:
+                pacer.record(None, sent_at=sent.get("at"))
+            if retry is None or not retry.allow(attempt):
+                raise
+            retry_after = None
+        else:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if pacer is not None:
+                pacer.record(resp.status_code, retry_after, sent_at=sent.get("at"))
+            if retry is None or resp.status_code not in RETRYABLE_STATUSES or not retry.allow(attempt, retry_after):
+                return resp
+        wait = retry.delay(attempt, retry_after)
+        STATS.retry(host, endpoint)
+        STATS.sleep(host, endpoint, wait)
+        time.sleep(wait)
+        attempt += 1
@@ -0,0 +1,94 @@
+"""
+Bounded-memory CSV passes for the enrichment scripts (`--stream`).
+
+The default mode reads the whole catalog into a list and rewrites it at the
+end, which keeps every row in memory for the length of the run. In stream
+mode the scripts instead
+
+1. scan the input once, keeping only per-album state (keys, a sample row),
+2. resolve albums as usual,
+3. read the input a second time and write each row as soon as its album's
+   result exists, through `OrderedRowWriter`.
+
+Only album-level state and one pending row are ever held, so peak memory
+follows the number of distinct albums, not rows.
+"""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from album_match import normalize
+
+
+AlbumKey = Tuple[str, str]
+
+
+def row_album_key(row: Dict[str, str]) -> AlbumKey:
+    return normalize(row.get("Artist", "")), normalize(row.get("Album", ""))
+
+
+def read_fieldnames(path: Path) -> List[str]:
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f).fieldnames or [])
+
+
+def iter_csv_rows(path: Path) -> Iterator[Dict[str, str]]:
+    """Rows of `path`, read lazily; the file stays open only while iterating."""
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+class OrderedRowWriter:
+    """
+    Re-read `input_path` and write its rows to `out` in input order, each one
+    as soon as `is_ready(album_key)` holds. `fill_row` applies the album's
+    result to the row before it is written.
+
+    Call `advance()` whenever an album completes; it writes every row up to
+    the first one still waiting. With concurrent lookups albums finish out of
+    order, so a row may wait for an earlier album; `finish()` writes the rest
+    once everything is resolved.
+    """
+
+    def __init__(
+        self,
+        input_path: Path,
+        out: IO[str],
+        fieldnames: List[str],
+        is_ready: Callable[[AlbumKey], bool],
+        fill_row: Callable[[Dict[str, str], AlbumKey], None],
+    ):
+        self._rows = iter_csv_rows(input_path)
+        self._writer = csv.DictWriter(out, fieldnames=fieldnames)
+        self._writer.writeheader()
+        self._is_ready = is_ready
+        self._fill_row = fill_row
+        self._waiting: Optional[Tuple[Dict[str, str], AlbumKey]] = None
+        self.written = 0
+
+    def advance(self) -> int:
+        written = 0
+        while True:
+            if self._waiting is None:
+                row = next(self._rows, None)
+                if row is None:
+                    break
+                self._waiting = (row, row_album_key(row))
+            row, key = self._waiting
+            if not self._is_ready(key):
+                break
+            self._fill_row(row, key)
+            self._writer.writerow(row)
+            self._waiting = None
+            written += 1
+        self.written += written
+        return written
+
+    def finish(self) -> int:
+        self.advance()
+        if self._waiting is not None:
+            raise RuntimeError(f"row for album {self._waiting[1]} was never resolved")
+        return self.written
@@ -105,11 +105,51 @@ function loadImageDirectly(img, imageUrl, onError) {
     img.src = imageUrl;
 }
 
+// build_images.py가 만든 리사이즈본: 블러 placeholder를 먼저 깔고 srcset(+AVIF)으로 교체
+function loadImageAsset(img, asset, onError) {
+    const container = img.parentElement;
+    if (container && asset.placeholder) {
+        container.style.backgroundImage = `url("${asset.placeholder}")`;
+        container.style.backgroundSize = 'cover';
+        container.style.backgroundPosition = 'center';
+    }
+    if (asset.avif && container && container.tagName !== 'PICTURE') {
+        const picture = document.createElement('picture');
+        const source = document.createElement('source');
+        source.type = 'image/avif';
+        source.srcset = asset.avif;
+        source.sizes = IMAGE_ASSET_SIZES;
+        container.insertBefore(picture, img);
+        picture.appendChild(source);
+        picture.appendChild(img);
+    }
+    img.width = asset.width;
+    img.height = asset.height;
+    img.sizes = IMAGE_ASSET_SIZES;
+    img.srcset = asset.srcset;
+    loadImageDirectly(img, asset.src, () => {
+        img.removeAttribute('srcset');
+        const picture = img.parentElement;
+        if (picture && picture.tagName === 'PICTURE') {
+            picture.replaceWith(img);
+        }
+        onError();
+    });
+}
+
 function loadThumbnailForSong(img, song) {
-    const directCandidates = Array.from(new Set([
-        song.thumbnailUrl,
-        song.fallbackThumbnailUrl,
-    ].filter(Boolean)));
+    // 커버나 리사이즈본이 아직 로드되지 않은 미디어 샤드에 있을 수 있으면 샤드를 먼저 받음
+    if (song.artist && isArtistMediaPending(song.artist)) {
+        loadArtistMedia(song.artist).then(() => {
+            loadThumbnailForSong(img, findLoadedSong(song) || { ...song, artist: '' });
+        });
+        return;
+    }
+
+    const directCandidates = [
+        mediaImages[song.thumbnailUrl] || song.thumbnailUrl,
+        (song.youtubeId && mediaImages[`youtube:${song.youtubeId}`]) || song.fallbackThumbnailUrl,
+    ].filter((candidate, index, list) => candidate && list.indexOf(candidate) === index);
 
     if (directCandidates.length) {
         let index = 0;
@@ -118,8 +158,12 @@ function loadThumbnailForSong(img, song) {
                 loadThumbnailWithFallback(img, song.youtubeId);
                 return;
             }
-            const imageUrl = directCandidates[index++];
-            loadImageDirectly(img, imageUrl, tryNextImage);
+            const candidate = directCandidates[index++];
+            if (typeof candidate === 'object') {
+                loadImageAsset(img, candidate, tryNextImage);
+            } else {
+                loadImageDirectly(img, candidate, tryNextImage);
+            }
         };
         tryNextImage();
         return;
@@ -219,7 +263,20 @@ const fallbackArtistsData = {
 
 let artistsData = JSON.parse(JSON.stringify(fallbackArtistsData));
 let mediaMatchMap = {};
-const ASSET_VERSION = '20260424a';
+// 원본 이미지 URL(또는 youtube:<id>) -> 리사이즈본 정보
+let mediaImages = {};
+const IMAGE_ASSET_SIZES = '(max-width: 768px) 50vw, 400px';
+// 매니페스트(아티스트 -> 샤드 경로)만 먼저 받고, 샤드는 필요할 때 로드
+let mediaManifest = null;
+const mediaShardLoads = {};
+const MEDIA_MANIFEST_PATH = 'portfolio_media_manifest.json';
+// 빌드 단계(build_views.py)에서 미리 계산한 장르/연도/작업유형 묶음
+const PORTFOLIO_VIEWS_PATH = 'portfolio_views.json';
+const PORTFOLIO_VIEWS_VERSION = 3;
+const VIEW_MODES = ['genre', 'year', 'category'];
+let portfolioViews = null;
+let songsById = {};
+const ASSET_VERSION = '20261018c';
 
 function withVersionParam(path) {
     return `${path}?v=${ASSET_VERSION}`;
@@ -474,6 +531,23 @@ function toCanonicalYoutubeUrl(value) {
 }
 
 async function loadMediaMatchMap() {
+    try {
+        const response = await fetch(withVersionParam(MEDIA_MANIFEST_PATH), { cache: 'no-cache' });
+        if (response.ok) {
+            const manifest = await response.json();
+            if (manifest && manifest.shards) {
+                mediaManifest = manifest;
+                mediaMatchMap = {};
+                return;
+            }
+        }
+    } catch (error) {
+        // 매니페스트가 없으면 전체 맵으로 폴백
+    }
+    await loadFullMediaMatchMap();
+}
+
+async function loadFullMediaMatchMap() {
     try {
         const response = await fetch(withVersionParam('portfolio_media_map.json'), { cache: 'no-store' });
         if (!response.ok) return;
@@ -485,11 +559,76 @@ async function loadMediaMatchMap() {
             built[item.key] = item;
         });
         mediaMatchMap = built;
+        mediaImages = payload.images || {};
     } catch (error) {
         mediaMatchMap = {};
+        mediaImages = {};
     }
 }
 
+function isArtistMediaPending(artistName) {
+    if (!mediaManifest) return false;
+    const artistKey = normalizeMediaKey(artistName);
+    return Boolean(mediaManifest.shards[artistKey]) && !mediaShardLoads[artistKey]?.done;
+}
+
+function loadArtistMedia(artistName) {
+    const artistKey = normalizeMediaKey(artistName);
+    const shardPath = mediaManifest ? mediaManifest.shards[artistKey] : '';
+    if (!shardPath) return Promise.resolve(false);
+
+    if (!mediaShardLoads[artistKey]) {
+        const load = { done: false, promise: null };
+        // 샤드 파일명에 내용 해시가 있으므로 브라우저 기본 캐시를 그대로 사용
+        load.promise = fetch(shardPath)
+            .then(response => (response.ok ? response.json() : null))
+            .then(shard => {
+                const items = (shard && shard.items) || {};
+                Object.assign(mediaMatchMap, items);
+                Object.assign(mediaImages, (shard && shard.images) || {});
+                Object.keys(artistsData).forEach(name => {
+                    if (normalizeMediaKey(name) === artistKey) {
+                        artistsData[name].songs.forEach(applySongMedia);
+                    }
+                });
+                return Object.keys(items).length > 0;
+            })
+            .catch(() => false)
+            .finally(() => {
+                load.done = true;
+            });
+        mediaShardLoads[artistKey] = load;
+    }
+    return mediaShardLoads[artistKey].promise;
+}
+
+function findLoadedSong(song) {
+    const loaded = songsById[song.id];
+    return loaded && loaded.artist === song.artist ? { ...loaded } : null;
+}
+
+// 미디어 맵에 의존하는 곡 필드 (샤드가 늦게 도착하면 다시 적용)
+function applySongMedia(song) {
+    const source = song._mediaSource;
+    if (!source) return;
+    const media = mediaMatchMap[source.mediaKey] || null;
+    const youtubeId = extractYoutubeId(source.youtubeUrl) || media?.youtube_id || '';
+    const mappedYoutubeUrl = toCanonicalYoutubeUrl(media?.youtube_url || '');
+    const descriptionParts = [...source.descriptionParts];
+    if (source.youtubeUrl || mappedYoutubeUrl) {
+        descriptionParts.push(`영상: ${source.youtubeUrl || mappedYoutubeUrl}`);
+    }
+
+    if (source.youtubeTitleFallback !== null) {
+        song.title = media?.youtube_title || source.youtubeTitleFallback;
+    }
+    song.description = descriptionParts.join(' | ') || '포트폴리오 작업물';
+    song.youtubeId = youtubeId;
+    song.youtubeUrl = source.youtubeUrl || mappedYoutubeUrl || (youtubeId ? `https://www.youtube.com/watch?v=${youtubeId}` : '');
+    song.thumbnailUrl = source.coverImageUrl || media?.cover_url || '';
+    song.fallbackThumbnailUrl = media?.youtube_thumbnail || (youtubeId ? `https://img.youtube.com/vi/${youtubeId}/hqdefault.jpg` : '');
+}
+
 function mapWorkPartToCategory(workPart) {
     const part = String(workPart || '').trim().toLowerCase();
     if (!part) return null;
@@ -604,95 +743,102 @@ function buildArtistsDataFromCsv(csvText) {
     
     const built = {};
     let songId = 1;
+    const cell = (row, index) => (index === -1 ? '' : (row[index] || '').trim());
     
     for (let i = 1; i < lines.length; i++) {
         const row = parseCsvLine(lines[i]);
-        const artistName = (row[columnIndex.artist] || '').trim();
-        if (!artistName) continue;
-        
-        const album = (row[columnIndex.album] || '').trim();
-        const titleRaw = (row[columnIndex.title] || '').trim();
-        const youtubeUrlRaw = (row[columnIndex.youtubeUrl] || '').trim();
-        const genreRaw = (row[columnIndex.genre] || '').trim();
-        const yearRaw = columnIndex.year === -1 ? '' : (row[columnIndex.year] || '').trim();
-        const genreMelonRaw = columnIndex.genreMelon === -1 ? '' : (row[columnIndex.genreMelon] || '').trim();
-        const coverImageUrlRaw = columnIndex.coverImageUrl === -1 ? '' : (row[columnIndex.coverImageUrl] || '').trim();
-        const melonReleaseDateRaw = columnIndex.melonReleaseDate === -1 ? '' : (row[columnIndex.melonReleaseDate] || '').trim();
-        const work = (row[columnIndex.work] || '').trim();
-        const priorityRaw = columnIndex.priority === -1 ? '' : (row[columnIndex.priority] || '').trim();
-        const note = (row[columnIndex.note] || '').trim();
-        const priority = parsePriorityValue(priorityRaw);
-        
-        if (!built[artistName]) {
-            built[artistName] = {
-                name: artistName,
-                genre: 'Session Work',
-                description: '포트폴리오 작업',
-                songs: [],
-                _albumSet: new Set(),
-                _categorySet: new Set()
-            };
-        }
-        
-        const workCategories = parseWorkCategories(work);
-        const primaryCategory = workCategories[0];
-        const titleLooksLikeYoutubeUrl = isYoutubeUrl(titleRaw);
-        const youtubeUrl = toCanonicalYoutubeUrl(youtubeUrlRaw || (titleLooksLikeYoutubeUrl ? titleRaw : ''));
-        const isAllTracks = isAllTracksTitle(titleRaw);
-        const mediaKey = makeMediaKey(artistName, album, titleRaw);
-        const media = mediaMatchMap[mediaKey] || null;
-        const youtubeId = extractYoutubeId(youtubeUrl) || media?.youtube_id || '';
-        const title = isAllTracks
-            ? (album || '전곡 작업')
-            : (
-                titleLooksLikeYoutubeUrl
-                    ? (media?.youtube_title || (album ? `${album} 영상` : `작업물 ${songId}`))
-                    : (titleRaw || (album ? `${album} 작업물` : `작업물 ${songId}`))
-            );
-        const year = parseYearValue(yearRaw) || inferYearValue(melonReleaseDateRaw, album, titleRaw, note);
-        const descriptionParts = [];
-        const mappedYoutubeUrl = toCanonicalYoutubeUrl(media?.youtube_url || '');
-        
-        if (album) descriptionParts.push(`앨범/프로젝트: ${album}`);
-        if (isAllTracks) {
-            descriptionParts.push('범위: 전곡 (앨범 전체 작업)');
-            if (titleRaw && titleRaw !== '전곡') {
-                descriptionParts.push(`원본 표기: ${titleRaw}`);
-            }
-        }
-        if (work) descriptionParts.push(`작업: ${work}`);
-        if (note) descriptionParts.push(`비고: ${note}`);
-        if (genreMelonRaw) descriptionParts.push(`멜론 장르: ${genreMelonRaw}`);
-        if (youtubeUrl || mappedYoutubeUrl) {
-            descriptionParts.push(`영상: ${youtubeUrl || mappedYoutubeUrl}`);
-        }
-        
-        const genreLabel = genreRaw || genreMelonRaw || '미분류';
-        const genres = splitGenreLabels(genreLabel);
-
-        built[artistName].songs.push({
-            id: songId++,
-            title,
-            album,
-            // Genre should represent musical genre, not engineering work type.
-            genre: genreLabel,
-            genres,
-            year,
-            category: primaryCategory,
-            categories: workCategories,
-            priority,
-            workDisplay: work || workCategories.join(', '),
-            description: descriptionParts.join(' | ') || '포트폴리오 작업물',
-            youtubeId,
-            youtubeUrl: youtubeUrl || mappedYoutubeUrl || (youtubeId ? `https://www.youtube.com/watch?v=${youtubeId}` : ''),
-            thumbnailUrl: coverImageUrlRaw || media?.cover_url || '',
-            fallbackThumbnailUrl: media?.youtube_thumbnail || (youtubeId ? `https://img.youtube.com/vi/${youtubeId}/hqdefault.jpg` : '')
+        const cells = {};
+        Object.keys(columnIndex).forEach(name => {
+            cells[name] = cell(row, columnIndex[name]);
         });
-        
-        if (album) built[artistName]._albumSet.add(album);
-        workCategories.forEach(cat => built[artistName]._categorySet.add(cat));
+        if (!cells.artist) continue;
+        addSongFromCells(built, songId++, cells);
     }
     
+    return finishArtists(built);
+}
+
+// CSV 행 하나(또는 portfolio_views.json의 곡 배열 하나)로 곡을 만들어 아티스트에 추가
+function addSongFromCells(built, songId, cells) {
+    const artistName = cells.artist;
+    const album = cells.album || '';
+    const titleRaw = cells.title || '';
+    const youtubeUrlRaw = cells.youtubeUrl || '';
+    const genreRaw = cells.genre || '';
+    const genreMelonRaw = cells.genreMelon || '';
+    const work = cells.work || '';
+    const note = cells.note || '';
+    const priority = parsePriorityValue(cells.priority);
+    
+    if (!built[artistName]) {
+        built[artistName] = {
+            name: artistName,
+            genre: 'Session Work',
+            description: '포트폴리오 작업',
+            songs: [],
+            _albumSet: new Set(),
+            _categorySet: new Set()
+        };
+    }
+    
+    const workCategories = parseWorkCategories(work);
+    const primaryCategory = workCategories[0];
+    const titleLooksLikeYoutubeUrl = isYoutubeUrl(titleRaw);
+    const youtubeUrl = toCanonicalYoutubeUrl(youtubeUrlRaw || (titleLooksLikeYoutubeUrl ? titleRaw : ''));
+    const isAllTracks = isAllTracksTitle(titleRaw);
+    const mediaKey = makeMediaKey(artistName, album, titleRaw);
+    const youtubeTitleFallback = !isAllTracks && titleLooksLikeYoutubeUrl
+        ? (album ? `${album} 영상` : `작업물 ${songId}`)
+        : null;
+    const title = isAllTracks
+        ? (album || '전곡 작업')
+        : (youtubeTitleFallback !== null ? youtubeTitleFallback : (titleRaw || (album ? `${album} 작업물` : `작업물 ${songId}`)));
+    const year = parseYearValue(cells.year) || inferYearValue(cells.melonReleaseDate, album, titleRaw, note);
+    const descriptionParts = [];
+    
+    if (album) descriptionParts.push(`앨범/프로젝트: ${album}`);
+    if (isAllTracks) {
+        descriptionParts.push('범위: 전곡 (앨범 전체 작업)');
+        if (titleRaw && titleRaw !== '전곡') {
+            descriptionParts.push(`원본 표기: ${titleRaw}`);
+        }
+    }
+    if (work) descriptionParts.push(`작업: ${work}`);
+    if (note) descriptionParts.push(`비고: ${note}`);
+    if (genreMelonRaw) descriptionParts.push(`멜론 장르: ${genreMelonRaw}`);
+    
+    const genreLabel = genreRaw || genreMelonRaw || '미분류';
+    const genres = splitGenreLabels(genreLabel);
+
+    const song = {
+        id: songId,
+        artist: artistName,
+        title,
+        album,
+        // Genre should represent musical genre, not engineering work type.
+        genre: genreLabel,
+        genres,
+        year,
+        category: primaryCategory,
+        categories: workCategories,
+        priority,
+        workDisplay: work || workCategories.join(', '),
+        _mediaSource: {
+            mediaKey,
+            youtubeUrl,
+            coverImageUrl: cells.coverImageUrl || '',
+            youtubeTitleFallback,
+            descriptionParts
+        }
+    };
+    applySongMedia(song);
+    built[artistName].songs.push(song);
+    
+    if (album) built[artistName]._albumSet.add(album);
+    workCategories.forEach(cat => built[artistName]._categorySet.add(cat));
+}
+
+function finishArtists(built) {
     const artistNames = Object.keys(built);
     if (!artistNames.length) return null;
     
@@ -711,9 +857,74 @@ function buildArtistsDataFromCsv(csvText) {
     return built;
 }
 
+async function loadPortfolioData() {
+    const [, views] = await Promise.all([loadMediaMatchMap(), fetchPortfolioViews()]);
+    if (views) {
+        applyPortfolioViews(views);
+        return;
+    }
+
+    // 미리 계산된 뷰가 없으면 CSV를 파싱하고 묶음을 한 번만 계산
+    await loadPortfolioDataFromCsv();
+    indexSongs();
+    portfolioViews = computePortfolioViews();
+}
+
+async function fetchPortfolioViews() {
+    try {
+        const response = await fetch(withVersionParam(PORTFOLIO_VIEWS_PATH), { cache: 'no-cache' });
+        if (!response.ok) return null;
+        const payload = await response.json();
+        const usable = payload
+            && payload.version === PORTFOLIO_VIEWS_VERSION
+            && Array.isArray(payload.songFields)
+            && Array.isArray(payload.artists)
+            && Array.isArray(payload.songs)
+            && payload.songs.length > 0;
+        return usable ? payload : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+// 곡 배열은 CSV 셀 그대로라 CSV와 같은 addSongFromCells로 곡을 만든다 (build_views.py 참고)
+function applyPortfolioViews(payload) {
+    const fields = payload.songFields;
+    const built = {};
+    payload.songs.forEach((values, index) => {
+        const cells = {};
+        fields.forEach((field, i) => {
+            cells[field] = values[i] === undefined ? '' : String(values[i]);
+        });
+        cells.artist = payload.artists[values[0]];
+        addSongFromCells(built, index + 1, cells);
+    });
+    artistsData = finishArtists(built) || {};
+    indexSongs();
+
+    // 묶음은 표시 순서(아티스트별) 위치의 차이값 배열
+    const allSongs = getAllSongs();
+    const buckets = {};
+    const categoryCards = {};
+    VIEW_MODES.forEach(mode => {
+        buckets[mode] = (payload.views[mode] || []).map(([label, deltas]) => {
+            let position = 0;
+            const songs = deltas.map(delta => allSongs[position += delta]).filter(Boolean);
+            if (mode === 'category') {
+                categoryCards[label] = groupSongsByAlbumForCategory(songs);
+            }
+            return {
+                label,
+                artists: uniqueArtistNames(songs),
+                songIds: songs.map(song => song.id)
+            };
+        });
+    });
+    portfolioViews = indexViewBuckets({ buckets, categoryCards, priorityAlbums: computePriorityAlbums() });
+}
+
 async function loadPortfolioDataFromCsv() {
     try {
-        await loadMediaMatchMap();
         const response = await fetch(withVersionParam('Portfolio_list.csv'), { cache: 'no-store' });
         if (!response.ok) return;
         
@@ -733,8 +944,8 @@ function updateHeaderMeta(contextText = '전체 아카이브') {
     
     const allSongs = getAllSongs();
     const artistsCount = Object.keys(artistsData).length;
-    const genresCount = Object.keys(getSongsByGenre()).length;
-    const yearsCount = Object.keys(getSongsByYear()).length;
+    const genresCount = getViewBuckets('genre').length;
+    const yearsCount = getViewBuckets('year').length;
     
     headerMeta.innerHTML = `
         <span class="meta-pill"><strong>${allSongs.length}</strong><span>작업물</span></span>
@@ -762,12 +973,124 @@ function updateOverviewContext(filterMode) {
 // 모든 노래 데이터 수집
 function getAllSongs() {
     const allSongs = [];
+    Object.values(artistsData).forEach(artist => {
+        allSongs.push(...artist.songs);
+    });
+    return allSongs;
+}
+
+// 곡마다 아티스트 이름을 붙이고 id로 찾을 수 있게 색인
+function indexSongs() {
+    songsById = {};
     Object.values(artistsData).forEach(artist => {
         artist.songs.forEach(song => {
-            allSongs.push({ ...song, artist: artist.name });
+            song.artist = artist.name;
+            songsById[song.id] = song;
         });
     });
-    return allSongs;
+}
+
+function getSongsByIds(songIds) {
+    return (songIds || []).map(id => songsById[id]).filter(Boolean);
+}
+
+function uniqueArtistNames(songs) {
+    return Array.from(new Set(songs.map(song => song.artist)));
+}
+
+function sortYearLabels(labels) {
+    return labels.sort((a, b) => {
+        const yearA = Number(a);
+        const yearB = Number(b);
+        const hasYearA = Number.isFinite(yearA);
+        const hasYearB = Number.isFinite(yearB);
+        
+        if (hasYearA && hasYearB) return yearB - yearA;
+        if (hasYearA) return -1;
+        if (hasYearB) return 1;
+        return a.localeCompare(b, 'ko');
+    });
+}
+
+function sortCategoryLabels(labels) {
+    // 카테고리 순서 정의: Digital Editing, Mixing, Broadcasting, Recording
+    const categoryOrder = ['Digital Editing', 'Mixing', 'Broadcasting', 'Recording'];
+    return labels.sort((a, b) => {
+        const indexA = categoryOrder.indexOf(a);
+        const indexB = categoryOrder.indexOf(b);
+        if (indexA === -1 && indexB === -1) return a.localeCompare(b);
+        if (indexA === -1) return 1;
+        if (indexB === -1) return -1;
+        return indexA - indexB;
+    });
+}
+
+// build_views.py와 같은 구조를 브라우저에서 계산 (portfolio_views.json이 없을 때만)
+function computePortfolioViews() {
+    const grouped = { genre: {}, year: {}, category: {} };
+    const addSong = (mode, label, song) => {
+        if (!grouped[mode][label]) {
+            grouped[mode][label] = [];
+        }
+        grouped[mode][label].push(song);
+    };
+
+    getAllSongs().forEach(song => {
+        const genres = Array.isArray(song.genres) && song.genres.length
+            ? song.genres
+            : splitGenreLabels(song.genre);
+        genres.forEach(genre => addSong('genre', genre, song));
+        addSong('year', String(song.year), song);
+        const categories = Array.isArray(song.categories) && song.categories.length
+            ? song.categories
+            : [song.category || 'Other'];
+        categories.forEach(category => addSong('category', category, song));
+    });
+
+    const sorters = {
+        genre: labels => labels.sort(),
+        year: sortYearLabels,
+        category: sortCategoryLabels
+    };
+    const buckets = {};
+    VIEW_MODES.forEach(mode => {
+        buckets[mode] = sorters[mode](Object.keys(grouped[mode])).map(label => ({
+            label,
+            artists: uniqueArtistNames(grouped[mode][label]),
+            songIds: grouped[mode][label].map(song => song.id)
+        }));
+    });
+
+    const categoryCards = {};
+    buckets.category.forEach(bucket => {
+        categoryCards[bucket.label] = groupSongsByAlbumForCategory(grouped.category[bucket.label]);
+    });
+
+    return indexViewBuckets({ buckets, categoryCards, priorityAlbums: computePriorityAlbums() });
+}
+
+function indexViewBuckets(views) {
+    views.byLabel = {};
+    VIEW_MODES.forEach(mode => {
+        views.byLabel[mode] = {};
+        views.buckets[mode].forEach(bucket => {
+            views.byLabel[mode][bucket.label] = bucket;
+        });
+    });
+    return views;
+}
+
+function getViewBuckets(mode) {
+    return portfolioViews ? portfolioViews.buckets[mode] : [];
+}
+
+function getViewBucket(mode, label) {
+    return (portfolioViews && portfolioViews.byLabel[mode][String(label)]) || null;
+}
+
+function getViewSongs(mode, label) {
+    const bucket = getViewBucket(mode, label);
+    return bucket ? getSongsByIds(bucket.songIds) : [];
 }
 
 function normalizePriorityKey(value) {
@@ -781,47 +1104,69 @@ function makePriorityAlbumKey(artist, album) {
     return `${normalizePriorityKey(artist)}|${normalizePriorityKey(album)}`;
 }
 
-function getPriorityAlbums() {
-    const songs = getAllSongs();
-    const albumsByKey = {};
+function makePriorityAlbum(songs) {
+    const first = songs[0];
+    const albumName = String(first.album || '').trim();
+    return {
+        key: makePriorityAlbumKey(first.artist, albumName),
+        artist: first.artist,
+        album: albumName,
+        priority: Math.max(...songs.map(song => getSongPriorityWeight(song))),
+        songsCount: songs.length,
+        songIds: songs.map(song => song.id)
+    };
+}
 
-    songs.forEach(song => {
+function computePriorityAlbums() {
+    const songsByKey = {};
+
+    getAllSongs().forEach(song => {
         const albumName = String(song.album || '').trim();
         if (!albumName) return;
 
         const key = makePriorityAlbumKey(song.artist, albumName);
-        if (!albumsByKey[key]) {
-            albumsByKey[key] = {
-                key,
-                artist: song.artist,
-                album: albumName,
-                priority: getSongPriorityWeight(song),
-                songsCount: 0,
-                youtubeId: song.youtubeId || '',
-                thumbnailUrl: song.thumbnailUrl || '',
-                fallbackThumbnailUrl: song.fallbackThumbnailUrl || '',
-                representativeSong: song
-            };
+        if (!songsByKey[key]) {
+            songsByKey[key] = [];
         }
+        songsByKey[key].push(song);
+    });
+
+    return Object.values(songsByKey).map(makePriorityAlbum);
+}
+
+function getPriorityAlbums() {
+    return portfolioViews ? portfolioViews.priorityAlbums : [];
+}
 
-        const current = albumsByKey[key];
-        current.priority = Math.max(current.priority, getSongPriorityWeight(song));
-        current.songsCount += 1;
-        if (!current.youtubeId && song.youtubeId) {
-            current.youtubeId = song.youtubeId;
+// 앨범 대표 썸네일은 미디어 샤드에 따라 바뀌므로 표시할 때 계산
+function resolvePriorityAlbumMedia(album) {
+    const resolved = {
+        ...album,
+        youtubeId: '',
+        thumbnailUrl: '',
+        fallbackThumbnailUrl: '',
+        representativeSong: null
+    };
+
+    getSongsByIds(album.songIds).forEach(song => {
+        if (!resolved.representativeSong) {
+            resolved.representativeSong = song;
+        }
+        if (!resolved.youtubeId && song.youtubeId) {
+            resolved.youtubeId = song.youtubeId;
         }
-        if (!current.thumbnailUrl && song.thumbnailUrl) {
-            current.thumbnailUrl = song.thumbnailUrl;
+        if (!resolved.thumbnailUrl && song.thumbnailUrl) {
+            resolved.thumbnailUrl = song.thumbnailUrl;
         }
-        if (!current.fallbackThumbnailUrl && song.fallbackThumbnailUrl) {
-            current.fallbackThumbnailUrl = song.fallbackThumbnailUrl;
+        if (!resolved.fallbackThumbnailUrl && song.fallbackThumbnailUrl) {
+            resolved.fallbackThumbnailUrl = song.fallbackThumbnailUrl;
         }
-        if ((!current.representativeSong?.thumbnailUrl && song.thumbnailUrl) || (!current.representativeSong?.youtubeId && song.youtubeId)) {
-            current.representativeSong = song;
+        if ((!resolved.representativeSong.thumbnailUrl && song.thumbnailUrl) || (!resolved.representativeSong.youtubeId && song.youtubeId)) {
+            resolved.representativeSong = song;
         }
     });
 
-    return Object.values(albumsByKey);
+    return resolved;
 }
 
 function weightedShuffleAlbums(albums) {
@@ -843,7 +1188,9 @@ function getPriorityStripAlbums(limit = 10) {
 
     const weighted = weightedShuffleAlbums(albums);
     const picked = weighted.slice(0, Math.min(limit, weighted.length));
-    return picked.sort((a, b) => b.priority - a.priority || b.songsCount - a.songsCount);
+    return picked
+        .sort((a, b) => b.priority - a.priority || b.songsCount - a.songsCount)
+        .map(resolvePriorityAlbumMedia);
 }
 
 function renderPriorityShowcase() {
@@ -881,6 +1228,8 @@ function renderPriorityShowcase() {
         const thumbImg = card.querySelector('img');
         if (thumbImg) {
             loadThumbnailForSong(thumbImg, {
+                artist: item.artist,
+                id: item.representativeSong?.id,
                 thumbnailUrl: item.thumbnailUrl || item.representativeSong?.thumbnailUrl || '',
                 fallbackThumbnailUrl: item.fallbackThumbnailUrl || item.representativeSong?.fallbackThumbnailUrl || '',
                 youtubeId: item.youtubeId || item.representativeSong?.youtubeId || ''
@@ -895,55 +1244,6 @@ function renderPriorityShowcase() {
     });
 }
 
-// 장르별로 그룹화
-function getSongsByGenre() {
-    const songs = getAllSongs();
-    const grouped = {};
-    songs.forEach(song => {
-        const genres = Array.isArray(song.genres) && song.genres.length
-            ? song.genres
-            : splitGenreLabels(song.genre);
-        genres.forEach(genre => {
-            if (!grouped[genre]) {
-                grouped[genre] = [];
-            }
-            grouped[genre].push(song);
-        });
-    });
-    return grouped;
-}
-
-// 연도별로 그룹화
-function getSongsByYear() {
-    const songs = getAllSongs();
-    const grouped = {};
-    songs.forEach(song => {
-        if (!grouped[song.year]) {
-            grouped[song.year] = [];
-        }
-        grouped[song.year].push(song);
-    });
-    return grouped;
-}
-
-// 작업 유형별로 그룹화
-function getSongsByCategory() {
-    const songs = getAllSongs();
-    const grouped = {};
-    songs.forEach(song => {
-        const categories = Array.isArray(song.categories) && song.categories.length
-            ? song.categories
-            : [song.category || 'Other'];
-        categories.forEach(category => {
-            if (!grouped[category]) {
-                grouped[category] = [];
-            }
-            grouped[category].push(song);
-        });
-    });
-    return grouped;
-}
-
 function getCategoryThumbnailLayout(songCount) {
     if (songCount <= 1) return { cols: 1, rows: 1 };
     if (songCount === 2) return { cols: 2, rows: 1 };
@@ -1092,17 +1392,15 @@ function createGenreCards() {
     grid.innerHTML = '';
     grid.className = 'portfolio-grid';
     
-    const genreGroups = getSongsByGenre();
-    const sortedGenres = Object.keys(genreGroups).sort();
-    
-    sortedGenres.forEach(genre => {
-        const songs = genreGroups[genre];
+    getViewBuckets('genre').forEach(bucket => {
+        const genre = bucket.label;
+        const songCount = bucket.songIds.length;
         const card = document.createElement('div');
         card.className = 'genre-card';
         card.dataset.genre = genre;
         
         // 대표곡 썸네일 (최대 4개)
-        const featuredSongs = songs.slice(0, 4);
+        const featuredSongs = getSongsByIds(bucket.songIds.slice(0, 4));
         const thumbnailsHtml = featuredSongs.map((song, index) => 
             `<div class="featured-thumbnail" style="z-index: ${4 - index}">
                 <img src="" alt="${song.title}" data-youtube-id="${song.youtubeId}">
@@ -1115,9 +1413,9 @@ function createGenreCards() {
             </div>
             <div class="card-info">
                 <div class="card-title">${genre}</div>
-                <div class="card-artist">${songs.length}곡</div>
-                <div class="card-description">${songs.map(s => s.artist).filter((v, i, a) => a.indexOf(v) === i).join(', ')}</div>
-                <div class="song-count">${songs.length}곡</div>
+                <div class="card-artist">${songCount}곡</div>
+                <div class="card-description">${bucket.artists.join(', ')}</div>
+                <div class="song-count">${songCount}곡</div>
             </div>
         `;
         
@@ -1150,27 +1448,15 @@ function createYearCards() {
     grid.innerHTML = '';
     grid.className = 'portfolio-grid';
     
-    const yearGroups = getSongsByYear();
-    const sortedYears = Object.keys(yearGroups).sort((a, b) => {
-        const yearA = Number(a);
-        const yearB = Number(b);
-        const hasYearA = Number.isFinite(yearA);
-        const hasYearB = Number.isFinite(yearB);
-        
-        if (hasYearA && hasYearB) return yearB - yearA;
-        if (hasYearA) return -1;
-        if (hasYearB) return 1;
-        return a.localeCompare(b, 'ko');
-    });
-    
-    sortedYears.forEach(year => {
-        const songs = yearGroups[year];
+    getViewBuckets('year').forEach(bucket => {
+        const year = bucket.label;
+        const songCount = bucket.songIds.length;
         const card = document.createElement('div');
         card.className = 'year-card';
         card.dataset.year = year;
         
         // 대표곡 썸네일 (최대 4개)
-        const featuredSongs = songs.slice(0, 4);
+        const featuredSongs = getSongsByIds(bucket.songIds.slice(0, 4));
         const thumbnailsHtml = featuredSongs.map((song, index) => 
             `<div class="featured-thumbnail" style="z-index: ${4 - index}">
                 <img src="" alt="${song.title}" data-youtube-id="${song.youtubeId}">
@@ -1183,9 +1469,9 @@ function createYearCards() {
             </div>
             <div class="card-info">
                 <div class="card-title">${formatYearLabel(year)}</div>
-                <div class="card-artist">${songs.length}곡</div>
-                <div class="card-description">${songs.map(s => s.artist).filter((v, i, a) => a.indexOf(v) === i).join(', ')}</div>
-                <div class="song-count">${songs.length}곡</div>
+                <div class="card-artist">${songCount}곡</div>
+                <div class="card-description">${bucket.artists.join(', ')}</div>
+                <div class="song-count">${songCount}곡</div>
             </div>
         `;
         
@@ -1218,20 +1504,9 @@ function createCategoryCards() {
     grid.innerHTML = '';
     grid.className = 'portfolio-grid category-view';
     
-    const categoryGroups = getSongsByCategory();
-    // 카테고리 순서 정의: Digital Editing, Mixing, Broadcasting, Recording
-    const categoryOrder = ['Digital Editing', 'Mixing', 'Broadcasting', 'Recording'];
-    const sortedCategories = Object.keys(categoryGroups).sort((a, b) => {
-        const indexA = categoryOrder.indexOf(a);
-        const indexB = categoryOrder.indexOf(b);
-        if (indexA === -1 && indexB === -1) return a.localeCompare(b);
-        if (indexA === -1) return 1;
-        if (indexB === -1) return -1;
-        return indexA - indexB;
-    });
-    
-    sortedCategories.forEach(category => {
-        const songs = categoryGroups[category];
+    getViewBuckets('category').forEach(bucket => {
+        const category = bucket.label;
+        const songs = getSongsByIds(bucket.songIds);
         const card = document.createElement('div');
         card.className = 'category-card';
         card.dataset.category = category;
@@ -1253,7 +1528,7 @@ function createCategoryCards() {
             <div class="card-info">
                 <div class="card-title">${category}</div>
                 <div class="card-artist">${songs.length}곡</div>
-                <div class="card-description">${songs.map(s => s.artist).filter((v, i, a) => a.indexOf(v) === i).join(', ')}</div>
+                <div class="card-description">${bucket.artists.join(', ')}</div>
                 <div class="song-count">${songs.length}곡</div>
             </div>
         `;
@@ -1284,8 +1559,7 @@ function createCategoryCards() {
 // 장르별 노래 목록 표시
 function showGenreSongs(genre, options = {}) {
     const { pushHistory = true } = options;
-    const genreGroups = getSongsByGenre();
-    const songs = genreGroups[genre] || [];
+    const songs = getViewSongs('genre', genre);
     
     closeModalIfOpen();
     currentFilter = 'genre';
@@ -1334,8 +1608,7 @@ function showGenreSongs(genre, options = {}) {
 // 연도별 노래 목록 표시
 function showYearSongs(year, options = {}) {
     const { pushHistory = true } = options;
-    const yearGroups = getSongsByYear();
-    const songs = yearGroups[year] || [];
+    const songs = getViewSongs('year', year);
     
     closeModalIfOpen();
     currentFilter = 'year';
@@ -1384,9 +1657,8 @@ function showYearSongs(year, options = {}) {
 // 작업 유형별 노래 목록 표시
 function showCategorySongs(category, options = {}) {
     const { pushHistory = true } = options;
-    const categoryGroups = getSongsByCategory();
-    const songs = categoryGroups[category] || [];
-    const displayGroups = groupSongsByAlbumForCategory(songs);
+    const songs = getViewSongs('category', category);
+    const displayGroups = (portfolioViews && portfolioViews.categoryCards[category]) || [];
     
     closeModalIfOpen();
     currentFilter = 'category';
@@ -1419,10 +1691,11 @@ function showCategorySongs(category, options = {}) {
     grid.appendChild(categoryHeader);
     
     displayGroups.forEach(group => {
-        const card = group.type === 'album'
-            ? createCategoryAlbumCard(group, category)
-            : createSongCard(group.song);
-        grid.appendChild(card);
+        if (group.type === 'album') {
+            grid.appendChild(createCategoryAlbumCard({ ...group, songs: getSongsByIds(group.songIds) }, category));
+        } else if (songsById[group.songId]) {
+            grid.appendChild(createSongCard(songsById[group.songId]));
+        }
     });
 
     if (pushHistory) {
@@ -1440,7 +1713,7 @@ function groupSongsByAlbumForCategory(songs) {
     songs.forEach(song => {
         const albumLabel = String(song.album || '').trim();
         if (!albumLabel) {
-            groups.push({ type: 'song', song });
+            groups.push({ type: 'song', songId: song.id });
             return;
         }
 
@@ -1451,18 +1724,18 @@ function groupSongsByAlbumForCategory(songs) {
                 type: 'album',
                 artist: song.artist,
                 album: albumLabel,
-                songs: [],
+                songIds: [],
             };
             albumGroups.set(key, group);
             groups.push(group);
         }
 
-        group.songs.push(song);
+        group.songIds.push(song.id);
     });
 
     return groups.flatMap(group => {
-        if (group.type === 'album' && group.songs.length === 1) {
-            return [{ type: 'song', song: group.songs[0] }];
+        if (group.type === 'album' && group.songIds.length === 1) {
+            return [{ type: 'song', songId: group.songIds[0] }];
         }
         return [group];
     });
@@ -1565,11 +1838,21 @@ function createSongCard(song) {
     // 썸네일 이미지 로드
     const thumbnailImg = card.querySelector('.card-thumbnail img');
     loadThumbnailForSong(thumbnailImg, song);
+
+    // 미디어 샤드가 도착하면 YouTube 제목 등으로 갱신
+    if (isArtistMediaPending(song.artist)) {
+        loadArtistMedia(song.artist).then(changed => {
+            const loaded = changed ? findLoadedSong(song) : null;
+            if (!loaded) return;
+            card.querySelector('.card-title').textContent = loaded.title;
+            thumbnailImg.alt = loaded.title;
+        });
+    }
     
     // 클릭 이벤트
     card.addEventListener('click', (e) => {
         e.preventDefault();
-        openModal({ ...song, artist: song.artist });
+        openModal({ ...(findLoadedSong(song) || song), artist: song.artist });
     });
     
     // 터치 피드백
@@ -1757,7 +2040,7 @@ function setupFilterTabs() {
 
 // 이벤트 리스너 설정
 document.addEventListener('DOMContentLoaded', async () => {
-    await loadPortfolioDataFromCsv();
+    await loadPortfolioData();
     renderPriorityShowcase();
     setupFilterTabs();
 
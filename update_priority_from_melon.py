@@ -20,27 +20,39 @@ import argparse
 import csv
 import math
 import re
-import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote_plus
 
 import requests
-from bs4 import BeautifulSoup
+
+from album_match import PendingQueries, normalize, rank
+from catalog_store import CatalogStore, open_store
+from checkpoint import atomic_write, journal_path_for, open_journal
+from html_extract import BACKENDS, MELON_ALBUM_HREF_RE, get_extractor
+from http_cache import CachedResponse, ResponseCache, fetch, open_cache
+from net_stats import timed_extractor, write_run_stats
+from rate_limit import DEFAULT_MAX_RETRIES, AdaptivePacer, RetryPolicy
+from row_stream import iter_csv_rows, read_fieldnames, row_album_key
 
 
 SEARCH_URL = "https://www.melon.com/search/total/index.htm?q={query}"
 ALBUM_DETAIL_URL = "https://www.melon.com/album/detail.htm?albumId={album_id}"
 SONG_DETAIL_URL = "https://www.melon.com/song/detail.htm?songId={song_id}"
-
-
-def normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", (text or "").strip().lower())
-
-
-def compact(text: str) -> str:
-    return re.sub(r"[^0-9a-z가-힣]", "", normalize(text))
+ALBUM_LIKE_URL = "https://www.melon.com/commonlike/getAlbumLike.json?contsIds={ids}"
+SONG_LIKE_URL = "https://www.melon.com/commonlike/getSongLike.json?contsIds={ids}"
+# IDs per getSongLike/getAlbumLike call; contsIds takes a comma-separated list.
+LIKE_BATCH_SIZE = 50
+CHECKPOINT_RUN_ID = "update_priority_from_melon"
+# Columns update_priorities writes next to `priority`, appended when missing.
+METRIC_FIELDS = [
+    "MelonPriorityStream",
+    "MelonPriorityDownload",
+    "MelonPriorityLike",
+    "PriorityMetricSource",
+    "PriorityMetricValue",
+]
 
 
 def parse_int(text: str) -> int:
@@ -70,9 +82,24 @@ class AlbumMetric:
 
 
 class MelonPriorityClient:
-    def __init__(self, sleep_seconds: float = 0.25, timeout: int = 15):
+    def __init__(
+        self,
+        sleep_seconds: float = 0.25,
+        timeout: int = 15,
+        cache: Optional[ResponseCache] = None,
+        extractor=None,
+        like_batch_size: int = LIKE_BATCH_SIZE,
+        pacer: Optional[AdaptivePacer] = None,
+        retry: Optional[RetryPolicy] = None,
+        pending: Optional[PendingQueries] = None,
+    ):
         self.sleep_seconds = sleep_seconds
+        self.pacer = pacer or AdaptivePacer(sleep_seconds)
+        self.retry = retry or RetryPolicy()
+        self.like_batch_size = max(1, like_batch_size)
         self.timeout = timeout
+        self.cache = cache
+        self.extractor = timed_extractor(extractor or get_extractor())
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -85,33 +112,16 @@ class MelonPriorityClient:
         self.song_digital_cache: Dict[str, Tuple[int, int]] = {}
         self.album_song_ids_cache: Dict[str, List[str]] = {}
         self.search_album_cache: Dict[Tuple[str, str], str] = {}
+        # albums of this run not searched yet; pages settle them (album_match)
+        self.pending = pending or PendingQueries()
 
-    def _get(self, url: str) -> str:
-        time.sleep(self.sleep_seconds)
-        r = self.session.get(url, timeout=self.timeout)
+    def _fetch(self, url: str, endpoint: str) -> CachedResponse:
+        r = fetch(self.session, url, endpoint=endpoint, cache=self.cache, timeout=self.timeout, pacer=self.pacer, retry=self.retry)
         r.raise_for_status()
-        return r.text
-
-    def _score_candidate(self, q_artist: str, q_album: str, c_artist: str, c_album: str) -> int:
-        qa, qal = compact(q_artist), compact(q_album)
-        ca, cal = compact(c_artist), compact(c_album)
-        score = 0
-        if qal and cal == qal:
-            score += 12
-        elif qal and qal in cal:
-            score += 8
-        elif qal and cal in qal:
-            score += 4
-
-        if qa and ca == qa:
-            score += 8
-        elif qa and qa in ca:
-            score += 4
-
-        q_tokens = set(normalize(q_album).split())
-        c_tokens = set(normalize(c_album).split())
-        score += len(q_tokens & c_tokens)
-        return score
+        return r
+
+    def _get(self, url: str, endpoint: str) -> str:
+        return self._fetch(url, endpoint).text
 
     def find_album_id(self, artist: str, album: str) -> str:
         key = (normalize(artist), normalize(album))
@@ -121,89 +131,67 @@ class MelonPriorityClient:
         if not key[0] or not key[1]:
             self.search_album_cache[key] = ""
             return ""
+        settled = self.pending.claim(artist, album)
+        if settled is not None:
+            self.search_album_cache[key] = settled.candidate.album_id
+            return settled.candidate.album_id
 
         try:
-            html = self._get(SEARCH_URL.format(query=quote_plus(f"{artist} {album}")))
-            soup = BeautifulSoup(html, "html.parser")
-            section = soup.select_one("div.d_album_list") or soup
-
-            candidates = []
-            for a in section.select("a[href*='goAlbumDetail']"):
-                href = a.get("href", "")
-                m = re.search(r"goAlbumDetail\('([0-9]+)'\)", href)
-                if not m:
-                    continue
-                album_id = m.group(1)
-                cand_album = a.get_text(" ", strip=True)
-                if not cand_album:
-                    continue
-
-                cand_artist = ""
-                li = a.find_parent("li")
-                if li:
-                    artist_a = li.select_one("a[href*='goArtistDetail']")
-                    if artist_a:
-                        cand_artist = artist_a.get_text(" ", strip=True)
-
-                score = self._score_candidate(artist, album, cand_artist, cand_album)
-                candidates.append((score, album_id))
-
-            if not candidates:
+            html = self._get(SEARCH_URL.format(query=quote_plus(f"{artist} {album}")), "melon_search")
+            candidates = self.extractor.melon_search(html)
+            self.pending.observe(candidates)
+            ranked = rank(artist, album, candidates)
+            if not ranked:
                 # fallback scan
-                m = re.search(r"goAlbumDetail\('([0-9]+)'\)", html)
+                m = MELON_ALBUM_HREF_RE.search(html)
                 if m:
                     self.search_album_cache[key] = m.group(1)
                     return m.group(1)
                 self.search_album_cache[key] = ""
                 return ""
 
-            candidates.sort(key=lambda x: x[0], reverse=True)
-            best = candidates[0][1]
+            best = ranked[0].candidate.album_id
             self.search_album_cache[key] = best
             return best
         except Exception:
             self.search_album_cache[key] = ""
             return ""
 
+    def _prefetch_likes(self, url_template: str, ids: List[str], like_cache: Dict[str, int]) -> int:
+        """Resolve uncached like counts in chunked multi-ID calls; returns the request count."""
+        pending = [i for i in dict.fromkeys(ids) if i and i not in like_cache]
+        requests_made = 0
+        for start in range(0, len(pending), self.like_batch_size):
+            chunk = pending[start : start + self.like_batch_size]
+            requests_made += 1
+            try:
+                data = self._fetch(url_template.format(ids=",".join(chunk)), "melon_like").json()
+                for item in (data or {}).get("contsLike") or []:
+                    like_cache[str(item.get("CONTSID") or "")] = parse_int(item.get("SUMMCNT"))
+            except Exception:
+                pass
+            # IDs the response left out (or a failed chunk) count as 0, as before.
+            for i in chunk:
+                like_cache.setdefault(i, 0)
+        return requests_made
+
+    def prefetch_album_likes(self, album_ids: List[str]) -> int:
+        return self._prefetch_likes(ALBUM_LIKE_URL, album_ids, self.album_like_cache)
+
+    def prefetch_song_likes(self, song_ids: List[str]) -> int:
+        return self._prefetch_likes(SONG_LIKE_URL, song_ids, self.song_like_cache)
+
     def get_album_like(self, album_id: str) -> int:
         if not album_id:
             return 0
-        if album_id in self.album_like_cache:
-            return self.album_like_cache[album_id]
-
-        try:
-            url = f"https://www.melon.com/commonlike/getAlbumLike.json?contsIds={album_id}"
-            time.sleep(self.sleep_seconds)
-            r = self.session.get(url, timeout=self.timeout)
-            r.raise_for_status()
-            data = r.json()
-            conts = (data or {}).get("contsLike") or []
-            like = parse_int(conts[0].get("SUMMCNT")) if conts else 0
-            self.album_like_cache[album_id] = like
-            return like
-        except Exception:
-            self.album_like_cache[album_id] = 0
-            return 0
+        self.prefetch_album_likes([album_id])
+        return self.album_like_cache[album_id]
 
     def get_song_like(self, song_id: str) -> int:
         if not song_id:
             return 0
-        if song_id in self.song_like_cache:
-            return self.song_like_cache[song_id]
-
-        try:
-            url = f"https://www.melon.com/commonlike/getSongLike.json?contsIds={song_id}"
-            time.sleep(self.sleep_seconds)
-            r = self.session.get(url, timeout=self.timeout)
-            r.raise_for_status()
-            data = r.json()
-            conts = (data or {}).get("contsLike") or []
-            like = parse_int(conts[0].get("SUMMCNT")) if conts else 0
-            self.song_like_cache[song_id] = like
-            return like
-        except Exception:
-            self.song_like_cache[song_id] = 0
-            return 0
+        self.prefetch_song_likes([song_id])
+        return self.song_like_cache[song_id]
 
     def get_album_song_ids(self, album_id: str) -> List[str]:
         if not album_id:
@@ -212,7 +200,7 @@ class MelonPriorityClient:
             return self.album_song_ids_cache[album_id]
 
         try:
-            html = self._get(ALBUM_DETAIL_URL.format(album_id=album_id))
+            html = self._get(ALBUM_DETAIL_URL.format(album_id=album_id), "melon_album")
             ids = set(re.findall(r"goSongDetail\('([0-9]+)'\)", html))
             ids.update(re.findall(r"playSong\('\\d+','([0-9]+)'\)", html))
             ordered = sorted(ids)
@@ -231,16 +219,10 @@ class MelonPriorityClient:
         stream = 0
         download = 0
         try:
-            html = self._get(SONG_DETAIL_URL.format(song_id=song_id))
-            soup = BeautifulSoup(html, "html.parser")
+            html = self._get(SONG_DETAIL_URL.format(song_id=song_id), "melon_song")
 
             # structured dt/dd parsing if present
-            for dt in soup.select("div.section_info div.meta dl.list dt"):
-                label = dt.get_text(" ", strip=True)
-                dd = dt.find_next_sibling("dd")
-                if not dd:
-                    continue
-                value = dd.get_text(" ", strip=True)
+            for label, value in self.extractor.melon_song_meta(html):
                 if "스트리밍" in label:
                     stream = max(stream, parse_int(value))
                 if "다운로드" in label:
@@ -261,6 +243,40 @@ class MelonPriorityClient:
         self.song_digital_cache[song_id] = (stream, download)
         return (stream, download)
 
+    def songs_needing_likes(self, album_id: str) -> List[str]:
+        """Fetch the album's song pages; returns songs without digital counts.
+
+        Those songs' likes are the fallback metric, so callers can batch them
+        with `prefetch_song_likes` before `get_album_metric`.
+        """
+        needing = []
+        for sid in self.get_album_song_ids(album_id):
+            if self.get_song_digital(sid) == (0, 0):
+                needing.append(sid)
+        return needing
+
+    def checkpoint_record(self, album_id: str) -> Dict[str, object]:
+        """What pass 1 fetched for `album_id`, for the checkpoint journal."""
+        song_ids = self.album_song_ids_cache.get(album_id, [])
+        return {"album_id": album_id, "songs": {sid: list(self.song_digital_cache.get(sid, (0, 0))) for sid in song_ids}}
+
+    def restore_checkpoint(self, key: Tuple[str, str], record: Dict[str, object]) -> bool:
+        """Seed the caches from a journaled album; False if it should be fetched again."""
+        album_id = str(record.get("album_id") or "")
+        songs = record.get("songs") or {}
+        if not album_id or not songs:
+            # not found or the album page failed: worth another try
+            return False
+        self.search_album_cache[key] = album_id
+        self.album_song_ids_cache[album_id] = list(songs)
+        for sid, (stream, download) in songs.items():
+            self.song_digital_cache[sid] = (int(stream), int(download))
+        return True
+
+    def restore_likes(self, record: Dict[str, object]) -> None:
+        self.album_like_cache.update({k: int(v) for k, v in (record.get("album_likes") or {}).items()})
+        self.song_like_cache.update({k: int(v) for k, v in (record.get("song_likes") or {}).items()})
+
     def get_album_metric(self, album_id: str) -> AlbumMetric:
         if not album_id:
             return AlbumMetric(album_id="", metric_source="unavailable", metric_value=0)
@@ -317,56 +333,186 @@ def compute_priority(metric_value: int, min_log: float, max_log: float) -> int:
     return clamp(score, 1, 10)
 
 
-def update_priorities(input_csv: Path, output_csv: Path, sleep_seconds: float = 0.25) -> None:
-    with input_csv.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-        fieldnames = list(reader.fieldnames or [])
-
-    required = [
-        "MelonPriorityStream",
-        "MelonPriorityDownload",
-        "MelonPriorityLike",
-        "PriorityMetricSource",
-        "PriorityMetricValue",
-    ]
-    for col in required:
+def index_album_rows(rows: List[Dict[str, str]]) -> Tuple[Dict[Tuple[str, str], List[int]], List[int]]:
+    """Group row positions by normalized (artist, album) in a single pass.
+
+    Groups keep first-seen order, so `rows[positions[0]]` is the original-case
+    sample used for searching. Rows missing an artist or album are returned
+    separately.
+    """
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    ungrouped: List[int] = []
+    # Artist/album strings repeat across tracks; normalize each distinct one once.
+    normalized: Dict[str, str] = {}
+    for pos, r in enumerate(rows):
+        artist = r.get("Artist") or ""
+        album = r.get("Album") or ""
+        artist_n = normalized.get(artist)
+        if artist_n is None:
+            artist_n = normalized[artist] = normalize(artist)
+        album_n = normalized.get(album)
+        if album_n is None:
+            album_n = normalized[album] = normalize(album)
+        if not artist_n or not album_n:
+            ungrouped.append(pos)
+            continue
+        key = (artist_n, album_n)
+        positions = groups.get(key)
+        if positions is None:
+            groups[key] = [pos]
+        else:
+            positions.append(pos)
+    return groups, ungrouped
+
+
+def metric_values(metric: AlbumMetric) -> Dict[str, str]:
+    return {
+        "MelonPriorityStream": str(metric.stream),
+        "MelonPriorityDownload": str(metric.download),
+        "MelonPriorityLike": str(metric.like),
+        "PriorityMetricSource": metric.metric_source,
+        "PriorityMetricValue": str(metric.metric_value),
+    }
+
+
+def apply_album_metric(r: Dict[str, str], metric: AlbumMetric, min_log: float, max_log: float) -> None:
+    r["priority"] = str(compute_priority(metric.metric_value, min_log, max_log))
+    r.update(metric_values(metric))
+
+    if metric.album_id and not (r.get("MelonAlbumId") or "").strip():
+        r["MelonAlbumId"] = metric.album_id
+        r["MelonAlbumURL"] = ALBUM_DETAIL_URL.format(album_id=metric.album_id)
+
+
+def update_priorities(
+    input_csv: Path,
+    output_csv: Path,
+    sleep_seconds: float = 0.25,
+    cache: Optional[ResponseCache] = None,
+    parser_backend: str = "",
+    store: Optional[CatalogStore] = None,
+    like_batch_size: int = LIKE_BATCH_SIZE,
+    resume: bool = False,
+    stream: bool = False,
+    min_sleep_seconds: Optional[float] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> None:
+    # `stream`: keep one sample row per album instead of every row, and read
+    # the input again to write the output. Priorities are scaled across all
+    # albums, so rows can only be written once every metric is known.
+    if stream and store is not None:
+        raise ValueError("stream mode reads and writes CSV; the store already works album by album")
+    rows: List[Dict[str, str]] = []
+    fieldnames: List[str] = []
+    if stream:
+        fieldnames = read_fieldnames(input_csv)
+    elif store is None:
+        with input_csv.open("r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = list(reader.fieldnames or [])
+
+    # a CSV fresh from enrich_melon_metadata has no priority column yet
+    for col in ["priority", *METRIC_FIELDS]:
         if col not in fieldnames:
             fieldnames.append(col)
 
-    client = MelonPriorityClient(sleep_seconds=sleep_seconds)
-
-    album_keys: List[Tuple[str, str]] = []
-    seen = set()
-    for r in rows:
-        artist = (r.get("Artist") or "").strip()
-        album = (r.get("Album") or "").strip()
-        if not artist or not album:
-            continue
-        key = (normalize(artist), normalize(album))
-        if key in seen:
-            continue
-        seen.add(key)
-        album_keys.append(key)
+    client = MelonPriorityClient(
+        sleep_seconds=sleep_seconds,
+        cache=cache,
+        extractor=get_extractor(parser_backend),
+        like_batch_size=like_batch_size,
+        pacer=AdaptivePacer(sleep_seconds, min_interval=min_sleep_seconds),
+        retry=RetryPolicy(max_retries),
+    )
+
+    if store is not None:
+        # The store's key index replaces index_album_rows; rows are read one
+        # album at a time and never held in memory together.
+        store.ensure_columns(["priority", *METRIC_FIELDS])
+        album_rows, ungrouped_rows = {}, []
+        album_keys = store.album_keys()
+    elif stream:
+        album_rows, ungrouped_rows = {}, []
+        samples: Dict[Tuple[str, str], Dict[str, str]] = {}
+        for r in iter_csv_rows(input_csv):
+            key = row_album_key(r)
+            if key[0] and key[1] and key not in samples:
+                samples[key] = {col: r.get(col) or "" for col in ("Artist", "Album", "MelonAlbumId")}
+        album_keys = list(samples)
+    else:
+        album_rows, ungrouped_rows = index_album_rows(rows)
+        album_keys = list(album_rows)
 
     album_metrics: Dict[Tuple[str, str], AlbumMetric] = {}
-
+    album_ids: Dict[Tuple[str, str], str] = {}
+    labels: Dict[Tuple[str, str], str] = {}
+    like_song_ids: List[str] = []
+
+    # Passes 1 and 2 journal what they fetched; --resume seeds the client
+    # caches from it, so replayed albums cost no requests below.
+    journal, replayed = open_journal(journal_path_for(output_csv), CHECKPOINT_RUN_ID, resume)
+    if replayed:
+        wanted = {f"{key[0]}|{key[1]}": key for key in album_keys}
+        restored = 0
+        for record in replayed:
+            if "album" in record:
+                key = wanted.get(str(record["album"]))
+                restored += bool(key is not None and client.restore_checkpoint(key, record))
+            else:
+                client.restore_likes(record)
+        print(f"Resume: {restored} albums from {journal.path.name}, {len(album_keys) - restored} left")
+
+    # Pass 1: search + album/song pages. Like counts are only collected here.
+    # Every album starts out pending; those that already have an id are
+    # claimed as they come up, without a search.
+    for key in album_keys:
+        client.pending.add(*key)
     for idx, key in enumerate(album_keys, start=1):
-        artist_n, album_n = key
         # recover original case text for search quality
-        sample = next(r for r in rows if normalize(r.get("Artist", "")) == artist_n and normalize(r.get("Album", "")) == album_n)
+        if store is not None:
+            sample = store.album_rows(key)[0]
+        else:
+            sample = samples[key] if stream else rows[album_rows[key][0]]
         artist = (sample.get("Artist") or "").strip()
         album = (sample.get("Album") or "").strip()
+        labels[key] = f"{artist} | {album}"
 
         album_id = (sample.get("MelonAlbumId") or "").strip()
         if not album_id:
             album_id = client.find_album_id(artist, album)
-
+        else:
+            client.pending.claim(artist, album)
+        album_ids[key] = album_id
+        if album_id:
+            like_song_ids.extend(client.songs_needing_likes(album_id))
+        journal.append({"album": f"{key[0]}|{key[1]}", **client.checkpoint_record(album_id)})
+        print(f"[{idx}/{len(album_keys)}] {labels[key]} -> albumId={album_id or '-'}")
+
+    # Pass 2: every like count in a handful of multi-ID calls.
+    like_ids = [album_id for album_id in album_ids.values() if album_id]
+    like_requests = client.prefetch_song_likes(like_song_ids) + client.prefetch_album_likes(like_ids)
+    print(f"Likes: {len(set(like_song_ids))} songs + {len(set(like_ids))} albums in {like_requests} requests")
+    print(f"Pacing: {client.pacer.report()}; {client.retry.report()}")
+    print(client.pending.report())
+    journal.append({"album_likes": client.album_like_cache, "song_likes": client.song_like_cache})
+
+    # Pass 3: metrics from the client caches; no further requests.
+    for idx, key in enumerate(album_keys, start=1):
+        album_id = album_ids[key]
         metric = client.get_album_metric(album_id) if album_id else AlbumMetric(album_id="", metric_source="unavailable", metric_value=0)
         album_metrics[key] = metric
+        if store is not None:
+            store.update_album(key, metric_values(metric))
+            if metric.album_id:
+                store.update_album(
+                    key,
+                    {"MelonAlbumId": metric.album_id, "MelonAlbumURL": ALBUM_DETAIL_URL.format(album_id=metric.album_id)},
+                    unless_set="MelonAlbumId",
+                )
 
         print(
-            f"[{idx}/{len(album_keys)}] {artist} | {album} -> "
+            f"[{idx}/{len(album_keys)}] {labels[key]} -> "
             f"source={metric.metric_source}, metric={metric.metric_value}, stream={metric.stream}, dl={metric.download}, like={metric.like}, albumId={metric.album_id}"
         )
 
@@ -377,38 +523,86 @@ def update_priorities(input_csv: Path, output_csv: Path, sleep_seconds: float =
     else:
         min_log, max_log = 0.0, 0.0
 
-    for r in rows:
-        key = (normalize(r.get("Artist", "")), normalize(r.get("Album", "")))
+    if store is not None:
+        for key, metric in album_metrics.items():
+            store.update_album(key, {"priority": str(compute_priority(metric.metric_value, min_log, max_log))})
+        unavailable = AlbumMetric()
+        store.update_unkeyed({"priority": str(compute_priority(unavailable.metric_value, min_log, max_log)), **metric_values(unavailable)})
+        store.export_csv(output_csv)
+        journal.discard()
+        print(f"Saved: {output_csv}")
+        if cache is not None:
+            print(cache.report())
+        return
+
+    if stream:
+        unavailable = AlbumMetric()
+        with atomic_write(output_csv, encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for r in iter_csv_rows(input_csv):
+                key = row_album_key(r)
+                apply_album_metric(r, album_metrics.get(key, unavailable) if key[0] and key[1] else unavailable, min_log, max_log)
+                writer.writerow(r)
+        journal.discard()
+        print(f"Saved: {output_csv}")
+        if cache is not None:
+            print(cache.report())
+        return
+
+    for key, positions in album_rows.items():
         metric = album_metrics.get(key, AlbumMetric())
+        for pos in positions:
+            apply_album_metric(rows[pos], metric, min_log, max_log)
+    for pos in ungrouped_rows:
+        apply_album_metric(rows[pos], AlbumMetric(), min_log, max_log)
 
-        pr = compute_priority(metric.metric_value, min_log, max_log)
-        r["priority"] = str(pr)
-        r["MelonPriorityStream"] = str(metric.stream)
-        r["MelonPriorityDownload"] = str(metric.download)
-        r["MelonPriorityLike"] = str(metric.like)
-        r["PriorityMetricSource"] = metric.metric_source
-        r["PriorityMetricValue"] = str(metric.metric_value)
-
-        if metric.album_id and not (r.get("MelonAlbumId") or "").strip():
-            r["MelonAlbumId"] = metric.album_id
-            r["MelonAlbumURL"] = ALBUM_DETAIL_URL.format(album_id=metric.album_id)
-
-    with output_csv.open("w", encoding="utf-8-sig", newline="") as f:
+    with atomic_write(output_csv, encoding="utf-8-sig", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(rows)
+    journal.discard()
 
     print(f"Saved: {output_csv}")
+    if cache is not None:
+        print(cache.report())
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Update priority from Melon digital/like metrics")
     parser.add_argument("--input", default="Portfolio_list.csv")
     parser.add_argument("--output", default="Portfolio_list.csv")
-    parser.add_argument("--sleep", type=float, default=0.25)
+    parser.add_argument("--sleep", type=float, default=0.25, help="Starting spacing between requests (seconds)")
+    parser.add_argument("--min-sleep", type=float, default=None, help="Fastest spacing the pacer may reach while healthy (default: --sleep / 4)")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES, help="Retries per request on 429/5xx or connection errors")
+    parser.add_argument("--cache-path", default="", help="HTTP response cache database (default: .http_cache.sqlite)")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from the network")
+    parser.add_argument("--like-batch-size", type=int, default=LIKE_BATCH_SIZE, help="IDs per like-count request")
+    parser.add_argument("--store", default="", help="Read/write this SQLite catalog (default: none, CSV in/out)")
+    parser.add_argument("--reimport", action="store_true", help="With --store, replace the catalog with --input first")
+    parser.add_argument("--parser-backend", choices=sorted(BACKENDS), default="", help="HTML extraction backend (default: lxml if installed)")
+    parser.add_argument("--resume", action="store_true", help="Replay the checkpoint journal of an interrupted run and fetch only the rest")
+    parser.add_argument("--stats-path", default="", help="Network stats JSON (.prom written alongside; default: <output>.net_stats.json)")
+    parser.add_argument("--stream", action="store_true", help="Bounded memory: keep per-album state only and stream the output")
     args = parser.parse_args()
 
-    update_priorities(Path(args.input), Path(args.output), sleep_seconds=args.sleep)
+    store = open_store(args.store, Path(args.input), reimport=args.reimport) if args.store else None
+    try:
+        update_priorities(
+            Path(args.input),
+            Path(args.output),
+            sleep_seconds=args.sleep,
+            cache=open_cache(args.cache_path, disabled=args.no_cache),
+            parser_backend=args.parser_backend,
+            store=store,
+            like_batch_size=args.like_batch_size,
+            resume=args.resume,
+            stream=args.stream,
+            min_sleep_seconds=args.min_sleep,
+            max_retries=args.max_retries,
+        )
+    finally:
+        write_run_stats("update_priority_from_melon", Path(args.output), args.stats_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,279 @@
+"""
+YouTube search for rows the media matcher could not resolve otherwise.
+
+Spawning `yt-dlp --dump-json ytsearch1:...` per row pays interpreter
+startup and extractor registration every time and runs strictly one query
+after another. `SearchPool` instead reuses warm extractors (at most one
+per worker), runs searches concurrently and collapses identical queries
+(after whitespace/case folding) onto a single in-flight search.
+
+Backends, picked with `YT_SEARCH_BACKEND` or `--yt-search-backend`:
+
+- "ytdlp":     the yt_dlp package in-process, one `YoutubeDL` per worker
+- "ytdlp-cli": one yt-dlp subprocess per query (the binary from
+               `YTDLP_PATH`, else the first `yt-dlp` on PATH)
+- "stub":      deterministic local results, for benchmarks and dry runs
+
+Every backend returns a yt-dlp style info dict (id, title, thumbnails) or
+None; `info_to_match()` turns it into the media map fields.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from net_stats import STATS
+
+try:
+    import yt_dlp
+except ImportError:  # optional: the CLI backend works without it
+    yt_dlp = None
+
+
+DEFAULT_WORKERS = 4
+CLI_TIMEOUT = 30
+# Labels for net_stats; searches go to youtube.com whichever backend runs them.
+STATS_HOST = "www.youtube.com"
+STATS_ENDPOINT = "yt_search"
+
+
+def query_key(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+def info_to_match(info: Optional[Dict[str, object]]) -> Dict[str, str]:
+    if not info:
+        return {}
+    video_id = str(info.get("id") or "")
+    if not video_id:
+        return {}
+
+    thumbnails = info.get("thumbnails") or []
+    thumb = ""
+    if thumbnails:
+        thumb = thumbnails[-1].get("url") or thumbnails[0].get("url") or ""
+
+    return {
+        "youtube_id": video_id,
+        "youtube_title": str(info.get("title") or ""),
+        "youtube_url": f"https://www.youtube.com/watch?v={video_id}",
+        "youtube_thumbnail": thumb or f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
+    }
+
+
+class YtDlpExtractor:
+    """In-process yt_dlp; a `YoutubeDL` is not thread-safe, so one per worker."""
+
+    name = "ytdlp"
+
+    def __init__(self):
+        if yt_dlp is None:
+            raise RuntimeError("yt_dlp is not installed (pip install yt-dlp)")
+        self._ydl = yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True, "skip_download": True, "noplaylist": True})
+
+    def search(self, query: str) -> Optional[Dict[str, object]]:
+        info = self._ydl.extract_info(f"ytsearch1:{query}", download=False) or {}
+        entries = [entry for entry in info.get("entries") or [] if entry]
+        return entries[0] if entries else None
+
+    def close(self) -> None:
+        self._ydl.close()
+
+
+def resolve_ytdlp_command() -> Optional[List[str]]:
+    configured = os.getenv("YTDLP_PATH", "").strip()
+    if configured:
+        return [configured] if os.path.exists(configured) else None
+    found = shutil.which("yt-dlp")
+    return [found] if found else None
+
+
+class YtDlpCliExtractor:
+    """One `yt-dlp --dump-json` subprocess per query, the original behaviour."""
+
+    name = "ytdlp-cli"
+
+    def __init__(self, command: Optional[List[str]] = None, timeout: float = CLI_TIMEOUT):
+        self.command = command or resolve_ytdlp_command()
+        if not self.command:
+            raise RuntimeError("yt-dlp not found (set YTDLP_PATH or put it on PATH)")
+        self.timeout = timeout
+
+    def search(self, query: str) -> Optional[Dict[str, object]]:
+        cmd = [*self.command, "--no-warnings", "--skip-download", "--dump-json", f"ytsearch1:{query}"]
+        result = subprocess.run(cmd, check=False, capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0 or not result.stdout.strip():
+            return None
+        return json.loads(result.stdout.splitlines()[0])
+
+    def close(self) -> None:
+        pass
+
+
+class StubExtractor:
+    """
+    Deterministic stand-in: the video id is derived from the folded query,
+    queries containing "nomatch" find nothing. `startup` is paid once per
+    instance and `latency` per search, to model extractor init and a
+    network round trip.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0, startup: float = 0.0):
+        self.latency = latency
+        if startup:
+            time.sleep(startup)
+
+    def search(self, query: str) -> Optional[Dict[str, object]]:
+        if self.latency:
+            time.sleep(self.latency)
+        key = query_key(query)
+        if "nomatch" in key:
+            return None
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+        video_id = base64.urlsafe_b64encode(digest).decode("ascii")[:11]
+        return {
+            "id": video_id,
+            "title": f"{query} (Official Video)",
+            "thumbnails": [{"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}],
+        }
+
+    def close(self) -> None:
+        pass
+
+
+BACKENDS: Dict[str, Callable[[], object]] = {
+    "ytdlp": YtDlpExtractor,
+    "ytdlp-cli": YtDlpCliExtractor,
+    "stub": StubExtractor,
+}
+DEFAULT_BACKEND = os.getenv("YT_SEARCH_BACKEND", "").strip().lower() or ("ytdlp" if yt_dlp is not None else "ytdlp-cli")
+
+
+class SearchPool:
+    """
+    Concurrent, deduplicating search front-end over warm extractors.
+
+    Extractors are checked out of a free list for each search, so there are
+    never more than `workers` of them and each stays warm across queries;
+    `factory` builds a new one only when the list is empty. Results
+    (including misses) are kept for the life of the pool, so a query asked
+    again, or while its first search is still running, shares one Future.
+    Backend errors count as "no result", like the old subprocess call.
+    """
+
+    def __init__(self, factory: Callable[[], object], workers: int = DEFAULT_WORKERS, extractors: Optional[List[object]] = None):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._extractors: List[object] = list(extractors or [])
+        self._idle: List[object] = list(self._extractors)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="yt-search")
+        self.workers = max(1, workers)
+        self.stats: Counter = Counter()
+
+    def _count(self, event: str) -> None:
+        with self._lock:
+            self.stats[event] += 1
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        extractor = self._factory()
+        with self._lock:
+            self._extractors.append(extractor)
+        return extractor
+
+    def _run(self, query: str) -> Dict[str, str]:
+        try:
+            extractor = self._checkout()
+        except Exception:
+            self._count("error")
+            return {}
+        started = time.perf_counter()
+        try:
+            match = info_to_match(extractor.search(query))
+        except Exception:
+            self._count("error")
+            STATS.request(STATS_HOST, STATS_ENDPOINT, "error", time.perf_counter() - started)
+            return {}
+        finally:
+            with self._lock:
+                self._idle.append(extractor)
+        outcome = "found" if match else "not_found"
+        self._count(outcome)
+        STATS.request(STATS_HOST, STATS_ENDPOINT, outcome, time.perf_counter() - started)
+        return match
+
+    def submit(self, query: str) -> Future:
+        key = query_key(query)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.stats["deduped"] += 1
+                STATS.cache_event(STATS_HOST, STATS_ENDPOINT, "deduped")
+                return future
+            self.stats["searched"] += 1
+            future = self._executor.submit(self._run, query)
+            self._futures[key] = future
+        return future
+
+    def search(self, query: str) -> Dict[str, str]:
+        return self.submit(query).result()
+
+    def report(self) -> str:
+        with self._lock:
+            stats = dict(self.stats)
+            extractors = len(self._extractors)
+        return (
+            f"YouTube search: {stats.get('searched', 0)} searched, {stats.get('deduped', 0)} deduped, "
+            f"{stats.get('found', 0)} found, {stats.get('not_found', 0)} not found, {stats.get('error', 0)} errors "
+            f"({extractors} warm extractors, {self.workers} workers)"
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            extractors, self._extractors = self._extractors, []
+        for extractor in extractors:
+            try:
+                extractor.close()
+            except Exception:
+                pass
+
+    def __enter__(self) -> "SearchPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_search_pool(backend: Optional[str] = None, workers: int = DEFAULT_WORKERS) -> Optional[SearchPool]:
+    """
+    Pool for `backend` (default `YT_SEARCH_BACKEND`), or None with a printed
+    reason when the backend cannot run here. The first extractor is built up
+    front, so a missing binary or package is reported before any row is
+    processed, and then handed to the pool.
+    """
+    name = (backend or DEFAULT_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown YouTube search backend: {name} (choose from {', '.join(BACKENDS)})")
+    factory = BACKENDS[name]
+    try:
+        first = factory()
+    except Exception as exc:
+        print(f"YouTube search disabled: {exc}")
+        return None
+    return SearchPool(factory, workers=workers, extractors=[first])